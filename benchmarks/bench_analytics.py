@@ -0,0 +1,34 @@
+"""Per-call cost of AnalyticsRecorder.record on the query path.
+
+Uses a no-op sink so only the enqueue cost (and background draining) is measured.
+
+    python benchmarks/bench_analytics.py --events 200000
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.analytics import AnalyticsRecorder, SearchEvent  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200000)
+    args = parser.parse_args()
+
+    recorder = AnalyticsRecorder(sink=lambda batch: None, capacity=10000, batch_size=200, flush_interval=1.0)
+    event = SearchEvent(query="chicken curry", response_time=0.004, results=[(i, -1.0 * i) for i in range(5)])
+    start = time.perf_counter()
+    for _ in range(args.events):
+        recorder.record(event)
+    elapsed = time.perf_counter() - start
+    recorder.close()
+    print(f"record(): {elapsed / args.events * 1e6:.2f} us/event  stats={recorder.stats()}")
+
+
+if __name__ == "__main__":
+    main()
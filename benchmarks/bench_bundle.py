@@ -0,0 +1,63 @@
+"""Bundles: archive size and export/import time per codec, against rebuilding the index.
+
+    python benchmarks/bench_bundle.py --meals 100000 --codecs zstd gzip none
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import bundle, compression, db  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.snapshot import write_snapshot  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=100000)
+    parser.add_argument("--codecs", nargs="+", default=["zstd", "gzip", "none"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        settings.data_dir = root / "source"
+        settings.data_dir.mkdir()
+        settings.cache_backend = "none"  # the API cache is crawl output; not synthesized here
+        db.DB_PATH = settings.data_dir / "meals.db"
+        start = time.perf_counter()
+        db.init_db()
+        db.upsert_meals(generate_meals(args.meals))
+        rebuild = time.perf_counter() - start
+        write_snapshot(settings.data_dir / "meals.ndjson", generate_meals(args.meals), count=args.meals)
+        raw = sum(p.stat().st_size for p in settings.data_dir.iterdir())
+
+        print(f"meals={args.meals} index+snapshot={raw / 1e6:.1f}MB rebuild={rebuild:.2f}s")
+        print(f"{'codec':>6} {'MB':>8} {'ratio':>6} {'export s':>9} {'import s':>9}")
+        source = settings.data_dir
+        for codec in args.codecs:
+            if codec == "zstd" and not compression._ZSTD_AVAILABLE:
+                print(f"{codec:>6} skipped (zstandard not installed)")
+                continue
+            settings.data_dir, db.DB_PATH = source, source / "meals.db"
+            archive = root / f"mealdb.{codec}.bundle"
+            start = time.perf_counter()
+            bundle.export_bundle(archive, codec=codec)
+            exported = time.perf_counter() - start
+
+            settings.data_dir = root / f"node-{codec}"
+            settings.data_dir.mkdir()
+            db.DB_PATH = settings.data_dir / "meals.db"
+            start = time.perf_counter()
+            bundle.import_bundle(archive)
+            imported = time.perf_counter() - start
+            size = archive.stat().st_size
+            print(f"{codec:>6} {size / 1e6:>8.1f} {raw / size:>6.2f} {exported:>9.2f} {imported:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
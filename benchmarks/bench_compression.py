@@ -0,0 +1,73 @@
+"""Bytes on disk and read/write throughput per codec for snapshots and cache entries.
+
+Cache entries are the 36 per-letter search payloads; the snapshot is the NDJSON
+file `synth.write_snapshot` writes (a header line, then one meal per line). `--storage-mbps` adds the time to move the bytes over a
+link of that bandwidth, modelling cache volumes on slow network storage.
+
+    python benchmarks/bench_compression.py --meals 20000 --storage-mbps 100
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import compression  # noqa: E402
+from src.snapshot import iter_snapshot  # noqa: E402
+from src.cache import FileCache  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.mealdb_api import SHARD_LETTERS  # noqa: E402
+from src.synth import generate_meals, write_snapshot  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=20000)
+    parser.add_argument("--storage-mbps", type=float, default=100.0, help="Simulated storage bandwidth (MB/s)")
+    args = parser.parse_args()
+
+    meals = list(generate_meals(args.meals))
+    per_letter = len(meals) // len(SHARD_LETTERS) + 1
+    payloads = {f"search.php?f={letter}": {"meals": meals[i * per_letter:(i + 1) * per_letter]}
+                for i, letter in enumerate(SHARD_LETTERS)}
+    raw_mb = len(json.dumps({"meals": meals}, ensure_ascii=False).encode()) / 1e6
+    codecs = ["none", "gzip"] + (["zstd"] if compression._ZSTD_AVAILABLE else [])
+    link = args.storage_mbps
+
+    print(f"meals={args.meals} json={raw_mb:.1f}MB storage={link:.0f}MB/s")
+    print(f"{'what':>9} {'codec':>6} {'MB':>8} {'ratio':>6} {'write s':>8} {'read s':>8} {'read+io s':>9}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for codec in codecs:
+            settings.compression = codec
+
+            path = Path(tmpdir) / f"meals-{codec}.ndjson"
+            write = timed(lambda: write_snapshot(path, args.meals))
+
+            def read_snapshot():
+                for _ in iter_snapshot(path):
+                    pass
+            read = timed(read_snapshot)
+            mb = path.stat().st_size / 1e6
+            print(f"{'snapshot':>9} {codec:>6} {mb:>8.2f} {raw_mb / mb:>5.1f}x {write:>8.3f} {read:>8.3f} "
+                  f"{read + mb / link:>9.3f}")
+
+            cache = FileCache(ttl_hours=1, base_dir=Path(tmpdir) / f"cache-{codec}")
+            write = timed(lambda: [cache.set(k, v) for k, v in payloads.items()])
+            read = timed(lambda: [cache.get(k) for k in payloads])
+            mb = sum(p.stat().st_size for p in cache.base_dir.iterdir()) / 1e6
+            print(f"{'cache':>9} {codec:>6} {mb:>8.2f} {raw_mb / mb:>5.1f}x {write:>8.3f} {read:>8.3f} "
+                  f"{read + mb / link:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Delta replication: replica refresh cost by change size, against shipping the whole index.
+
+    python benchmarks/bench_delta.py --meals 100000 --changes 10 100 1000
+"""
+from __future__ import annotations
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import db, delta  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.indexer import index_snapshot  # noqa: E402
+from src.snapshot import write_snapshot  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=100000)
+    parser.add_argument("--changes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        primary, replica = root / "primary.db", root / "replica.db"
+        settings.delta_dir = root / "deltas"
+        snapshot = root / "meals.ndjson"
+        meals = list(generate_meals(args.meals))
+        db.DB_PATH = primary
+        db.init_db()
+        write_snapshot(snapshot, meals)
+        start = time.perf_counter()
+        index_snapshot(snapshot)
+        full = time.perf_counter() - start
+        start = time.perf_counter()
+        shutil.copy(primary, replica)
+        copy = time.perf_counter() - start
+
+        print(f"meals={args.meals} index={primary.stat().st_size / 1e6:.1f}MB "
+              f"full build={full:.2f}s copy={copy:.3f}s")
+        print(f"{'changes':>8} {'reindex s':>10} {'delta KB':>9} {'apply s':>8}")
+        for n, changes in enumerate(args.changes):
+            for i in range(changes):
+                meals[i] = dict(meals[i], strInstructions=f"{meals[i]['strInstructions']} (rev {n})")
+            write_snapshot(snapshot, meals)
+            db.DB_PATH = primary
+            start = time.perf_counter()
+            generation = index_snapshot(snapshot)
+            reindex = time.perf_counter() - start
+            path = delta.delta_path(generation - 1, generation)
+
+            db.DB_PATH = replica
+            start = time.perf_counter()
+            delta.apply_delta(path)
+            apply = time.perf_counter() - start
+            print(f"{changes:>8} {reindex:>10.2f} {path.stat().st_size / 1e3:>9.1f} {apply:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
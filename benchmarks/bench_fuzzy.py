@@ -0,0 +1,74 @@
+"""Typo-tolerant search: vocabulary build cost and search latency for exact vs corrected queries.
+
+    python benchmarks/bench_fuzzy.py --meals 100000 --queries 300
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import db, fuzzy  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+EXACT = ["chicken curry", "beef stew", "lemon salmon", "garlic pasta", "ginger pork"]
+TYPOS = ["chiken curyy", "beeef stwe", "lemmon salmn", "garlik psata", "gigner prok"]
+
+
+def latencies(queries: list, n: int) -> list:
+    out = []
+    for i in range(n):
+        start = time.perf_counter()
+        db.search_meals(queries[i % len(queries)], limit=5)
+        out.append((time.perf_counter() - start) * 1e6)
+    return sorted(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.DB_PATH = Path(tmpdir) / "meals.db"
+        db.init_db()
+        db.upsert_meals(generate_meals(args.meals))
+        settings.db_read_only = True
+        settings.slow_query_ms = 0
+        settings.fuzzy_search = True
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        vocab = fuzzy.Vocabulary.load()
+        elapsed = time.perf_counter() - start
+        resident, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        fuzzy._vocabulary = vocab
+        print(f"meals={args.meals} terms={len(vocab.freq)} deletes={len(vocab.deletes)} "
+              f"build={elapsed * 1000:.0f}ms memory={resident / 1e6:.1f}MB")
+
+        words = [w for q in TYPOS for w in q.split()]
+        start = time.perf_counter()
+        for _ in range(args.queries):
+            for w in words:
+                vocab.correct(w)
+        per_term = (time.perf_counter() - start) / (args.queries * len(words)) * 1e6
+        print(f"correction: {per_term:.0f}us per misspelled term")
+
+        print(f"{'queries':>8} {'p50 us':>9} {'p95 us':>9} {'max us':>9}")
+        for label, queries in (("exact", EXACT), ("typos", TYPOS)):
+            latencies(queries, 20)
+            samples = latencies(queries, args.queries)
+            p95 = samples[int(len(samples) * 0.95) - 1]
+            print(f"{label:>8} {statistics.median(samples):>9.0f} {p95:>9.0f} {samples[-1]:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Django import_meals time: row-at-a-time vs --bulk, on a scaled synthetic corpus.
+
+Runs against a throwaway SQLite database so the real admin DB is untouched.
+
+    python benchmarks/bench_import.py --meals 5000
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mealdb_admin.settings")
+
+from src.synth import write_snapshot  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        from django.conf import settings as django_settings
+        django_settings.DATABASES["default"]["NAME"] = str(Path(tmpdir) / "bench.sqlite3")
+
+        import django
+        django.setup()
+        from django.core.management import call_command
+        from meals.models import Meal
+
+        call_command("migrate", verbosity=0)
+        json_path = Path(tmpdir) / "meals.ndjson"
+        write_snapshot(json_path, args.meals)
+
+        print(f"meals={args.meals}")
+        for label, extra in (("row", []), ("bulk", ["--bulk", "--batch-size", str(args.batch_size)])):
+            Meal.objects.all().delete()
+            start = time.perf_counter()
+            call_command("import_meals", "--from-cache", "--json-file", str(json_path), *extra, stdout=StringIO())
+            elapsed = time.perf_counter() - start
+            print(f"{label:>5}: {elapsed:8.2f}s  {args.meals / elapsed:10.0f} meals/s  ({Meal.objects.count()} meals)")
+
+
+if __name__ == "__main__":
+    main()
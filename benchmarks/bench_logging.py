@@ -0,0 +1,82 @@
+"""Logging overhead during a bulk index build: sync vs queued sinks, with and without throttling.
+
+    python benchmarks/bench_logging.py --meals 20000 --bad-fraction 0.05 --write-latency-ms 0.2
+
+``--write-latency-ms`` adds a sleep to every sink write, standing in for a slow disk
+or a terminal that cannot keep up.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import db, logger as logging_setup  # noqa: E402
+from src.logger import QueuedSink, RotatingFile, Throttle, logger  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+UNLIMITED = 10 ** 9
+
+
+def build_once(meals, tmpdir: Path, name: str, queued: bool | None, burst: int, latency: float):
+    """(build seconds, seconds until the sinks drained, lines logged) for one fresh index."""
+    logger.remove()
+    log_file = tmpdir / f"{name}.log"
+    log_file.unlink(missing_ok=True)
+    target = RotatingFile(log_file)
+
+    def write(text: str) -> None:
+        if latency:
+            time.sleep(latency)
+        target.write(text)
+
+    sinks = []
+    if queued is not None:
+        sinks = [QueuedSink(write, target.flush)] if queued else [write]
+        logger.add(sinks[0], level="INFO")
+    logging_setup._throttle = Throttle(burst=burst, window_seconds=3600)
+    db.DB_PATH = tmpdir / f"{name}.db"
+    db.DB_PATH.unlink(missing_ok=True)
+    db.init_db()
+    start = time.perf_counter()
+    db.upsert_meals(meals)
+    build = time.perf_counter() - start
+    for sink in sinks:
+        if isinstance(sink, QueuedSink):
+            sink.complete(timeout=None)
+    drained = time.perf_counter() - start
+    logger.remove()
+    target.flush()
+    return build, drained, sum(1 for _ in open(log_file))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=20000)
+    parser.add_argument("--bad-fraction", type=float, default=0.05)
+    parser.add_argument("--write-latency-ms", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    meals = list(generate_meals(args.meals))
+    step = max(1, int(1 / args.bad_fraction)) if args.bad_fraction > 0 else 0
+    for i in range(0, len(meals), step) if step else []:
+        meals[i] = dict(meals[i], idMeal=f"bad-{i}")  # fails int() in prepare_meal
+    latency = args.write_latency_ms / 1000
+    print(f"meals={args.meals} bad={sum(1 for m in meals if str(m['idMeal']).startswith('bad'))} "
+          f"write_latency={args.write_latency_ms}ms")
+    print(f"{'sinks':>18} {'build s':>8} {'drained s':>9} {'lines':>8}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        for name, queued, burst in (("none", None, UNLIMITED), ("sync", False, UNLIMITED),
+                                    ("queued", True, UNLIMITED), ("queued+throttled", True, 10)):
+            runs = [build_once(meals, tmp, name, queued, burst, latency) for _ in range(args.repeat)]
+            build, drained, lines = min(runs)
+            print(f"{name:>18} {build:>8.2f} {drained:>9.2f} {lines:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Paged search: cost of page N via cached cursors vs re-running the query with a larger LIMIT.
+
+    python benchmarks/bench_paging.py --meals 100000 --pages 1 10 50 --page-size 10
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import db, paging  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+QUERIES = ["chicken curry", "beef stew", "garlic", "pasta with tomatoes"]
+
+
+def timed_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=100000)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.DB_PATH = Path(tmpdir) / "meals.db"
+        db.init_db()
+        db.upsert_meals(generate_meals(args.meals))
+        settings.db_read_only = True
+        settings.slow_query_ms = 0
+
+        print(f"meals={args.meals} page_size={args.page_size} max_results={settings.search_max_results}")
+        print(f"{'query':>20} {'page':>5} {'LIMIT ms':>9} {'cursor ms':>10}")
+        for query in QUERIES:
+            paging.ranked_cache.clear()
+            _, cursor = paging.search_page(query, page_size=args.page_size)  # first page ranks and caches
+            cursors = {1: None}
+            for page in range(2, max(args.pages) + 1):
+                cursors[page] = cursor
+                if cursor is None:
+                    break
+                _, cursor = paging.search_page(cursor=cursor, page_size=args.page_size)
+            for page in args.pages:
+                if page not in cursors:
+                    continue
+                limit = page * args.page_size
+                rerun = timed_ms(lambda: db.search_meals(query, limit=limit)[-args.page_size:], args.repeat)
+                c = cursors[page]
+                paged = timed_ms(lambda: paging.search_page(query if c is None else None, cursor=c,
+                                                            page_size=args.page_size), args.repeat)
+                print(f"{query:>20} {page:>5} {rerun:>9.2f} {paged:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Two-stage reranking vs single-pass bm25: latency and ranking quality on a labeled query set.
+
+Quality is nDCG@k and precision@k (grade >= 2) over `rerank_queries.json`, whose
+labels are rules evaluated against the synthetic corpus, so any `--meals` works.
+`--weights` tries a RERANK_WEIGHTS spec, e.g. `--weights area=3,overlap=2`.
+
+    python benchmarks/bench_rerank.py --meals 20000 --k 10
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import db  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+QUERIES = Path(__file__).with_name("rerank_queries.json")
+
+
+def grader(conn, label: Dict) -> Dict[int, int]:
+    """Relevance grade per meal id (only meals meeting at least one criterion)."""
+    grades: Dict[int, int] = {}
+    ingredients: Dict[int, set] = {}
+    for meal_id, ingredient in conn.execute("SELECT meal_id, ingredient FROM meal_ingredients"):
+        ingredients.setdefault(meal_id, set()).add(ingredient)
+    for meal_id, name, category, area in conn.execute("SELECT id, name, category, area FROM meals"):
+        grade = sum(word in name for word in label.get("name", []))
+        grade += sum(i in ingredients.get(meal_id, ()) for i in label.get("ingredients", []))
+        grade += label.get("area") == area
+        grade += label.get("category") == category
+        if grade:
+            grades[meal_id] = grade
+    return grades
+
+
+def ndcg(ranked: List[int], grades: Dict[int, int], k: int) -> float:
+    dcg = sum((2 ** grades.get(m, 0) - 1) / math.log2(i + 2) for i, m in enumerate(ranked[:k]))
+    ideal = sorted(grades.values(), reverse=True)[:k]
+    idcg = sum((2 ** g - 1) / math.log2(i + 2) for i, g in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=20000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--weights", default=None, help="RERANK_WEIGHTS spec to evaluate")
+    args = parser.parse_args()
+    labels = json.loads(QUERIES.read_text())["queries"]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.DB_PATH = Path(tmpdir) / "meals.db"
+        db.init_db()
+        db.upsert_meals(generate_meals(args.meals))
+        settings.db_read_only = True
+        settings.slow_query_ms = 0
+        if args.weights is not None:
+            settings.rerank_weights = args.weights
+        conn = db.connect()
+        grades = [grader(conn, label) for label in labels]
+        conn.close()
+
+        print(f"meals={args.meals} queries={len(labels)} k={args.k} candidates={settings.rerank_candidates}")
+        print(f"{'mode':>7} {'nDCG@k':>7} {'P@k':>6} {'p50 ms':>7} {'p95 ms':>7}")
+        for mode in ("bm25", "rerank"):
+            settings.search_mode = mode
+            quality, precision, samples = [], [], []
+            for label, graded in zip(labels, grades):
+                ranked = [m for m, _ in db.search_meal_ids(label["query"], args.k)]
+                quality.append(ndcg(ranked, graded, args.k))
+                precision.append(sum(graded.get(m, 0) >= 2 for m in ranked) / args.k)
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    db.search_meals(label["query"], args.k)
+                    samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            print(f"{mode:>7} {statistics.mean(quality):>7.3f} {statistics.mean(precision):>6.3f} "
+                  f"{statistics.median(samples):>7.2f} {samples[int(len(samples) * 0.95) - 1]:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
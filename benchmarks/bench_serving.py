@@ -0,0 +1,72 @@
+"""Query throughput of the read-only mmap serving mode across forked workers.
+
+Builds a synthetic index in a temp dir, then measures aggregate QPS of
+`search_meals` with 1/2/4/8 forked worker processes, comparing the default
+read-write connect-per-query path against DB_READ_ONLY serving mode.
+
+    python benchmarks/bench_serving.py --meals 20000 --duration 3
+"""
+from __future__ import annotations
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import db  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+QUERIES = ["chicken curry", "pasta with tomatoes and garlic", "beef stew", "lemon salmon",
+           "cheddar cheese potato bake", "ginger pork rice", "egg soup"]
+
+
+def _worker(read_only: bool, duration: float, out: mp.Queue) -> None:
+    settings.db_read_only = read_only
+    done = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        db.search_meals(QUERIES[done % len(QUERIES)], limit=5)
+        done += 1
+    out.put(done)
+
+
+def run(workers: int, read_only: bool, duration: float) -> float:
+    ctx = mp.get_context("fork")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(read_only, duration, out)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    total = sum(out.get() for _ in procs)
+    for p in procs:
+        p.join()
+    return total / duration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=20000)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--preload", action="store_true", help="Warm the OS page cache before forking")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.DB_PATH = Path(tmpdir) / "meals.db"
+        db.init_db()
+        db.upsert_meals(generate_meals(args.meals))
+        if args.preload:
+            db.preload_db()
+        print(f"meals={args.meals} db_bytes={db.DB_PATH.stat().st_size} cpus={mp.cpu_count()}")
+        print(f"{'workers':>8} {'default qps':>12} {'serving qps':>12} {'speedup':>8}")
+        for n in args.workers:
+            base = run(n, False, args.duration)
+            serving = run(n, True, args.duration)
+            print(f"{n:>8} {base:>12.0f} {serving:>12.0f} {serving / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
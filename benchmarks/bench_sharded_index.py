@@ -0,0 +1,73 @@
+"""Re-index wall time: sequential crawl + upsert vs parallel shards + single-writer merge.
+
+Each of the 36 crawl letters gets a synthetic slice of the corpus and a simulated
+fetch latency. The sharded run uses a local process pool as a stand-in for Celery
+workers (same ``build_shard``/``merge_shards`` code the tasks call), so no broker
+is needed.
+
+    python benchmarks/bench_sharded_index.py --meals 20000 --latency 0.2 --workers 8
+"""
+from __future__ import annotations
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import db  # noqa: E402
+from src.indexer import build_shard, merge_shards  # noqa: E402
+from src.mealdb_api import SHARD_LETTERS  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+
+def fetch(letter: str, meals: int, latency: float):
+    """Simulated ``search.php?f=<letter>``: network wait, then this letter's slice."""
+    time.sleep(latency)
+    index = SHARD_LETTERS.index(letter)
+    per_shard = meals // len(SHARD_LETTERS) + 1
+    start = index * per_shard
+    return generate_meals(max(0, min(per_shard, meals - start)), seed=index, start_id=52000 + start)
+
+
+def shard_task(letter: str, meals: int, latency: float, shard_dir: Path) -> int:
+    return build_shard(fetch(letter, meals, latency), shard_dir / f"{letter}.json")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated seconds per shard fetch")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        print(f"meals={args.meals} shards={len(SHARD_LETTERS)} latency={args.latency}s workers={args.workers}")
+
+        db.DB_PATH = tmp / "sequential.db"
+        start = time.perf_counter()
+        db.init_db()
+        meals = []
+        for letter in SHARD_LETTERS:
+            meals.extend(fetch(letter, args.meals, args.latency))
+        db.upsert_meals(meals)
+        sequential = time.perf_counter() - start
+        print(f"sequential: {sequential:8.2f}s")
+
+        db.DB_PATH = tmp / "sharded.db"
+        shard_dir = tmp / "shards"
+        start = time.perf_counter()
+        with mp.get_context("fork").Pool(args.workers) as pool:
+            pool.map(partial(shard_task, meals=args.meals, latency=args.latency, shard_dir=shard_dir),
+                     SHARD_LETTERS)
+        merged = merge_shards(sorted(shard_dir.glob("*.json")))
+        sharded = time.perf_counter() - start
+        print(f"   sharded: {sharded:8.2f}s  ({merged} meals, {sequential / sharded:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""In-memory MealStore: resident memory per 100k meals and retrieve() latency vs the row path.
+
+    python benchmarks/bench_store.py --meals 100000 --queries 300
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import db, rag, store  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+QUERIES = ["chicken curry", "pasta with tomatoes and garlic", "beef stew", "lemon salmon",
+           "cheddar cheese potato bake", "ginger pork rice", "egg soup"]
+
+
+def latencies(n: int, k: int) -> list:
+    out = []
+    for i in range(n):
+        start = time.perf_counter()
+        rag.retrieve(QUERIES[i % len(QUERIES)], k=k)
+        out.append((time.perf_counter() - start) * 1e6)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.DB_PATH = Path(tmpdir) / "meals.db"
+        db.init_db()
+        db.upsert_meals(generate_meals(args.meals))
+        settings.db_read_only = True
+        settings.slow_query_ms = 0
+
+        tracemalloc.start()
+        loaded = store.MealStore.load()
+        resident, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        store._store = loaded
+        print(f"meals={len(loaded)} store={resident / 1e6:.1f}MB "
+              f"({resident / len(loaded) * 100000 / 1e6:.1f}MB per 100k meals)")
+
+        print(f"{'path':>6} {'p50 us':>9} {'p95 us':>9}")
+        for label, enabled in (("rows", False), ("store", True)):
+            settings.meal_store = enabled
+            latencies(50, args.k)  # warm the page cache / instructions LRU
+            samples = sorted(latencies(args.queries, args.k))
+            p95 = samples[int(len(samples) * 0.95) - 1]
+            print(f"{label:>6} {statistics.median(samples):>9.0f} {p95:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Prefix autocomplete: index memory and build time at N meals, and per-suggestion latency by prefix length.
+
+    python benchmarks/bench_suggest.py --meals 100000 --queries 2000
+"""
+from __future__ import annotations
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import db, suggest  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--n", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.DB_PATH = Path(tmpdir) / "meals.db"
+        db.init_db()
+        db.upsert_meals(generate_meals(args.meals))
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        s = suggest.Suggester.load()
+        elapsed = time.perf_counter() - start
+        resident, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"meals={args.meals} entries={len(s.texts)} keys={len(s.keys)} precomputed={len(s.top)} "
+              f"build={elapsed:.2f}s memory={resident / 1e6:.1f}MB")
+
+        rng = random.Random(0)
+        print(f"{'prefix len':>10} {'p50 us':>8} {'p99 us':>8} {'max us':>8}")
+        for length in (1, 2, 3, 5, 8):
+            prefixes = [k[:length] for k in rng.sample(s.keys, min(args.queries, len(s.keys)))]
+            samples = []
+            for prefix in prefixes:
+                start = time.perf_counter()
+                s.suggest(prefix, args.n)
+                samples.append((time.perf_counter() - start) * 1e6)
+            samples.sort()
+            p99 = samples[int(len(samples) * 0.99) - 1]
+            print(f"{length:>10} {statistics.median(samples):>8.1f} {p99:>8.1f} {samples[-1]:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
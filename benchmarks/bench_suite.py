@@ -0,0 +1,147 @@
+"""Offline indexing/retrieval benchmark suite over synthetic corpora.
+
+For each corpus size, a fresh forked process builds an index from `src.synth`
+meals and records build throughput, DB size, latency percentiles for
+`search_meals`, `retrieve` and `answer`, and peak RSS. Results can be stored as
+baselines and later checked for regressions.
+
+    python benchmarks/bench_suite.py --sizes 1000                 # report
+    python benchmarks/bench_suite.py --sizes 1000 --check         # fail on regression
+    python benchmarks/bench_suite.py --sizes 1000 --update-baseline
+    python benchmarks/bench_suite.py --sizes 1000 100000 1000000  # large runs
+"""
+from __future__ import annotations
+import argparse
+import json
+import multiprocessing as mp
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import db, rag  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+BASELINES = Path(__file__).resolve().parent / "baselines.json"
+QUERIES = [
+    "chicken curry", "spicy beef stew with potatoes", "easy vegetarian pasta bake", "lemon garlic salmon",
+    "creamy mushroom risotto", "slow cooked lamb tagine with cumin", "quick breakfast eggs", "coconut milk",
+    "honey glazed pork", "tofu stir fry with soy sauce and ginger",
+]
+# Metric -> True when higher is better
+METRICS = {
+    "build_meals_per_s": True,
+    "db_bytes": False,
+    "search_p50_ms": False,
+    "search_p95_ms": False,
+    "retrieve_p50_ms": False,
+    "retrieve_p95_ms": False,
+    "answer_p50_ms": False,
+    "answer_p95_ms": False,
+    "peak_rss_mb": False,
+}
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000  # noqa: E731
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def timed(fn, rounds: int) -> List[float]:
+    samples = []
+    for i in range(rounds):
+        q = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        fn(q)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_size(n: int, rounds: int, out: mp.Queue) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.DB_PATH = Path(tmpdir) / "meals.db"
+        db.init_db()
+        start = time.perf_counter()
+        db.upsert_meals(generate_meals(n))
+        build_s = time.perf_counter() - start
+
+        result: Dict[str, float] = {
+            "meals": n,
+            "build_s": build_s,
+            "build_meals_per_s": n / build_s,
+            "db_bytes": db.DB_PATH.stat().st_size,
+        }
+        for name, fn in (("search", lambda q: db.search_meals(q, limit=5)),
+                         ("retrieve", lambda q: rag.retrieve(q, k=5)),
+                         ("answer", lambda q: rag.answer(q, k=5))):
+            fn(QUERIES[0])  # warm the page cache and statement cache
+            for key, value in percentiles(timed(fn, rounds)).items():
+                result[f"{name}_{key}"] = value
+        result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        out.put(result)
+
+
+def measure(n: int, rounds: int) -> Dict[str, float]:
+    ctx = mp.get_context("fork")
+    out = ctx.Queue()
+    proc = ctx.Process(target=run_size, args=(n, rounds, out))
+    proc.start()
+    result = out.get()
+    proc.join()
+    return result
+
+
+def regressions(result: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    failures = []
+    for metric, higher_is_better in METRICS.items():
+        if metric not in baseline:
+            continue
+        base, value = baseline[metric], result[metric]
+        worse = value < base * (1 - threshold) if higher_is_better else value > base * (1 + threshold)
+        if worse:
+            failures.append(f"{metric}: {value:.3f} vs baseline {base:.3f}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000])
+    parser.add_argument("--rounds", type=int, default=200, help="Timed queries per function")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if a metric regressed past --threshold")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, help="Also write results to this file")
+    args = parser.parse_args()
+
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    results = {}
+    failed = False
+    for n in args.sizes:
+        result = measure(n, args.rounds)
+        results[str(n)] = result
+        print(f"\n== {n} meals ==")
+        for key, value in result.items():
+            print(f"  {key:>20}: {value:,.3f}")
+        if args.check and str(n) in baselines:
+            failures = regressions(result, baselines[str(n)], args.threshold)
+            for failure in failures:
+                print(f"  REGRESSION {failure}")
+            failed = failed or bool(failures)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.update_baseline:
+        baselines.update(results)
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"\nUpdated {BASELINES}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Celery app for mealdb_admin.
+
+Start a worker with:
+    celery -A mealdb_admin worker -l info
+
+Tasks live in each app's ``tasks.py`` (see meals/tasks.py).
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mealdb_admin.settings')
+
+app = Celery('mealdb_admin')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
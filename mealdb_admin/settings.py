@@ -129,3 +129,19 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Meal admin changelist
+# Facet values (category/area filters) and the table total are cached for this many seconds;
+# filtered result counts stop at MEAL_ADMIN_COUNT_LIMIT rows.
+
+MEAL_ADMIN_FACET_CACHE_SECONDS = env.int('MEAL_ADMIN_FACET_CACHE_SECONDS', default=300)
+MEAL_ADMIN_COUNT_LIMIT = env.int('MEAL_ADMIN_COUNT_LIMIT', default=10000)
+
+# Celery (sharded re-indexing, see meals/tasks.py)
+# Set CELERY_TASK_ALWAYS_EAGER=True to run shards inline without a broker.
+
+CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='redis://localhost:6379/1')
+CELERY_RESULT_BACKEND = env('CELERY_RESULT_BACKEND', default='redis://localhost:6379/1')
+CELERY_TASK_ALWAYS_EAGER = env.bool('CELERY_TASK_ALWAYS_EAGER', default=False)
+CELERY_TASK_EAGER_PROPAGATES = True
+INDEX_PROGRESS_INTERVAL = env.float('INDEX_PROGRESS_INTERVAL', default=2.0)
@@ -17,6 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
+from meals import views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', views.prometheus_metrics, name='metrics'),
+    path('suggest', views.suggestions, name='suggest'),
 ]
@@ -1,4 +1,4 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
@@ -6,6 +6,7 @@ from .models import (
     Configuration, APIConfiguration, Meal, Ingredient,
     SearchQuery, SearchResult, CacheEntry, IndexingTask
 )
+from .search import EstimatedCountPaginator, facet_values, filter_by_fts, invalidate_facets
 
 
 @admin.register(Configuration)
@@ -78,11 +79,35 @@ class IngredientInline(admin.TabularInline):
     ordering = ['order']
 
 
+class CachedFacetFilter(admin.SimpleListFilter):
+    """List filter whose choices come from cached facet values instead of a DISTINCT scan."""
+
+    def lookups(self, request, model_admin):
+        return [(value, value) for value in facet_values(model_admin.model, self.parameter_name)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+class CategoryFilter(CachedFacetFilter):
+    title = 'category'
+    parameter_name = 'category'
+
+
+class AreaFilter(CachedFacetFilter):
+    title = 'area'
+    parameter_name = 'area'
+
+
 @admin.register(Meal)
 class MealAdmin(admin.ModelAdmin):
     list_display = ['meal_id', 'name', 'category', 'area', 'is_indexed', 'thumbnail_preview']
-    list_filter = ['category', 'area', 'is_indexed', 'last_fetched']
+    list_filter = [CategoryFilter, AreaFilter, 'is_indexed', 'last_fetched']
     search_fields = ['name', 'instructions', 'tags']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ['meal_id', 'created_at', 'updated_at', 'last_fetched', 'thumbnail_preview_large']
     inlines = [IngredientInline]
     
@@ -114,6 +139,26 @@ class MealAdmin(admin.ModelAdmin):
         return '-'
     thumbnail_preview_large.short_description = 'Thumbnail Preview'
     
+    def get_search_results(self, request, queryset, search_term):
+        # Route searches through the FTS index instead of icontains scans over instructions
+        matched = filter_by_fts(queryset, search_term)
+        if matched is None:
+            return super().get_search_results(request, queryset, search_term)
+        return matched, False
+
+    # The changelist total and facets are cached; admin edits must not leave them stale
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_facets(Meal)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_facets(Meal)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        invalidate_facets(Meal)
+    
     actions = ['mark_as_indexed', 'mark_as_not_indexed']
     
     def mark_as_indexed(self, request, queryset):
@@ -243,8 +288,12 @@ class IndexingTaskAdmin(admin.ModelAdmin):
     actions = ['trigger_reindex']
     
     def trigger_reindex(self, request, queryset):
-        # This would trigger the actual indexing task
-        self.message_user(request, 'Indexing task triggered.')
+        from .tasks import start_reindex
+        task = start_reindex()
+        if task.status == 'failed':
+            self.message_user(request, f'Indexing task #{task.pk} failed to start: {task.error_message}', messages.ERROR)
+        else:
+            self.message_user(request, f'Indexing task #{task.pk} dispatched ({task.get_status_display()}).')
     trigger_reindex.short_description = 'Trigger re-indexing'
     
     def has_add_permission(self, request):
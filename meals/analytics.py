@@ -0,0 +1,30 @@
+from django.db import transaction
+
+from .models import Meal, SearchQuery, SearchResult
+
+
+def write_events(events):
+    """Bulk insert a batch of src.analytics.SearchEvent as SearchQuery/SearchResult rows.
+
+    Results pointing at meals not (yet) imported into Django are skipped, since
+    SearchResult.meal is a foreign key.
+    """
+    meal_ids = {meal_id for event in events for meal_id, _ in event.results}
+    known = set(Meal.objects.filter(meal_id__in=meal_ids).values_list('meal_id', flat=True))
+    with transaction.atomic():
+        queries = SearchQuery.objects.bulk_create([
+            SearchQuery(
+                query=event.query,
+                results_count=len(event.results),
+                response_time=event.response_time,
+                use_toolfront=event.use_toolfront,
+                model_used=event.model_used or '',
+            )
+            for event in events
+        ])
+        SearchResult.objects.bulk_create([
+            SearchResult(query=query, meal_id=meal_id, score=score, position=position)
+            for query, event in zip(queries, events)
+            for position, (meal_id, score) in enumerate(event.results, start=1)
+            if meal_id in known
+        ])
@@ -0,0 +1,29 @@
+import json
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CacheEntry
+
+
+def record_backend_stats(backend, hits=0, misses=0, sets=0, ttl_seconds=0):
+    """Accumulate a cache backend's counters into its ``backend:<name>`` CacheEntry row.
+
+    ``hit_count`` holds total hits; ``value`` holds the JSON counters and hit rate.
+    """
+    key = f'backend:{backend}'
+    with transaction.atomic():
+        entry = CacheEntry.objects.select_for_update().filter(key=key).first()
+        if entry is None:
+            entry = CacheEntry(key=key, value='{}')
+        stats = json.loads(entry.value or '{}')
+        for name, delta in (('hits', hits), ('misses', misses), ('sets', sets)):
+            stats[name] = stats.get(name, 0) + delta
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        entry.value = json.dumps(stats)
+        entry.hit_count = stats['hits']
+        entry.expires_at = timezone.now() + timedelta(seconds=ttl_seconds)
+        entry.save()
+    return stats
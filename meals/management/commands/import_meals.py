@@ -1,12 +1,68 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from meals.models import Meal, Ingredient, IndexingTask, APIConfiguration
-import json
+from meals.search import invalidate_facets
+from collections import defaultdict
+from itertools import count, islice
+import asyncio
+import hashlib
 import os
 import sys
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 
+from src.cache import cache, mirror_stats_to_django
+from src.snapshot import iter_snapshot, read_header
 from src.indexer import build_index
+from src import db as index_db
+from src.config import settings as index_settings
+
+# Fields the src index stores; these (plus ingredients) make up Meal.content_hash
+CONTENT_FIELDS = ['name', 'category', 'area', 'instructions', 'thumbnail', 'tags']
+MEAL_UPDATE_FIELDS = CONTENT_FIELDS + [
+    'youtube_url', 'source_url', 'is_indexed', 'last_fetched', 'content_hash', 'updated_at',
+]
+# The index has no youtube/source columns, so an index sync leaves them untouched
+INDEX_UPDATE_FIELDS = CONTENT_FIELDS + ['is_indexed', 'last_fetched', 'content_hash', 'updated_at']
+
+
+def content_hash(fields, ingredients):
+    """Stable digest of a meal's indexed content, used to skip unchanged rows on sync."""
+    h = hashlib.sha1()
+    for name in CONTENT_FIELDS:
+        h.update((fields.get(name) or '').strip().encode('utf-8'))
+        h.update(b'\x1f')
+    for _, ingredient_name, measure in ingredients:
+        h.update(f'{ingredient_name}\x1e{measure}\x1f'.encode('utf-8'))
+    return h.hexdigest()
+
+
+def meal_defaults(meal_data, fetched_at):
+    """Map a TheMealDB payload onto Meal field values."""
+    fields = {
+        'name': meal_data.get('strMeal') or '',
+        'category': meal_data.get('strCategory') or '',
+        'area': meal_data.get('strArea') or '',
+        'instructions': meal_data.get('strInstructions') or '',
+        'thumbnail': meal_data.get('strMealThumb') or '',
+        'tags': meal_data.get('strTags') or '',
+        'youtube_url': meal_data.get('strYoutube') or '',
+        'source_url': meal_data.get('strSource') or '',
+        'is_indexed': True,
+        'last_fetched': fetched_at,
+    }
+    fields['content_hash'] = content_hash(fields, meal_ingredients(meal_data))
+    return fields
+
+
+def meal_ingredients(meal_data):
+    """Yield (order, name, measure) for the non-empty strIngredientN/strMeasureN pairs."""
+    for i in range(1, 21):
+        ingredient_name = (meal_data.get(f'strIngredient{i}') or '').strip()
+        measure = (meal_data.get(f'strMeasure{i}') or '').strip()
+        if ingredient_name:
+            yield i, ingredient_name, measure
 
 
 class Command(BaseCommand):
@@ -21,8 +77,36 @@ class Command(BaseCommand):
         parser.add_argument(
             '--json-file',
             type=str,
-            default='data/meals.json',
-            help='Path to JSON file (if using --from-cache)',
+            default='data/meals.ndjson',
+            help='Path to the NDJSON snapshot or legacy {"meals": [...]} JSON file (if using --from-cache)',
+        )
+        parser.add_argument(
+            '--from-index',
+            action='store_true',
+            help='Sync from the built SQLite index (data/meals.db) instead of JSON; only changed meals are written',
+        )
+        parser.add_argument(
+            '--db-file',
+            type=str,
+            default=None,
+            help='Path to the SQLite index (if using --from-index); defaults to the src index path',
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Import with batched bulk_create upserts inside chunked transactions',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Meals per transaction in --bulk and --from-index modes',
+        )
+        parser.add_argument(
+            '--progress-interval',
+            type=float,
+            default=2.0,
+            help='Minimum seconds between IndexingTask progress saves in --bulk and --from-index modes',
         )
 
     def handle(self, *args, **options):
@@ -30,17 +114,24 @@ class Command(BaseCommand):
             status='running',
             started_at=timezone.now()
         )
-        
+
+        self.last_progress = time.monotonic()
         try:
-            if options['from_cache']:
+            if options['from_index']:
+                db_path = options['db_file'] or str(index_db.DB_PATH)
+                if not os.path.exists(db_path):
+                    raise FileNotFoundError(f"Index not found at {db_path}")
+                self.stdout.write(self.style.SUCCESS(f'Syncing from {db_path}...'))
+                self.finish_index_sync(db_path, task, options)
+                return
+            elif options['from_cache']:
                 self.stdout.write(self.style.SUCCESS(f'Loading from {options["json_file"]}...'))
                 json_path = os.path.join(os.getcwd(), options['json_file'])
-                
+
                 if os.path.exists(json_path):
-                    with open(json_path, 'r') as f:
-                        data = json.load(f)
-                        meals_data = data.get('meals', []) if isinstance(data, dict) else data
-                    self.stdout.write(self.style.SUCCESS(f'Loaded {len(meals_data)} meals from file'))
+                    # Streamed: processing starts on the first record; the header gives the total
+                    meals_data = iter_snapshot(json_path)
+                    total = read_header(json_path).get('count', 0)
                 else:
                     self.stdout.write(self.style.ERROR(f'File not found: {json_path}'))
                     task.status = 'failed'
@@ -56,79 +147,206 @@ class Command(BaseCommand):
                     os.environ['THEMEALDB_API_KEY'] = api_config.api_key
                 except APIConfiguration.DoesNotExist:
                     self.stdout.write(self.style.WARNING('No TheMealDB API config found, using default'))
-                
-                # Run the existing indexer
-                build_index()
-                
-                # Load the generated JSON
-                json_path = 'data/meals.json'
-                if os.path.exists(json_path):
-                    with open(json_path, 'r') as f:
-                        meals_data = json.load(f)
-                else:
-                    raise FileNotFoundError(f"Generated JSON not found at {json_path}")
-            
-            task.total_meals = len(meals_data)
+
+                # Run the existing indexer, then sync from the index it just built
+                asyncio.run(build_index())
+                # build_index already mirrors cache stats when CACHE_MIRROR_STATS is set
+                if not index_settings.cache_mirror_stats:
+                    mirror_stats_to_django(cache)
+                self.finish_index_sync(str(index_db.DB_PATH), task, options)
+                return
+
+            task.total_meals = total
             task.save()
-            
+
             # Import meals into Django models
-            imported = 0
-            for meal_data in meals_data:
-                try:
-                    meal_id = int(meal_data.get('idMeal'))
-                    
-                    # Create or update meal
-                    meal, created = Meal.objects.update_or_create(
-                        meal_id=meal_id,
-                        defaults={
-                            'name': meal_data.get('strMeal', ''),
-                            'category': meal_data.get('strCategory', ''),
-                            'area': meal_data.get('strArea', ''),
-                            'instructions': meal_data.get('strInstructions', ''),
-                            'thumbnail': meal_data.get('strMealThumb', ''),
-                            'tags': meal_data.get('strTags', ''),
-                            'youtube_url': meal_data.get('strYoutube', ''),
-                            'source_url': meal_data.get('strSource', ''),
-                            'is_indexed': True,
-                            'last_fetched': timezone.now()
-                        }
-                    )
-                    
-                    # Clear existing ingredients
-                    meal.ingredients.all().delete()
-                    
-                    # Add ingredients
-                    for i in range(1, 21):
-                        ingredient_name = meal_data.get(f'strIngredient{i}', '').strip()
-                        measure = meal_data.get(f'strMeasure{i}', '').strip()
-                        
-                        if ingredient_name:
-                            Ingredient.objects.create(
-                                meal=meal,
-                                name=ingredient_name,
-                                measure=measure,
-                                order=i
-                            )
-                    
-                    imported += 1
-                    task.processed_meals = imported
-                    
-                    if imported % 10 == 0:
-                        task.save()
-                        self.stdout.write(f'Imported {imported}/{len(meals_data)} meals...')
-                        
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f'Error importing meal {meal_data.get("idMeal")}: {e}'))
-            
+            if options['bulk']:
+                imported = self.import_bulk(meals_data, task, options['batch_size'], options['progress_interval'])
+            else:
+                imported = self.import_each(meals_data, task)
+
+            task.total_meals = max(task.total_meals, imported)
+            task.processed_meals = imported
             task.status = 'completed'
             task.completed_at = timezone.now()
             task.save()
-            
+            invalidate_facets(Meal)
+
             self.stdout.write(self.style.SUCCESS(f'Successfully imported {imported} meals'))
-            
+
         except Exception as e:
             task.status = 'failed'
             task.error_message = str(e)
             task.completed_at = timezone.now()
             task.save()
-            self.stdout.write(self.style.ERROR(f'Import failed: {e}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'Import failed: {e}'))
+
+    def finish_index_sync(self, db_path, task, options):
+        synced, skipped = self.sync_from_index(db_path, task, options['batch_size'], options['progress_interval'])
+        task.processed_meals = synced + skipped
+        task.status = 'completed'
+        task.completed_at = timezone.now()
+        task.save()
+        invalidate_facets(Meal)
+        self.stdout.write(self.style.SUCCESS(f'Synced {synced} changed meals ({skipped} unchanged)'))
+
+    def report_progress(self, task, done, total, progress_interval):
+        now = time.monotonic()
+        if now - self.last_progress >= progress_interval:
+            self.last_progress = now
+            task.processed_meals = done
+            task.save(update_fields=['processed_meals'])
+            self.stdout.write(f'Imported {done}/{total} meals...')
+
+    def import_each(self, meals_data, task):
+        """Row-at-a-time import: one update_or_create per meal, one INSERT per ingredient."""
+        imported = 0
+        for meal_data in meals_data:
+            try:
+                meal_id = int(meal_data.get('idMeal'))
+
+                # Create or update meal
+                meal, created = Meal.objects.update_or_create(
+                    meal_id=meal_id,
+                    defaults=meal_defaults(meal_data, timezone.now())
+                )
+
+                # Clear existing ingredients
+                meal.ingredients.all().delete()
+
+                # Add ingredients
+                for order, ingredient_name, measure in meal_ingredients(meal_data):
+                    Ingredient.objects.create(
+                        meal=meal,
+                        name=ingredient_name,
+                        measure=measure,
+                        order=order
+                    )
+
+                imported += 1
+                task.processed_meals = imported
+
+                if imported % 10 == 0:
+                    task.save()
+                    self.stdout.write(f'Imported {imported}/{task.total_meals or "?"} meals...')
+
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Error importing meal {meal_data.get("idMeal")}: {e}'))
+        return imported
+
+    def import_bulk(self, meals_data, task, batch_size, progress_interval):
+        """Chunked import: per chunk, one transaction with bulk upserts for meals and ingredients.
+
+        A failing chunk is rolled back and reported as a whole; progress is written to
+        the IndexingTask at most once per ``progress_interval`` seconds.
+        """
+        imported = 0
+        meals_iter = iter(meals_data)
+        for start in count(0, batch_size):
+            chunk = list(islice(meals_iter, batch_size))
+            if not chunk:
+                break
+            try:
+                with transaction.atomic():
+                    imported_chunk = self.import_chunk(chunk)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(
+                    f'Error importing meals {start + 1}-{start + len(chunk)}: {e}'
+                ))
+                continue
+            imported += imported_chunk
+            self.report_progress(task, imported, task.total_meals or '?', progress_interval)
+        return imported
+
+    def sync_from_index(self, db_path, task, batch_size, progress_interval):
+        """Stream meals and ingredients from the src SQLite index in cursor batches.
+
+        Each batch is compared against the stored ``content_hash`` values and only
+        new or changed meals are written. Returns ``(synced, skipped)``.
+        """
+        conn = index_db.connect_readonly(db_path, immutable=False)
+        try:
+            task.total_meals = conn.execute("SELECT COUNT(*) FROM meals").fetchone()[0]
+            task.save()
+            cur = conn.execute(
+                "SELECT id, name, category, area, instructions, thumbnail, tags FROM meals ORDER BY id"
+            )
+            synced = skipped = 0
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                ids = [r['id'] for r in rows]
+                by_meal = defaultdict(list)
+                placeholders = ','.join('?' * len(ids))
+                # position is the strIngredientN slot, the same order a JSON import writes
+                for r in conn.execute(
+                    f"SELECT meal_id, ingredient, measure, position FROM meal_ingredients "
+                    f"WHERE meal_id IN ({placeholders}) ORDER BY meal_id, position",
+                    ids,
+                ):
+                    by_meal[r['meal_id']].append((r['position'], r['ingredient'], r['measure'] or ''))
+
+                existing = dict(Meal.objects.filter(meal_id__in=ids).values_list('meal_id', 'content_hash'))
+                fetched_at = timezone.now()
+                meals = {}
+                ingredients = {}
+                for r in rows:
+                    fields = {name: r[name] or '' for name in CONTENT_FIELDS}
+                    digest = content_hash(fields, by_meal[r['id']])
+                    if existing.get(r['id']) == digest:
+                        continue
+                    meals[r['id']] = Meal(
+                        meal_id=r['id'], is_indexed=True, last_fetched=fetched_at,
+                        content_hash=digest, **fields
+                    )
+                    for order, ingredient_name, measure in by_meal[r['id']]:
+                        ingredients[(r['id'], ingredient_name)] = Ingredient(
+                            meal_id=r['id'], name=ingredient_name, measure=measure, order=order
+                        )
+                if meals:
+                    with transaction.atomic():
+                        self.write_chunk(meals, ingredients, INDEX_UPDATE_FIELDS)
+                synced += len(meals)
+                skipped += len(rows) - len(meals)
+                self.report_progress(task, synced + skipped, task.total_meals, progress_interval)
+            return synced, skipped
+        finally:
+            conn.close()
+
+    def import_chunk(self, chunk):
+        fetched_at = timezone.now()
+        meals = {}
+        ingredients = {}
+        for meal_data in chunk:
+            try:
+                meal_id = int(meal_data.get('idMeal'))
+            except (TypeError, ValueError):
+                self.stdout.write(self.style.ERROR(f'Error importing meal {meal_data.get("idMeal")}: invalid id'))
+                continue
+            meals[meal_id] = Meal(meal_id=meal_id, **meal_defaults(meal_data, fetched_at))
+            # unique_together (meal, name): keep the first occurrence of a repeated ingredient
+            for order, ingredient_name, measure in meal_ingredients(meal_data):
+                ingredients.setdefault((meal_id, ingredient_name), Ingredient(
+                    meal_id=meal_id, name=ingredient_name, measure=measure, order=order
+                ))
+        if not meals:
+            return 0
+        self.write_chunk(meals, ingredients, MEAL_UPDATE_FIELDS)
+        return len(meals)
+
+    def write_chunk(self, meals, ingredients, update_fields):
+        """Upsert a chunk of meals and replace their ingredients; call inside a transaction."""
+        Meal.objects.bulk_create(
+            meals.values(),
+            update_conflicts=True,
+            unique_fields=['meal_id'],
+            update_fields=update_fields,
+        )
+        Ingredient.objects.filter(meal_id__in=list(meals)).delete()
+        Ingredient.objects.bulk_create(
+            ingredients.values(),
+            update_conflicts=True,
+            unique_fields=['meal', 'name'],
+            update_fields=['measure', 'order'],
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meal',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Digest of indexed content; unchanged meals are skipped on sync', max_length=40),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:04
+
+from django.db import migrations, models
+
+FTS_COLUMNS = 'name, instructions, tags, category, area'
+
+CREATE_FTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS meals_meal_fts USING fts5({FTS_COLUMNS}, "
+    "content='meals_meal', content_rowid='meal_id')",
+    f"""CREATE TRIGGER IF NOT EXISTS meals_meal_fts_ai AFTER INSERT ON meals_meal BEGIN
+        INSERT INTO meals_meal_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.meal_id, new.name, new.instructions, new.tags, new.category, new.area);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS meals_meal_fts_ad AFTER DELETE ON meals_meal BEGIN
+        INSERT INTO meals_meal_fts(meals_meal_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.meal_id, old.name, old.instructions, old.tags, old.category, old.area);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS meals_meal_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON meals_meal BEGIN
+        INSERT INTO meals_meal_fts(meals_meal_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.meal_id, old.name, old.instructions, old.tags, old.category, old.area);
+        INSERT INTO meals_meal_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.meal_id, new.name, new.instructions, new.tags, new.category, new.area);
+    END""",
+    "INSERT INTO meals_meal_fts(meals_meal_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS meals_meal_fts_ai",
+    "DROP TRIGGER IF EXISTS meals_meal_fts_ad",
+    "DROP TRIGGER IF EXISTS meals_meal_fts_au",
+    "DROP TABLE IF EXISTS meals_meal_fts",
+]
+
+
+def create_fts(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends keep the default admin search.
+    # A later migration that makes SQLite remake meals_meal drops these triggers and
+    # must re-run create_fts.
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in CREATE_FTS:
+            schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in DROP_FTS:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0002_meal_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='meal',
+            name='area',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='meal',
+            name='category',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -52,8 +52,8 @@ class Meal(models.Model):
     """Meal data from TheMealDB"""
     meal_id = models.IntegerField(primary_key=True)
     name = models.CharField(max_length=255)
-    category = models.CharField(max_length=100, blank=True)
-    area = models.CharField(max_length=100, blank=True)
+    category = models.CharField(max_length=100, blank=True, db_index=True)
+    area = models.CharField(max_length=100, blank=True, db_index=True)
     instructions = models.TextField()
     thumbnail = models.URLField(blank=True)
     tags = models.CharField(max_length=500, blank=True)
@@ -62,6 +62,8 @@ class Meal(models.Model):
     
     # Metadata
     is_indexed = models.BooleanField(default=False)
+    content_hash = models.CharField(max_length=40, blank=True, editable=False,
+                                    help_text="Digest of indexed content; unchanged meals are skipped on sync")
     last_fetched = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,82 @@
+"""Cheap search, facet and count helpers for the admin changelists.
+
+On SQLite the ``meals_meal`` table is mirrored into the ``meals_meal_fts`` FTS5
+index (see migration 0003), kept in sync by triggers. Other backends fall back to
+Django's default ``icontains`` search.
+"""
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.functional import cached_property
+
+FTS_TABLE = 'meals_meal_fts'
+FACET_CACHE_PREFIX = 'meals:facets:'
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def fts_query(search_term):
+    """Turn free admin input into an FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r'\w+', search_term)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def filter_by_fts(queryset, search_term):
+    """Restrict a Meal queryset to FTS matches, or return None if FTS can't be used."""
+    query = fts_query(search_term)
+    if not query or not fts_available():
+        return None
+    return queryset.filter(
+        meal_id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [query])
+    )
+
+
+def facet_values(model, field):
+    """Distinct non-empty values of ``field``, cached so list filters skip the DISTINCT scan."""
+    key = f'{FACET_CACHE_PREFIX}{model._meta.label_lower}:{field}'
+    values = cache.get(key)
+    if values is None:
+        values = list(
+            model.objects.exclude(**{field: ''}).order_by(field).values_list(field, flat=True).distinct()
+        )
+        cache.set(key, values, getattr(settings, 'MEAL_ADMIN_FACET_CACHE_SECONDS', 300))
+    return values
+
+
+def cached_total(model):
+    key = f'{FACET_CACHE_PREFIX}{model._meta.label_lower}:count'
+    total = cache.get(key)
+    if total is None:
+        total = model.objects.count()
+        cache.set(key, total, getattr(settings, 'MEAL_ADMIN_FACET_CACHE_SECONDS', 300))
+    return total
+
+
+def invalidate_facets(model, fields=('category', 'area')):
+    """Drop cached facets and totals after bulk writes (imports, syncs)."""
+    label = model._meta.label_lower
+    cache.delete_many([f'{FACET_CACHE_PREFIX}{label}:{field}' for field in fields] +
+                      [f'{FACET_CACHE_PREFIX}{label}:count'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never runs an unbounded COUNT(*).
+
+    The unfiltered changelist uses the cached table total; filtered or searched
+    lists count at most ``MEAL_ADMIN_COUNT_LIMIT`` rows, so large result sets show
+    that many pages rather than an exact figure.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            return cached_total(queryset.model)
+        limit = getattr(settings, 'MEAL_ADMIN_COUNT_LIMIT', 10000)
+        return queryset[:limit].count()
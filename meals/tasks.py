@@ -0,0 +1,105 @@
+"""Sharded re-indexing: one Celery task per crawl letter, merged by a single writer.
+
+Each ``index_shard`` fetches one ``search.php?f=<letter>`` shard and normalizes it
+into row tuples on disk; the chord body ``merge_index_shards`` is the only task
+that writes ``meals.db`` (SQLite allows one writer), then syncs the Django Meal
+table from the merged index. Progress is aggregated into the IndexingTask row.
+"""
+import asyncio
+import shutil
+import time
+from io import StringIO
+
+from celery import chord, group, shared_task
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from src import db as index_db
+from src.config import settings as index_settings
+from src.indexer import build_shard, merge_shards
+from src.mealdb_api import MealDBClient, SHARD_LETTERS
+
+from .models import IndexingTask
+
+
+def shard_dir(task_id):
+    return index_settings.data_dir / 'shards' / str(task_id)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=5)
+def index_shard(self, task_id, letter):
+    try:
+        meals = asyncio.run(MealDBClient().fetch_shard(letter))
+    except Exception as exc:
+        raise self.retry(exc=exc)
+    count = build_shard(meals, shard_dir(task_id) / f'{letter}.json')
+    IndexingTask.objects.filter(pk=task_id).update(total_meals=F('total_meals') + count)
+    return count
+
+
+@shared_task
+def merge_index_shards(shard_counts, task_id):
+    interval = settings.INDEX_PROGRESS_INTERVAL
+    last_progress = [time.monotonic()]
+
+    def progress(done, total):
+        now = time.monotonic()
+        if now - last_progress[0] >= interval:
+            last_progress[0] = now
+            IndexingTask.objects.filter(pk=task_id).update(processed_meals=done, total_meals=total)
+
+    directory = shard_dir(task_id)
+    paths = sorted(directory.glob('*.json'))
+    # Only a crawl of every letter is a full snapshot that may delete missing meals
+    complete = {path.stem for path in paths} >= set(SHARD_LETTERS)
+    merged = merge_shards(paths, progress=progress, prune=complete)
+
+    # Refresh Django meals from the merged index (only changed rows are written)
+    from .management.commands.import_meals import Command
+    task = IndexingTask.objects.get(pk=task_id)
+    command = Command(stdout=StringIO())
+    command.last_progress = time.monotonic()
+    command.sync_from_index(str(index_db.DB_PATH), task, 500, interval)
+
+    task.refresh_from_db()
+    task.status = 'completed'
+    task.completed_at = timezone.now()
+    task.save()
+    shutil.rmtree(directory, ignore_errors=True)
+    return merged
+
+
+@shared_task
+def mark_index_failed(request, exc, traceback, task_id):
+    fail_task(task_id, exc)
+
+
+def fail_task(task_id, exc):
+    IndexingTask.objects.filter(pk=task_id).update(
+        status='failed', error_message=str(exc), completed_at=timezone.now()
+    )
+
+
+def start_reindex(task=None, letters=None):
+    """Dispatch the sharded crawl/merge pipeline for ``task`` (a new IndexingTask by default)."""
+    task = task or IndexingTask.objects.create()
+    task.status = 'running'
+    task.started_at = timezone.now()
+    task.total_meals = 0
+    task.processed_meals = 0
+    task.error_message = ''
+    task.save()
+    shutil.rmtree(shard_dir(task.pk), ignore_errors=True)
+
+    workflow = chord(
+        group(index_shard.s(task.pk, letter) for letter in (letters or SHARD_LETTERS)),
+        merge_index_shards.s(task.pk).on_error(mark_index_failed.s(task.pk)),
+    )
+    try:
+        workflow.apply_async()
+    except Exception as e:
+        # Broker unreachable, or a shard failed inline in eager mode
+        fail_task(task.pk, e)
+    task.refresh_from_db()
+    return task
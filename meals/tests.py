@@ -1,3 +1,315 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+
+from mealdb_admin.celery import app as celery_app
+
+from src import compression, db as index_db
+from src.analytics import SearchEvent
+from src.cache import FileCache, mirror_stats_to_django
+from src.config import settings as index_settings
+from src.delta import read_header as read_delta_header
+from src.mealdb_api import MealDBClient
+from src.snapshot import write_snapshot
+from src.suggest import Suggester
+from src.warmup import hot_queries
+
+from .admin import MealAdmin
+from .analytics import write_events
+from .models import CacheEntry, Meal, Ingredient, IndexingTask, SearchQuery
+from .search import EstimatedCountPaginator, facet_values, invalidate_facets
+from .tasks import shard_dir, start_reindex
+
+
+def sample_meal(meal_id, name, ingredients):
+    meal = {
+        'idMeal': str(meal_id),
+        'strMeal': name,
+        'strCategory': 'Pasta',
+        'strArea': 'Italian',
+        'strInstructions': 'Cook it.',
+        'strMealThumb': None,
+        'strTags': None,
+    }
+    for i, (ingredient, measure) in enumerate(ingredients, start=1):
+        meal[f'strIngredient{i}'] = ingredient
+        meal[f'strMeasure{i}'] = measure
+    return meal
+
+
+def import_json(meals, *extra):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'meals.json')
+        with open(path, 'w') as f:
+            json.dump({'meals': meals}, f)
+        call_command('import_meals', '--from-cache', '--json-file', path, *extra, stdout=StringIO())
+
+
+class ImportMealsTests(TestCase):
+    def test_bulk_import_matches_row_import(self):
+        meals = [
+            sample_meal(1, 'Pasta', [('Pasta', '200g'), ('Garlic', '2 cloves')]),
+            sample_meal(2, 'Soup', [('Water', '1l'), ('Salt', '')]),
+        ]
+        import_json(meals)
+        row_import = sorted(Ingredient.objects.values_list('meal_id', 'name', 'measure', 'order'))
+        Meal.objects.all().delete()
+
+        import_json(meals, '--bulk', '--batch-size', '1')
+        self.assertEqual(Meal.objects.count(), 2)
+        self.assertEqual(sorted(Ingredient.objects.values_list('meal_id', 'name', 'measure', 'order')), row_import)
+        task = IndexingTask.objects.latest('id')
+        self.assertEqual(task.status, 'completed')
+        self.assertEqual(task.processed_meals, 2)
+
+    def test_bulk_import_updates_existing_meals(self):
+        import_json([sample_meal(1, 'Pasta', [('Pasta', '200g'), ('Garlic', '2 cloves')])], '--bulk')
+        import_json([sample_meal(1, 'Better Pasta', [('Pasta', '250g'), ('Pasta', '1kg')])], '--bulk')
+        meal = Meal.objects.get(meal_id=1)
+        self.assertEqual(meal.name, 'Better Pasta')
+        self.assertEqual(list(meal.ingredients.values_list('name', 'measure')), [('Pasta', '250g')])
+
+    def test_streams_ndjson_snapshot(self):
+        meals = [sample_meal(i, f'Meal {i}', [('Salt', '1g')]) for i in range(1, 6)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'meals.ndjson')
+            write_snapshot(path, iter(meals), count=len(meals))
+            call_command('import_meals', '--from-cache', '--json-file', path, '--bulk', '--batch-size', '2',
+                         stdout=StringIO())
+        self.assertEqual(Meal.objects.count(), 5)
+        task = IndexingTask.objects.latest('id')
+        self.assertEqual((task.total_meals, task.processed_meals), (5, 5))
+
+
+class SyncFromIndexTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.db_path = os.path.join(self.tmpdir.name, 'meals.db')
+        self.original_db_path = index_db.DB_PATH
+        index_db.DB_PATH = Path(self.db_path)
+        self.addCleanup(setattr, index_db, 'DB_PATH', self.original_db_path)
+        index_db.init_db()
+
+    def sync(self):
+        out = StringIO()
+        call_command('import_meals', '--from-index', '--db-file', self.db_path, stdout=out)
+        return out.getvalue()
+
+    def test_sync_writes_only_changed_meals(self):
+        index_db.upsert_meals([
+            sample_meal(1, 'Pasta', [('Pasta', '200g'), ('Garlic', '2 cloves')]),
+            sample_meal(2, 'Soup', [('Water', '1l')]),
+        ])
+        self.assertIn('Synced 2 changed meals (0 unchanged)', self.sync())
+        meal = Meal.objects.get(meal_id=1)
+        self.assertEqual(list(meal.ingredients.values_list('name', 'measure', 'order')),
+                         [('Pasta', '200g', 1), ('Garlic', '2 cloves', 2)])
+
+        index_db.upsert_meals([sample_meal(2, 'Tomato Soup', [('Water', '1l'), ('Tomato', '3')])])
+        self.assertIn('Synced 1 changed meals (1 unchanged)', self.sync())
+        self.assertEqual(Meal.objects.get(meal_id=2).name, 'Tomato Soup')
+        self.assertEqual(Ingredient.objects.filter(meal_id=2).count(), 2)
+        self.assertEqual(IndexingTask.objects.latest('id').processed_meals, 2)
+
+    def test_sync_keeps_recipe_ingredient_order(self):
+        index_db.upsert_meals([sample_meal(1, 'Crumble', [('Apple', '3'), ('Milk', '1 cup')])])
+        loaf = sample_meal(2, 'Loaf', [('Zucchini', '1'), ('Apple', '2'), ('Milk', '1 cup')])
+        index_db.upsert_meals([loaf])
+        self.sync()
+        self.assertEqual(list(Meal.objects.get(meal_id=2).ingredients.values_list('name', 'order')),
+                         [('Zucchini', 1), ('Apple', 2), ('Milk', 3)])
+        import_json([loaf], '--bulk')
+        self.assertIn('Synced 0 changed meals (2 unchanged)', self.sync())
+
+    def test_sync_skips_meals_imported_from_json(self):
+        meal = sample_meal(1, 'Pasta', [('Pasta', '200g')])
+        index_db.upsert_meals([meal])
+        import_json([meal], '--bulk')
+        self.assertIn('Synced 0 changed meals (1 unchanged)', self.sync())
+
+
+class ShardedReindexTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.original_db_path = index_db.DB_PATH
+        index_db.DB_PATH = Path(self.tmpdir.name) / 'meals.db'
+        self.addCleanup(setattr, index_db, 'DB_PATH', self.original_db_path)
+        for name, value in (('data_dir', Path(self.tmpdir.name)), ('delta_dir', Path(self.tmpdir.name) / 'deltas')):
+            patcher = mock.patch.object(index_settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Run shards and the merge inline, without a broker (conf keys carry the CELERY_ namespace)
+        self.addCleanup(celery_app.conf.update, CELERY_TASK_ALWAYS_EAGER=celery_app.conf.task_always_eager)
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=True)
+
+    def test_shards_merge_into_index_and_meals(self):
+        shards = {
+            'a': [sample_meal(1, 'Apple Pie', [('Apple', '3')])],
+            'b': [sample_meal(2, 'Beef Stew', [('Beef', '1kg')]),
+                  sample_meal(1, 'Apple Pie', [('Apple', '3')])],
+        }
+
+        async def fetch_shard(client, letter):
+            return shards[letter]
+
+        with mock.patch.object(MealDBClient, 'fetch_shard', fetch_shard):
+            task = start_reindex(letters=['a', 'b'])
+
+        self.assertEqual(task.status, 'completed', task.error_message)
+        self.assertEqual(task.total_meals, 2)
+        self.assertEqual(sorted(Meal.objects.values_list('name', flat=True)), ['Apple Pie', 'Beef Stew'])
+        self.assertEqual(len(index_db.search_meals('beef')), 1)
+        self.assertFalse(shard_dir(task.pk).exists())
+
+    def test_full_reindex_writes_a_delta(self):
+        shards = {
+            'a': [sample_meal(1, 'Apple Pie', [('Apple', '3')])],
+            'b': [sample_meal(2, 'Beef Stew', [('Beef', '1kg')])],
+        }
+
+        async def fetch_shard(client, letter):
+            return shards[letter]
+
+        with mock.patch.object(MealDBClient, 'fetch_shard', fetch_shard), \
+                mock.patch('meals.tasks.SHARD_LETTERS', ['a', 'b']):
+            start_reindex()
+            shards['a'] = [sample_meal(1, 'Apple Crumble', [('Apple', '3')])]
+            shards['b'] = []
+            task = start_reindex()
+
+        self.assertEqual(task.status, 'completed', task.error_message)
+        path = index_settings.delta_dir / 'delta-00000001-00000002.ndjson'
+        self.assertEqual(read_delta_header(path)['count'], 2)
+        with compression.open_text(path) as f:
+            records = [json.loads(line) for line in list(f)[1:]]
+        self.assertEqual([(r['op'], r['id']) for r in records], [('upsert', 1), ('delete', 2)])
+        self.assertEqual(index_db.search_meals('beef'), [])
+        self.assertEqual(Meal.objects.get(meal_id=1).name, 'Apple Crumble')
+
+    def test_failed_shard_marks_task_failed(self):
+        async def fetch_shard(client, letter):
+            raise RuntimeError('upstream down')
+
+        with mock.patch.object(MealDBClient, 'fetch_shard', fetch_shard), \
+                mock.patch('meals.tasks.index_shard.max_retries', 0):
+            task = start_reindex(letters=['a'])
+
+        self.assertEqual(task.status, 'failed')
+        self.assertIn('upstream down', task.error_message)
+
+
+class MealAdminSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        import_json([
+            sample_meal(1, 'Spaghetti Bolognese', [('Beef', '500g')]),
+            sample_meal(2, 'Tomato Soup', [('Tomato', '3')]),
+        ], '--bulk')
+        self.model_admin = MealAdmin(Meal, admin.site)
+        self.request = RequestFactory().get('/admin/meals/meal/')
+
+    def search(self, term):
+        queryset, may_have_duplicates = self.model_admin.get_search_results(
+            self.request, Meal.objects.all(), term
+        )
+        self.assertFalse(may_have_duplicates)
+        return sorted(queryset.values_list('meal_id', flat=True))
+
+    def test_search_uses_fts_index_with_prefixes(self):
+        self.assertEqual(self.search('spag'), [1])
+        self.assertEqual(self.search('tomato soup'), [2])
+        self.assertEqual(self.search('cook'), [1, 2])
+
+    def test_fts_index_follows_updates_and_deletes(self):
+        Meal.objects.filter(meal_id=2).update(name='Gazpacho')
+        self.assertEqual(self.search('gazpacho'), [2])
+        self.assertEqual(self.search('tomato'), [])
+        Meal.objects.filter(meal_id=1).delete()
+        self.assertEqual(self.search('spaghetti'), [])
+
+    def test_facets_and_total_are_cached_until_invalidated(self):
+        self.assertEqual(facet_values(Meal, 'category'), ['Pasta'])
+        Meal.objects.filter(meal_id=2).update(category='Soup')
+        self.assertEqual(facet_values(Meal, 'category'), ['Pasta'])
+        invalidate_facets(Meal)
+        self.assertEqual(facet_values(Meal, 'category'), ['Pasta', 'Soup'])
+        self.assertEqual(EstimatedCountPaginator(Meal.objects.all(), 10).count, 2)
+        with self.settings(MEAL_ADMIN_COUNT_LIMIT=1):
+            self.assertEqual(EstimatedCountPaginator(Meal.objects.filter(area='Italian'), 10).count, 1)
+
+    def test_admin_adds_and_deletes_refresh_the_cached_total(self):
+        self.assertEqual(EstimatedCountPaginator(Meal.objects.all(), 10).count, 2)
+        meal = Meal(meal_id=3, name='Chili', category='Stew', area='Mexican')
+        self.model_admin.save_model(self.request, meal, None, False)
+        self.assertEqual(EstimatedCountPaginator(Meal.objects.all(), 10).count, 3)
+        self.assertEqual(facet_values(Meal, 'category'), ['Pasta', 'Stew'])
+        self.model_admin.delete_model(self.request, meal)
+        self.assertEqual(EstimatedCountPaginator(Meal.objects.all(), 10).count, 2)
+        self.model_admin.delete_queryset(self.request, Meal.objects.filter(meal_id=1))
+        self.assertEqual(EstimatedCountPaginator(Meal.objects.all(), 10).count, 1)
+
+    def test_changelist_renders_with_cached_filters(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'admin123')
+        self.client.login(username='admin', password='admin123')
+        response = self.client.get('/admin/meals/meal/', {'q': 'soup', 'area': 'Italian'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Tomato Soup')
+        self.assertNotContains(response, 'Spaghetti Bolognese')
+
+
+class AnalyticsSinkTests(TestCase):
+    def test_write_events_bulk_inserts_queries_and_known_results(self):
+        import_json([sample_meal(1, 'Pasta', [('Pasta', '200g')])])
+        write_events([
+            SearchEvent(query='pasta', response_time=0.02, results=[(1, -3.0), (99, -1.0)]),
+            SearchEvent(query='nothing', response_time=0.01, use_toolfront=True, model_used='openai:gpt-4o'),
+        ])
+        pasta = SearchQuery.objects.get(query='pasta')
+        self.assertEqual(pasta.results_count, 2)
+        self.assertEqual(list(pasta.results.values_list('meal_id', 'position', 'score')), [(1, 1, -3.0)])
+        self.assertTrue(SearchQuery.objects.get(query='nothing').use_toolfront)
+
+
+class CacheStatsMirrorTests(TestCase):
+    def test_mirror_accumulates_deltas_into_cache_entry(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = FileCache(ttl_hours=1, base_dir=Path(tmpdir))
+            backend.get('a')
+            backend.set('a', 1)
+            backend.get('a')
+            mirror_stats_to_django(backend)
+            backend.get('a')
+            mirror_stats_to_django(backend)
+        entry = CacheEntry.objects.get(key='backend:file')
+        self.assertEqual(entry.hit_count, 2)
+        self.assertEqual(json.loads(entry.value), {'hits': 2, 'misses': 1, 'sets': 1, 'hit_rate': 0.6667})
+        self.assertFalse(entry.is_expired)
+
+
+class SuggestEndpointTests(TestCase):
+    def test_returns_ranked_suggestions(self):
+        suggester = Suggester([('Pasta', 'ingredient', 9), ('Pasta Bake', 'meal', 1), ('Soup', 'meal', 1)])
+        with mock.patch('src.suggest.get_suggester', return_value=suggester):
+            response = self.client.get('/suggest', {'q': 'pas', 'n': '5'})
+            bad = self.client.get('/suggest', {'q': 'pas', 'n': 'many'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s['text'] for s in response.json()['suggestions']], ['Pasta Bake', 'Pasta'])
+        self.assertEqual(bad.status_code, 400)
+
+
+class WarmupHistoryTests(TestCase):
+    def test_hot_queries_come_from_search_history(self):
+        for query in ['beef stew', 'chicken curry', 'chicken curry', 'soup', 'chicken curry', 'beef stew']:
+            SearchQuery.objects.create(query=query, response_time=0.01)
+        self.assertEqual(hot_queries(2), ['chicken curry', 'beef stew'])
@@ -1,3 +1,20 @@
-from django.shortcuts import render
+from django.http import HttpResponse, JsonResponse
 
-# Create your views here.
+from src import metrics, suggest
+
+
+def prometheus_metrics(request):
+    """Prometheus text exposition of per-stage query latency (this process + saved snapshot)."""
+    snapshot = metrics.load_snapshot()
+    snapshot.merge(metrics.registry)
+    return HttpResponse(snapshot.render_prometheus(), content_type='text/plain; version=0.0.4')
+
+
+def suggestions(request):
+    """As-you-type suggestions: ``?q=<prefix>&n=<count>`` -> meal names and ingredients by popularity."""
+    try:
+        n = int(request.GET.get('n', 10))
+    except ValueError:
+        return JsonResponse({'error': 'n must be an integer'}, status=400)
+    prefix = request.GET.get('q', '')
+    return JsonResponse({'q': prefix, 'suggestions': suggest.suggest(prefix, n)})
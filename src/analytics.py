@@ -0,0 +1,146 @@
+from __future__ import annotations
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .config import settings
+from .logger import logger
+
+
+@dataclass
+class SearchEvent:
+    query: str
+    response_time: float
+    results: List[Tuple[int, float]] = field(default_factory=list)  # (meal id, bm25 score) in rank order
+    use_toolfront: bool = False
+    model_used: str = ""
+
+
+Sink = Callable[[List[SearchEvent]], None]
+
+
+def django_sink(events: List[SearchEvent]) -> None:
+    """Persist events as SearchQuery/SearchResult rows, setting up Django on first use."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mealdb_admin.settings")
+        django.setup()
+    from meals.analytics import write_events
+
+    write_events(events)
+
+
+class AnalyticsRecorder:
+    """Buffers search events in memory and hands them to a sink from a background thread.
+
+    ``record`` only appends under a lock; the flusher thread wakes when ``batch_size``
+    events are pending or every ``flush_interval`` seconds. The buffer is a ring of
+    ``capacity`` events: when it is full the oldest pending event is evicted and
+    counted as dropped, so recent searches win and ``record`` never blocks.
+    """
+
+    def __init__(self, sink: Optional[Sink] = None, capacity: int | None = None,
+                 batch_size: int | None = None, flush_interval: float | None = None):
+        self.sink = sink or django_sink
+        self.capacity = capacity or settings.analytics_buffer_size
+        self.batch_size = batch_size or settings.analytics_batch_size
+        self.flush_interval = flush_interval or settings.analytics_flush_seconds
+        self._buffer: Deque[SearchEvent] = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.recorded = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+
+    def record(self, event: SearchEvent) -> bool:
+        """Buffer ``event``; returns False when the oldest pending event was evicted for it."""
+        with self._lock:
+            evicted = len(self._buffer) >= self.capacity
+            if evicted:
+                self.dropped += 1
+            self._buffer.append(event)  # deque(maxlen=capacity) pops the oldest itself
+            self.recorded += 1
+            full = len(self._buffer) >= self.batch_size
+        if self._pid != os.getpid():
+            self._start()
+        if full:
+            self._wake.set()
+        return not evicted
+
+    def _start(self) -> None:
+        # Threads don't survive fork, so each process starts its own flusher
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="analytics-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write out everything buffered so far, in ``batch_size`` chunks. Returns events written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    return written
+                try:
+                    self.sink(batch)
+                    self.flushed += len(batch)
+                    written += len(batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    logger.warning("Dropped {} analytics events: {}", len(batch), e)
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._buffer)
+        return {
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "pending": pending,
+        }
+
+
+_recorder: Optional[AnalyticsRecorder] = None
+
+
+def get_recorder() -> AnalyticsRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = AnalyticsRecorder()
+        atexit.register(_recorder.close)
+    return _recorder
+
+
+def record_search(event: SearchEvent) -> None:
+    if settings.analytics_enabled:
+        get_recorder().record(event)
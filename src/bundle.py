@@ -0,0 +1,268 @@
+from __future__ import annotations
+import hashlib
+import io
+import json
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from . import compression, db
+from .config import settings
+from .logger import logger
+from .snapshot import read_header
+
+# A bundle is one compressed tar stream: manifest.json first (checked before anything
+# is extracted), then the index, snapshot and cache, then SHA256SUMS of every member.
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+CHECKSUMS = "SHA256SUMS"
+INDEX_MEMBER = "index/meals.db"
+SNAPSHOT_MEMBER = "data/meals.ndjson"
+CACHE_PREFIX = "cache/"
+CHUNK = 1 << 20
+
+
+class BundleError(RuntimeError):
+    """The bundle is malformed, fails verification, or does not fit this install."""
+
+
+def _cache_files(backend: str) -> Iterator[Tuple[Path, str]]:
+    """(local path, member name) pairs holding the API cache of ``backend``."""
+    if backend == "file":
+        for path in sorted(settings.cache_dir.glob("*.json")):
+            yield path, CACHE_PREFIX + path.name
+    elif backend == "sqlite" and settings.cache_sqlite_path.exists():
+        yield settings.cache_sqlite_path, CACHE_PREFIX + "cache.db"
+
+
+def _sqlite_backup(source: Path, dest: Path) -> None:
+    """Copy one SQLite database over another with the backup API.
+
+    Safe while either side is live: the source is read as a consistent snapshot, and
+    the destination is written through its own journal, so a WAL-mode destination's
+    -wal/-shm files stay in step (renaming over it would leave them to be replayed
+    onto the new content).
+    """
+    src, dst = sqlite3.connect(str(source)), sqlite3.connect(str(dest))
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def _sqlite_copy(path: Path, tmpdir: str) -> Path:
+    """A consistent copy of a live SQLite file (its writers may still be running)."""
+    copy = Path(tmpdir) / path.name
+    _sqlite_backup(path, copy)
+    return copy
+
+
+def _index_info(path: Path) -> Tuple[int, int, int]:
+    """(schema version, delta generation, meal count) of an index file."""
+    conn = db.connect_readonly(path, immutable=False)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        meals = conn.execute("SELECT count(*) FROM meal_facts").fetchone()[0]
+        return version, db.get_generation(conn.cursor()), meals
+    finally:
+        conn.close()
+
+
+def _counts(meals: int, backend: str, snapshot: Optional[Path]) -> Dict[str, int]:
+    counts = {"meals": meals}
+    if snapshot is not None:
+        counts["snapshot_meals"] = read_header(snapshot).get("count", -1)
+    if backend == "file":
+        counts["cache_entries"] = sum(1 for _ in _cache_files(backend))
+    elif backend == "sqlite" and settings.cache_sqlite_path.exists():
+        conn = sqlite3.connect(str(settings.cache_sqlite_path))
+        try:
+            counts["cache_entries"] = conn.execute("SELECT count(*) FROM cache").fetchone()[0]
+        finally:
+            conn.close()
+    return counts
+
+
+def _add_bytes(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+
+class _HashingReader(io.RawIOBase):
+    """File wrapper hashing what tarfile reads, so each member is read from disk once."""
+
+    def __init__(self, f: IO[bytes]):
+        self.f = f
+        self.sha = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.f.read(size)
+        self.sha.update(data)
+        return data
+
+
+def export_bundle(path: Path | str, include_cache: bool = True, include_snapshot: bool = True,
+                  codec: str | None = None) -> Dict[str, Any]:
+    """Write the index, snapshot and API cache to one compressed, checksummed archive.
+
+    Returns the manifest. The Redis cache backend has no local files and is skipped.
+    """
+    if not db.DB_PATH.exists():
+        raise BundleError(f"Index not found at {db.DB_PATH}; run `init` first")
+    path = Path(path)
+    backend = settings.cache_backend.lower() if include_cache else "none"
+    if backend == "redis":
+        logger.warning("CACHE_BACKEND=redis keeps no local files; bundling without the API cache")
+        backend = "none"
+    snapshot = settings.data_dir / "meals.ndjson"
+    snapshot = snapshot if include_snapshot and snapshot.exists() else None
+    sums: List[str] = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index = _sqlite_copy(db.DB_PATH, tmpdir)
+        schema_version, index_generation, meals = _index_info(index)
+        manifest = {
+            "format": FORMAT_VERSION,
+            "schema_version": schema_version,
+            "index_generation": index_generation,
+            "created_at": time.time(),
+            "cache_backend": backend,
+            "counts": _counts(meals, backend, snapshot),
+        }
+        files = [(index, INDEX_MEMBER)]
+        if snapshot is not None:
+            files.append((snapshot, SNAPSHOT_MEMBER))
+        for local, name in _cache_files(backend):
+            files.append((_sqlite_copy(local, tmpdir) if backend == "sqlite" else local, name))
+
+        with compression.open_binary(path, "w", codec) as out, tarfile.open(fileobj=out, mode="w|") as tar:
+            _add_bytes(tar, MANIFEST, json.dumps(manifest, indent=2).encode("utf-8"))
+            for local, name in files:
+                with local.open("rb") as f:
+                    reader = _HashingReader(f)
+                    info = tar.gettarinfo(str(local), arcname=name)
+                    tar.addfile(info, reader)
+                sums.append(f"{reader.sha.hexdigest()}  {name}")
+            _add_bytes(tar, CHECKSUMS, ("\n".join(sums) + "\n").encode("utf-8"))
+    logger.info(f"Exported bundle {path} ({path.stat().st_size / 1e6:.1f}MB, {len(sums)} files)")
+    return manifest
+
+
+def _check_manifest(manifest: Dict[str, Any], force: bool) -> None:
+    if manifest.get("format") != FORMAT_VERSION:
+        raise BundleError(f"Unsupported bundle format {manifest.get('format')!r}")
+    if manifest.get("schema_version", 0) > db.SCHEMA_VERSION:
+        raise BundleError(f"Bundle schema v{manifest['schema_version']} is newer than this code "
+                          f"(v{db.SCHEMA_VERSION}); upgrade before importing")
+    current = _installed_generation()
+    if not force and current > manifest.get("index_generation", 0):
+        raise BundleError(f"Bundle is at index generation {manifest.get('index_generation', 0)}, older than "
+                          f"the installed {current}; pass force to downgrade")
+
+
+def _installed_generation() -> int:
+    """Index generation of this node: the last imported bundle's, or later if deltas were applied."""
+    generation = installed_manifest().get("index_generation", 0)
+    if db.DB_PATH.exists():
+        conn = db.connect_readonly(db.DB_PATH, immutable=False)
+        try:
+            generation = max(generation, db.get_generation(conn.cursor()))
+        finally:
+            conn.close()
+    return generation
+
+
+def installed_manifest() -> Dict[str, Any]:
+    """Manifest of the last imported bundle, or ``{}``."""
+    path = settings.data_dir / "bundle.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _destination(name: str, backend: str) -> Optional[Path]:
+    if name == INDEX_MEMBER:
+        return db.DB_PATH
+    if name == SNAPSHOT_MEMBER:
+        return settings.data_dir / "meals.ndjson"
+    if name.startswith(CACHE_PREFIX):
+        if backend != settings.cache_backend.lower():
+            return None
+        if backend == "sqlite":
+            return settings.cache_sqlite_path
+        return settings.cache_dir / name[len(CACHE_PREFIX):]
+    return None
+
+
+def import_bundle(path: Path | str, force: bool = False) -> Dict[str, Any]:
+    """Stream-extract a bundle, verify every checksum, then move the files into place.
+
+    Nothing is installed unless the whole archive verifies. Returns the manifest.
+    """
+    path = Path(path)
+    settings.data_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".bundle-", dir=settings.data_dir))
+    try:
+        manifest: Optional[Dict[str, Any]] = None
+        expected: Dict[str, str] = {}
+        staged: Dict[str, Tuple[Path, str]] = {}
+        with compression.open_binary(path) as raw, tarfile.open(fileobj=raw, mode="r|") as tar:
+            for member in tar:
+                name = member.name
+                if not member.isfile() or name.startswith("/") or ".." in Path(name).parts:
+                    raise BundleError(f"Refusing bundle member {name!r}")
+                f = tar.extractfile(member)
+                if name == MANIFEST:
+                    manifest = json.loads(f.read())
+                    _check_manifest(manifest, force)
+                    continue
+                if manifest is None:
+                    raise BundleError(f"{path} does not start with {MANIFEST}")
+                if name == CHECKSUMS:
+                    for line in f.read().decode("utf-8").splitlines():
+                        digest, _, member_name = line.partition("  ")
+                        expected[member_name] = digest
+                    continue
+                target = staging / f"{len(staged)}.part"
+                sha = hashlib.sha256()
+                with target.open("wb") as out:
+                    for chunk in iter(lambda: f.read(CHUNK), b""):
+                        sha.update(chunk)
+                        out.write(chunk)
+                staged[name] = (target, sha.hexdigest())
+        if manifest is None or not expected:
+            raise BundleError(f"{path} is truncated: missing {MANIFEST} or {CHECKSUMS}")
+        if set(expected) != set(staged):
+            raise BundleError(f"Bundle members do not match {CHECKSUMS}: "
+                              f"{sorted(set(expected) ^ set(staged))}")
+        bad = [name for name, (_, digest) in staged.items() if expected[name] != digest]
+        if bad:
+            raise BundleError(f"Checksum mismatch for {bad}")
+
+        backend = manifest.get("cache_backend", "none")
+        if backend not in ("none", settings.cache_backend.lower()):
+            logger.warning(f"Bundle cache is for the {backend!r} backend but CACHE_BACKEND="
+                           f"{settings.cache_backend!r}; skipping the API cache")
+        for name, (target, _) in staged.items():
+            dest = _destination(name, backend)
+            if dest is None:
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if name == INDEX_MEMBER or (backend == "sqlite" and name.startswith(CACHE_PREFIX)):
+                _sqlite_backup(target, dest)
+            else:
+                shutil.move(str(target), str(dest))  # a rename when on the same filesystem
+        installed = dict(manifest, imported_at=time.time())
+        (settings.data_dir / "bundle.json").write_text(json.dumps(installed, indent=2))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    db.reset_serving_connections()
+    logger.info(f"Imported bundle {path}: {manifest['counts']}")
+    return manifest
@@ -1,17 +1,108 @@
 from __future__ import annotations
-import json
+import asyncio
 import hashlib
+import os
+import sqlite3
+import threading
 import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
+from . import compression
 from .config import settings
 from .logger import logger
 
+try:
+    import redis  # Optional: shared cache across nodes
+    _REDIS_AVAILABLE = True
+except Exception:
+    _REDIS_AVAILABLE = False
 
-class FileCache:
-    def __init__(self, ttl_hours: int | None = None, base_dir: Path | None = None):
+
+class CacheBackend:
+    """Key/value cache for API payloads with TTL and hit/miss counters.
+
+    Subclasses implement ``_get`` (return the payload or None when missing/expired)
+    and ``_set``; ``get``/``set`` add the bookkeeping. Payloads are stored as
+    ``compression.dumps`` bytes; entries written uncompressed still read.
+
+    Backends do blocking I/O, so coroutines use the ``a*`` variants, which run the
+    call in a worker thread; ``get_many`` resolves a batch of keys in one round
+    trip where the backend allows (``_get_many``).
+    """
+
+    name = "base"
+
+    def __init__(self, ttl_hours: int | None = None):
         self.ttl_seconds = (ttl_hours or settings.cache_expiry_hours) * 3600
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        # Counters already mirrored into Django CacheEntry rows
+        self._mirrored = {"hits": 0, "misses": 0, "sets": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        data = self._get(key)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def set(self, key: str, data: Any) -> None:
+        self._set(key, data)
+        self.sets += 1
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Payloads of the cached ``keys``; missing and expired keys are left out."""
+        keys = list(dict.fromkeys(keys))
+        found = self._get_many(keys) if keys else {}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, data: Any) -> None:
+        await asyncio.to_thread(self.set, key, data)
+
+    async def aget_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.get_many, keys)
+
+    def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        found = {}
+        for key in keys:
+            data = self._get(key)
+            if data is not None:
+                found[key] = data
+        return found
+
+    def _set(self, key: str, data: Any) -> None:
+        raise NotImplementedError
+
+    def _expired(self, ts: float) -> bool:
+        return self.ttl_seconds > 0 and (time.time() - ts) > self.ttl_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class FileCache(CacheBackend):
+    name = "file"
+
+    def __init__(self, ttl_hours: int | None = None, base_dir: Path | None = None):
+        super().__init__(ttl_hours)
         self.base_dir = (base_dir or settings.cache_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
 
@@ -19,29 +110,165 @@ class FileCache:
         digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
         return self.base_dir / f"{digest}.json"
 
-    def get(self, key: str) -> Optional[Any]:
+    def _get(self, key: str) -> Optional[Any]:
         path = self._key_to_path(key)
         if not path.exists():
             return None
         try:
-            with path.open("r", encoding="utf-8") as f:
-                payload = json.load(f)
+            payload = compression.loads(path.read_bytes())
             ts = payload.get("_ts", 0)
-            if self.ttl_seconds > 0 and (time.time() - ts) > self.ttl_seconds:
-                logger.debug(f"Cache expired for {key}")
+            if self._expired(ts):
+                logger.debug("Cache expired for {}", key)
                 return None
             return payload.get("data")
         except Exception as e:
-            logger.warning(f"Failed reading cache for {key}: {e}")
+            logger.warning("Failed reading cache for {}: {}", key, e)
             return None
 
-    def set(self, key: str, data: Any) -> None:
+    def _set(self, key: str, data: Any) -> None:
         path = self._key_to_path(key)
         try:
-            with path.open("w", encoding="utf-8") as f:
-                json.dump({"_ts": time.time(), "data": data}, f)
+            path.write_bytes(compression.dumps({"_ts": time.time(), "data": data}))
+        except Exception as e:
+            logger.error("Failed writing cache for {}: {}", key, e)
+
+
+class SQLiteCache(CacheBackend):
+    """Single-file cache; can sit on a volume shared by the workers of one node."""
+
+    name = "sqlite"
+
+    def __init__(self, ttl_hours: int | None = None, path: Path | None = None):
+        super().__init__(ttl_hours)
+        self.path = Path(path or settings.cache_sqlite_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, ts REAL, data TEXT)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._conn().execute("SELECT ts, data FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[0]):
+                logger.debug("Cache expired for {}", key)
+                return None
+            return compression.loads(row[1])
+        except Exception as e:
+            logger.warning("Failed reading cache for {}: {}", key, e)
+            return None
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        found = {}
+        try:
+            conn = self._conn()
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                for key, ts, data in conn.execute(
+                    f"SELECT key, ts, data FROM cache WHERE key IN ({placeholders})", chunk
+                ):
+                    if not self._expired(ts):
+                        found[key] = compression.loads(data)
+        except Exception as e:
+            logger.warning("Failed reading {} cache entries: {}", len(keys), e)
+        return found
+
+    def _set(self, key: str, data: Any) -> None:
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT INTO cache(key, ts, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET ts=excluded.ts, data=excluded.data",
+                (key, time.time(), compression.dumps(data)),
+            )
+            conn.commit()
+        except Exception as e:
+            logger.error("Failed writing cache for {}: {}", key, e)
+
+
+class RedisCache(CacheBackend):
+    """Cache shared by every node; Redis expires keys itself via SETEX."""
+
+    name = "redis"
+
+    def __init__(self, ttl_hours: int | None = None, url: str | None = None, client: Any = None,
+                 prefix: str = "mealdb:cache:"):
+        super().__init__(ttl_hours)
+        if client is None:
+            if not _REDIS_AVAILABLE:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+            client = redis.Redis.from_url(url or settings.redis_url)
+        self.client = client
+        self.prefix = prefix
+
+    def _get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(self.prefix + key)
+            return compression.loads(raw) if raw is not None else None
+        except Exception as e:
+            logger.warning("Failed reading cache for {}: {}", key, e)
+            return None
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        try:
+            raws = self.client.mget([self.prefix + key for key in keys])
+            return {key: compression.loads(raw) for key, raw in zip(keys, raws) if raw is not None}
+        except Exception as e:
+            logger.warning("Failed reading {} cache entries: {}", len(keys), e)
+            return {}
+
+    def _set(self, key: str, data: Any) -> None:
+        try:
+            payload = compression.dumps(data)
+            if self.ttl_seconds > 0:
+                self.client.setex(self.prefix + key, int(self.ttl_seconds), payload)
+            else:
+                self.client.set(self.prefix + key, payload)
         except Exception as e:
-            logger.error(f"Failed writing cache for {key}: {e}")
+            logger.error("Failed writing cache for {}: {}", key, e)
+
+
+BACKENDS = {
+    "file": FileCache,
+    "sqlite": SQLiteCache,
+    "redis": RedisCache,
+}
+
+
+def make_cache(backend: str | None = None) -> CacheBackend:
+    backend = (backend or settings.cache_backend).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown CACHE_BACKEND {backend!r}; expected one of {sorted(BACKENDS)}")
+    return BACKENDS[backend]()
+
+
+def mirror_stats_to_django(backend: CacheBackend | None = None) -> None:
+    """Add the counters accumulated since the last call to the backend's CacheEntry stats row."""
+    backend = backend or cache
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mealdb_admin.settings")
+        django.setup()
+    from meals.cache_stats import record_backend_stats
+
+    current = {name: getattr(backend, name) for name in ("hits", "misses", "sets")}
+    delta = {name: current[name] - backend._mirrored[name] for name in current}
+    record_backend_stats(backend.name, ttl_seconds=backend.ttl_seconds, **delta)
+    backend._mirrored = current
 
 
-cache = FileCache()
+cache = make_cache()
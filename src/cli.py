@@ -1,23 +1,40 @@
 from __future__ import annotations
 import asyncio
-from typing import Optional
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Optional
 
 import typer
 from rich import print
 from rich.panel import Panel
+from rich.table import Table
 
+from .db import init_db, similar_meals, upsert_meals
 from .indexer import build_index
+from .profiling import profile
+from .similar import build_similar_index
+from .suggest import suggest as suggest_prefix
+from . import bundle as bundles, delta, warmup
+from .synth import generate_meals, write_snapshot
 from .rag import answer
+from . import metrics
 from .config import settings
 from .logger import logger
 
 app = typer.Typer(help="MealDB RAG: build local index and answer questions quickly with cached data.")
+bundle_app = typer.Typer(help="Pack the index, snapshot and API cache into one archive for provisioning nodes.")
+app.add_typer(bundle_app, name="bundle")
+
+
+def _profiled(path: Optional[Path]):
+    return profile(path) if path else nullcontext()
 
 
 @app.command()
-def init():
+def init(profile_path: Optional[Path] = typer.Option(None, "--profile", help="Write cProfile stats (and .collapsed stacks) to this path")):
     """Fetch all MealDB data and build the local index (cached + SQLite FTS)."""
-    asyncio.run(build_index())
+    with _profiled(profile_path):
+        asyncio.run(build_index())
     print(Panel.fit("[green]Index built successfully[/green]"))
 
 
@@ -25,11 +42,151 @@ def init():
 def ask(question: str = typer.Argument(..., help="Your question in natural language"),
         k: int = typer.Option(5, help="Number of contexts to retrieve"),
         use_toolfront_sql: bool = typer.Option(False, help="Use ToolFront Text2SQL over SQLite for the answer"),
-        model: Optional[str] = typer.Option(None, help="Override default model, e.g., 'openai:gpt-4o'")):
+        model: Optional[str] = typer.Option(None, help="Override default model, e.g., 'openai:gpt-4o'"),
+        debug: bool = typer.Option(False, help="Append the per-stage timing breakdown to the answer"),
+        profile_path: Optional[Path] = typer.Option(None, "--profile", help="Write cProfile stats (and .collapsed stacks) to this path")):
     """Ask a question. By default returns a synthesized prompt with top contexts; optionally use ToolFront."""
-    resp = answer(question, k=k, use_toolfront_sql=use_toolfront_sql, model=model)
+    with _profiled(profile_path):
+        resp = answer(question, k=k, use_toolfront_sql=use_toolfront_sql, model=model, debug=debug)
     print(resp)
 
 
+@app.command()
+def similar(meal_id: int = typer.Argument(..., help="Meal id to find neighbors for"),
+            n: int = typer.Option(5, help="Number of similar meals"),
+            rebuild: bool = typer.Option(False, help="Recompute the similar-meals table first")):
+    """List meals sharing the most (IDF-weighted) ingredients with MEAL_ID."""
+    if rebuild:
+        build_similar_index()
+    rows = similar_meals(meal_id, n)
+    if not rows:
+        print(f"[yellow]No similar meals for #{meal_id}. Build the index (or pass --rebuild) first.[/yellow]")
+        return
+    table = Table(title=f"Meals similar to #{meal_id}")
+    for column in ("id", "name", "category", "area", "score"):
+        table.add_column(column)
+    for r in rows:
+        table.add_row(str(r["id"]), r["name"], r["category"] or "", r["area"] or "", f"{r['score']:.3f}")
+    print(table)
+
+
+@app.command()
+def suggest(prefix: str = typer.Argument(..., help="What the user has typed so far"),
+            n: int = typer.Option(10, help="Number of suggestions")):
+    """Autocomplete PREFIX from meal names and ingredients, most popular first."""
+    rows = suggest_prefix(prefix, n)
+    if not rows:
+        print(f"[yellow]No suggestions for {prefix!r}.[/yellow]")
+        return
+    table = Table(title=f"Suggestions for {prefix!r}")
+    for column in ("text", "kind", "popularity"):
+        table.add_column(column)
+    for r in rows:
+        table.add_row(r["text"], r["kind"], str(r["popularity"]))
+    print(table)
+
+
+@app.command()
+def warm(n: int = typer.Option(settings.warm_queries, help="Number of hot queries to replay"),
+         budget: float = typer.Option(settings.warm_budget_seconds, help="Time budget in seconds"),
+         queries_file: Optional[Path] = typer.Option(None, help="Query log to rank instead of SearchQuery history"),
+         preload: bool = typer.Option(settings.warm_preload, help="Read meals.db into the OS page cache first"),
+         save_state: Optional[Path] = typer.Option(None, help="Persist the warmed caches here (default: WARM_STATE_FILE)")):
+    """Replay the most frequent past queries so the first users after a rebuild hit warm caches."""
+    queries = warmup.hot_queries(n, queries_file)
+    if not queries:
+        print("[yellow]No queries to replay; pass --queries-file or record SearchQuery history.[/yellow]")
+    stats = warmup.warm(queries, budget_seconds=budget, preload=preload)
+    saved = warmup.save_state(save_state)
+    print(Panel.fit(
+        f"[green]Replayed {stats['queries']}/{stats['of']} queries in {stats['seconds']:.2f}s"
+        f", preloaded {stats['preloaded_bytes'] / 1e6:.1f}MB[/green]"
+        + (f"\nSaved warm state to {saved}" if saved else "")
+    ))
+
+
+@app.command("apply-delta")
+def apply_delta(paths: List[Path] = typer.Argument(..., help="Delta files or directories (e.g. a synced DELTA_DIR)"),
+                fallback: Optional[Path] = typer.Option(None, help="Bundle to install when the deltas do not "
+                                                                   "start at this replica's generation")):
+    """Update this replica's index from the primary's change logs, one transaction per delta."""
+    try:
+        try:
+            changed = delta.apply_deltas(paths)
+        except delta.GenerationMismatch as e:
+            if fallback is None:
+                raise
+            print(f"[yellow]{e}; installing full snapshot {fallback}[/yellow]")
+            bundles.import_bundle(fallback, force=True)
+            changed = delta.apply_deltas(paths)
+    except (delta.DeltaError, bundles.BundleError) as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    print(Panel.fit(f"[green]Applied {changed} meal changes; index at generation {delta.generation()}[/green]"))
+
+
+@app.command()
+def synth(meals: int = typer.Option(1000, help="Number of synthetic meals"),
+          out: Path = typer.Option(Path("data/synthetic_meals.ndjson"), help="Snapshot path to write"),
+          seed: int = typer.Option(0, help="Generator seed"),
+          index: bool = typer.Option(False, help="Also build the local index from the synthetic meals")):
+    """Write a deterministic synthetic TheMealDB-shaped snapshot (offline benchmarks/tests)."""
+    write_snapshot(out, meals, seed=seed)
+    if index:
+        init_db()
+        upsert_meals(generate_meals(meals, seed=seed))
+    print(Panel.fit(f"[green]Wrote {meals} synthetic meals to {out}[/green]"))
+
+
+@app.command()
+def stats(prometheus: bool = typer.Option(False, help="Print Prometheus text exposition instead of a table"),
+          reset: bool = typer.Option(False, help="Clear the recorded metrics snapshot")):
+    """Show per-stage latency percentiles recorded with METRICS_ENABLED=true."""
+    if reset:
+        settings.metrics_file.unlink(missing_ok=True)
+        print("[green]Metrics snapshot cleared[/green]")
+        return
+    snapshot = metrics.load_snapshot()
+    snapshot.merge(metrics.registry)
+    if prometheus:
+        typer.echo(snapshot.render_prometheus(), nl=False)
+        return
+    summary = snapshot.summary()
+    if not summary:
+        print("[yellow]No metrics recorded yet. Set METRICS_ENABLED=true and run some queries.[/yellow]")
+        return
+    table = Table(title="Stage latency (ms)")
+    for column in ("stage", "count", "mean", "p50", "p95", "p99"):
+        table.add_column(column, justify="left" if column == "stage" else "right")
+    for stage, row in summary.items():
+        table.add_row(stage, str(row["count"]), f"{row['mean_ms']:.3f}", f"{row['p50_ms']:.3f}",
+                      f"{row['p95_ms']:.3f}", f"{row['p99_ms']:.3f}")
+    print(table)
+
+
+@bundle_app.command("export")
+def export_bundle(out: Path = typer.Argument(..., help="Archive to write, e.g. mealdb.tar.zst"),
+                  cache: bool = typer.Option(True, help="Include the API cache (file or sqlite backend)"),
+                  snapshot: bool = typer.Option(True, help="Include data/meals.ndjson"),
+                  codec: Optional[str] = typer.Option(None, help="zstd | gzip | none (default: COMPRESSION)")):
+    """Write a checksummed, compressed bundle of the built index and its data."""
+    manifest = bundles.export_bundle(out, include_cache=cache, include_snapshot=snapshot, codec=codec)
+    counts = ", ".join(f"{k}={v}" for k, v in manifest["counts"].items())
+    print(Panel.fit(f"[green]Wrote {out} ({out.stat().st_size / 1e6:.1f}MB)[/green]\n{counts}"))
+
+
+@bundle_app.command("import")
+def import_bundle(path: Path = typer.Argument(..., help="Archive written by `bundle export`"),
+                  force: bool = typer.Option(False, help="Install even if older than the current bundle")):
+    """Verify a bundle and install its index, snapshot and cache on this node."""
+    try:
+        manifest = bundles.import_bundle(path, force=force)
+    except bundles.BundleError as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    counts = ", ".join(f"{k}={v}" for k, v in manifest["counts"].items())
+    print(Panel.fit(f"[green]Installed bundle at index generation {manifest['index_generation']}[/green]\n{counts}"))
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import IO, Any
+
+from .config import settings
+
+try:
+    import zstandard  # Optional: faster and smaller than gzip
+    _ZSTD_AVAILABLE = True
+except Exception:
+    _ZSTD_AVAILABLE = False
+
+# Payloads are tagged by their codec's own frame magic, so readers never need to
+# be told the codec and files written before compression (plain JSON) still load.
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+CODECS = ("auto", "zstd", "gzip", "none")
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+
+def resolve_codec(codec: str | None = None) -> str:
+    codec = (codec or settings.compression).lower()
+    if codec not in CODECS:
+        raise ValueError(f"Unknown COMPRESSION {codec!r}; expected one of {list(CODECS)}")
+    if codec == "auto":
+        return "zstd" if _ZSTD_AVAILABLE else "gzip"
+    if codec == "zstd" and not _ZSTD_AVAILABLE:
+        raise RuntimeError("COMPRESSION=zstd requires the 'zstandard' package")
+    return codec
+
+
+def _level(codec: str) -> int:
+    return settings.compression_level if settings.compression_level is not None else DEFAULT_LEVELS[codec]
+
+
+def compress(raw: bytes, codec: str | None = None) -> bytes:
+    codec = resolve_codec(codec)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=_level(codec)).compress(raw)
+    if codec == "gzip":
+        return gzip.compress(raw, compresslevel=_level(codec), mtime=0)
+    return raw
+
+
+def decompress(raw: bytes) -> bytes:
+    """Inverse of ``compress`` for any codec; uncompressed input is returned as is."""
+    if raw[:4] == ZSTD_MAGIC:
+        if not _ZSTD_AVAILABLE:
+            raise RuntimeError("Reading zstd-compressed data requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    if raw[:2] == GZIP_MAGIC:
+        return gzip.decompress(raw)
+    return raw
+
+
+def dumps(obj: Any, codec: str | None = None) -> bytes:
+    return compress(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), codec)
+
+
+def loads(raw: bytes | str) -> Any:
+    if isinstance(raw, str):
+        return json.loads(raw)
+    return json.loads(decompress(raw))
+
+
+def open_binary(path: Path | str, mode: str = "r", codec: str | None = None) -> IO[bytes]:
+    """Open a (possibly compressed) file as a sequential byte stream.
+
+    Reading detects the codec from the file's first bytes; writing uses ``codec``
+    (default: the COMPRESSION setting). The stream is not seekable.
+    """
+    path = Path(path)
+    if mode == "r":
+        with path.open("rb") as f:
+            magic = f.read(4)
+        if magic == ZSTD_MAGIC:
+            if not _ZSTD_AVAILABLE:
+                raise RuntimeError(f"Reading {path} requires the 'zstandard' package")
+            return zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+        if magic[:2] == GZIP_MAGIC:
+            return gzip.open(path, "rb")
+        return path.open("rb")
+    if mode != "w":
+        raise ValueError(f"open_binary supports 'r' and 'w', not {mode!r}")
+    codec = resolve_codec(codec)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=_level(codec)).stream_writer(path.open("wb"), closefd=True)
+    if codec == "gzip":
+        return gzip.open(path, "wb", compresslevel=_level(codec))
+    return path.open("wb")
+
+
+def open_text(path: Path | str, mode: str = "r", codec: str | None = None) -> IO[str]:
+    """Open a (possibly compressed) text file for streaming, e.g. with ``json.load``.
+
+    Reading detects the codec from the file's first bytes; writing uses ``codec``
+    (default: the COMPRESSION setting).
+    """
+    if mode not in ("r", "w"):
+        raise ValueError(f"open_text supports 'r' and 'w', not {mode!r}")
+    return io.TextIOWrapper(open_binary(path, mode, codec), encoding="utf-8")
@@ -25,10 +25,88 @@ class Settings:
 
     # Cache
     cache_expiry_hours: int = int(os.getenv("CACHE_EXPIRY_HOURS", "24"))
+    cache_backend: str = os.getenv("CACHE_BACKEND", "file")  # file | sqlite | redis
+    cache_sqlite_path: Path = Path(os.getenv("CACHE_SQLITE_PATH", "./cache/cache.db")).resolve()
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # Compression for cache entries and dataset snapshots: auto (zstd if installed, else gzip) | zstd | gzip | none
+    compression: str = os.getenv("COMPRESSION", "auto")
+    compression_level: int | None = int(os.getenv("COMPRESSION_LEVEL")) if os.getenv("COMPRESSION_LEVEL") else None
+    # Empty ("meals": null) and 404 responses are cached this long instead of the full TTL
+    negative_cache_seconds: int = int(os.getenv("NEGATIVE_CACHE_SECONDS", "900"))
+
+    # Crawl: per-shard retries with jittered exponential backoff; finished shards are
+    # checkpointed so a restarted build resumes (checkpoints older than CACHE_EXPIRY_HOURS are ignored)
+    crawl_retries: int = int(os.getenv("CRAWL_RETRIES", "3"))
+    crawl_backoff_seconds: float = float(os.getenv("CRAWL_BACKOFF_SECONDS", "1.0"))
+    crawl_checkpoint_dir: Path = Path(os.getenv("CRAWL_CHECKPOINT_DIR", "./data/crawl")).resolve()
+
+    # Mirror cache hit/miss counters into the Django CacheEntry table after each index build
+    cache_mirror_stats: bool = os.getenv("CACHE_MIRROR_STATS", "false").lower() in ("1", "true", "yes")
+
+    # Serving: open meals.db read-only/immutable with mmap for query workers
+    db_read_only: bool = os.getenv("DB_READ_ONLY", "false").lower() in ("1", "true", "yes")
+    db_immutable: bool = os.getenv("DB_IMMUTABLE", "true").lower() in ("1", "true", "yes")
+    db_preload: bool = os.getenv("DB_PRELOAD", "false").lower() in ("1", "true", "yes")
+    # Keep meal rows in memory (src/store.py); FTS then only ranks ids
+    meal_store: bool = os.getenv("MEAL_STORE", "false").lower() in ("1", "true", "yes")
+    meal_store_instructions_cache: int = int(os.getenv("MEAL_STORE_INSTRUCTIONS_CACHE", "2048"))
+    # Build the autocomplete index (src/suggest.py) in prepare_serving() rather than on first use
+    suggest_preload: bool = os.getenv("SUGGEST_PRELOAD", "false").lower() in ("1", "true", "yes")
+
+    # Similar meals precomputed at index time (0 disables); block memory bound for the build
+    similar_top_n: int = int(os.getenv("SIMILAR_TOP_N", "10"))
+    similar_memory_mb: int = int(os.getenv("SIMILAR_MEMORY_MB", "64"))
+
+    # Delta replication (src/delta.py): each index generation's change log, newest DELTA_KEEP kept
+    delta_dir: Path = Path(os.getenv("DELTA_DIR", "./data/deltas")).resolve()
+    delta_keep: int = int(os.getenv("DELTA_KEEP", "30"))
+
+    # bm25: one FTS pass over all columns; rerank: short-column candidates + feature reranker (src/rerank.py)
+    search_mode: str = os.getenv("SEARCH_MODE", "bm25")
+    rerank_candidates: int = int(os.getenv("RERANK_CANDIDATES", "100"))
+    rerank_weights: str = os.getenv("RERANK_WEIGHTS", "")
+
+    # Paged search: ranked id lists cached per process for cursor follow-ups
+    search_max_results: int = int(os.getenv("SEARCH_MAX_RESULTS", "1000"))
+    search_cursor_ttl: int = int(os.getenv("SEARCH_CURSOR_TTL", "300"))
+    search_cursor_cache_size: int = int(os.getenv("SEARCH_CURSOR_CACHE_SIZE", "256"))
+
+    # Typo-tolerant search: query terms missing from the index vocabulary are
+    # replaced by their closest index term before matching
+    fuzzy_search: bool = os.getenv("FUZZY_SEARCH", "false").lower() in ("1", "true", "yes")
+    fuzzy_max_distance: int = int(os.getenv("FUZZY_MAX_DISTANCE", "2"))
+
+    # Warm-up after `init` / `cli warm`: replay the top queries (SearchQuery history or
+    # WARM_QUERY_LOG) within a time budget; WARM_STATE_FILE persists caches across restarts
+    warm_queries: int = int(os.getenv("WARM_QUERIES", "100"))
+    warm_budget_seconds: float = float(os.getenv("WARM_BUDGET_SECONDS", "30"))
+    warm_preload: bool = os.getenv("WARM_PRELOAD", "false").lower() in ("1", "true", "yes")
+    warm_query_log: Path | None = Path(os.getenv("WARM_QUERY_LOG")).resolve() if os.getenv("WARM_QUERY_LOG") else None
+    warm_state_file: Path | None = Path(os.getenv("WARM_STATE_FILE")).resolve() if os.getenv("WARM_STATE_FILE") else None
+
+    # Search analytics (buffered, flushed to SearchQuery/SearchResult in the background)
+    analytics_enabled: bool = os.getenv("ANALYTICS_ENABLED", "false").lower() in ("1", "true", "yes")
+    analytics_buffer_size: int = int(os.getenv("ANALYTICS_BUFFER_SIZE", "10000"))
+    analytics_batch_size: int = int(os.getenv("ANALYTICS_BATCH_SIZE", "200"))
+    analytics_flush_seconds: float = float(os.getenv("ANALYTICS_FLUSH_SECONDS", "5"))
+
+    # Per-stage latency metrics
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+    metrics_file: Path = Path(os.getenv("METRICS_FILE", "./data/metrics.json")).resolve()
+    debug_timings: bool = os.getenv("DEBUG_TIMINGS", "false").lower() in ("1", "true", "yes")
 
     # Logging
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
     log_file: Path = Path(os.getenv("LOG_FILE", "./logs/mealdb-rag.log")).resolve()
+    # Write sinks from a background thread fed by a queue; LOG_JSON serializes LOG_FILE records
+    log_enqueue: bool = os.getenv("LOG_ENQUEUE", "true").lower() in ("1", "true", "yes")
+    log_json: bool = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")
+    # Repetitive warnings (e.g. per-meal upsert failures): LOG_BURST per key per window, then a count
+    log_burst: int = int(os.getenv("LOG_BURST", "10"))
+    log_window_seconds: float = float(os.getenv("LOG_WINDOW_SECONDS", "60"))
+    # Searches slower than this (MATCH + fetch) are written to the slow-query log; 0 disables
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "250"))
+    slow_query_log: Path = Path(os.getenv("SLOW_QUERY_LOG", "./logs/slow-queries.log")).resolve()
 
 
 settings = Settings()
@@ -1,12 +1,24 @@
 from __future__ import annotations
+import hashlib
+import json
+import os
+import re
 import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import Iterable, Dict, Any, List
+from typing import Iterable, Iterator, Dict, Any, List, Optional, Tuple
 
 from .config import settings
-from .logger import logger
+from .logger import flush_throttled, logger, throttled
+from .metrics import span
 
 DB_PATH = (settings.data_dir / "meals.db").resolve()
+# Stored in PRAGMA user_version by init_db; bump when the table layout changes
+# (2: dimension + fact tables behind the meals/meal_ingredients views;
+#  3: meal_digests/meal_changes/index_meta for delta replication, src/delta.py;
+#  4: meal_ingredient_facts.position, the strIngredientN slot)
+SCHEMA_VERSION = 4
 
 
 def connect() -> sqlite3.Connection:
@@ -15,116 +27,600 @@ def connect() -> sqlite3.Connection:
     return conn
 
 
+def connect_readonly(path: Path | None = None, immutable: bool | None = None) -> sqlite3.Connection:
+    """Open the index for query serving: read-only URI, mmap sized to the file.
+
+    With ``immutable=1`` SQLite skips locking and change detection entirely, so the
+    file must not be rewritten while connections are open (rebuild, then restart
+    workers or call ``reset_serving_connections``).
+    """
+    path = Path(path or DB_PATH)
+    if immutable is None:
+        immutable = settings.db_immutable
+    uri = f"{path.as_uri()}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA mmap_size = {path.stat().st_size}")
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def preload_db(path: Path | None = None, chunk_size: int = 1 << 20) -> int:
+    """Read the DB file sequentially so its pages are resident in the OS page cache.
+
+    The page cache is shared by every process mapping the file, so calling this once
+    in a parent before forking workers warms all of them. Returns bytes read.
+    """
+    path = Path(path or DB_PATH)
+    total = 0
+    with path.open("rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            total += len(chunk)
+    logger.info(f"Preloaded {total} bytes of {path} into page cache")
+    return total
+
+
+# One read-only connection per (process, thread). Connections must never cross a
+# fork, so the owning pid is checked on every lookup and forked children reopen.
+_serving = threading.local()
+
+
+def serving_connection() -> sqlite3.Connection:
+    conn: Optional[sqlite3.Connection] = getattr(_serving, "conn", None)
+    if conn is None or getattr(_serving, "pid", None) != os.getpid():
+        conn = connect_readonly()
+        _serving.conn = conn
+        _serving.pid = os.getpid()
+    return conn
+
+
+def reset_serving_connections() -> None:
+    """Drop this thread's cached serving connection (e.g. after a rebuild)."""
+    conn = getattr(_serving, "conn", None)
+    if conn is not None and getattr(_serving, "pid", None) == os.getpid():
+        conn.close()
+    _serving.conn = None
+    _serving.pid = None
+
+
+def prepare_serving() -> None:
+    """Call once in the parent process before forking query workers."""
+    if not DB_PATH.exists():
+        raise FileNotFoundError(f"Index not found at {DB_PATH}; run `init` first")
+    if settings.db_preload:
+        preload_db()
+    if settings.meal_store:
+        from .store import get_store
+        get_store()
+    if settings.fuzzy_search:
+        from .fuzzy import get_vocabulary
+        get_vocabulary()
+    if settings.suggest_preload:
+        from .suggest import get_suggester
+        get_suggester()
+    if settings.warm_state_file:
+        from .warmup import load_state, persist_at_exit
+        load_state()
+        persist_at_exit()
+
+
 def init_db() -> None:
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     conn = connect()
     cur = conn.cursor()
     # Enable FTS5
     cur.execute("PRAGMA foreign_keys = ON;")
+    legacy = _rename_legacy_tables(cur)
+    _add_ingredient_position(cur)
 
     cur.executescript(
         """
-        CREATE TABLE IF NOT EXISTS meals (
+        -- Dimension tables: each category/area/ingredient name is stored once
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT,
+            thumbnail TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS areas (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+
+        CREATE TABLE IF NOT EXISTS ingredients (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS meal_facts (
             id INTEGER PRIMARY KEY,
             name TEXT,
-            category TEXT,
-            area TEXT,
+            category_id INTEGER REFERENCES categories(id),
+            area_id INTEGER REFERENCES areas(id),
             instructions TEXT,
             thumbnail TEXT,
             tags TEXT
         );
+        CREATE INDEX IF NOT EXISTS meal_facts_category ON meal_facts(category_id);
+        CREATE INDEX IF NOT EXISTS meal_facts_area ON meal_facts(area_id);
+
+        CREATE TABLE IF NOT EXISTS meal_ingredient_facts (
+            meal_id INTEGER,
+            ingredient_id INTEGER REFERENCES ingredients(id),
+            measure TEXT,
+            position INTEGER,
+            PRIMARY KEY (meal_id, ingredient_id),
+            FOREIGN KEY (meal_id) REFERENCES meal_facts(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS meal_ingredient_facts_ingredient ON meal_ingredient_facts(ingredient_id);
+
+        -- The original denormalized shapes, for existing SQL and ToolFront
+        CREATE VIEW IF NOT EXISTS meals AS
+            SELECT f.id, f.name, c.name AS category, a.name AS area, f.instructions, f.thumbnail, f.tags
+            FROM meal_facts f
+            LEFT JOIN categories c ON c.id = f.category_id
+            LEFT JOIN areas a ON a.id = f.area_id;
+
+        CREATE VIEW IF NOT EXISTS meal_ingredients AS
+            SELECT mi.meal_id, i.name AS ingredient, mi.measure, mi.position
+            FROM meal_ingredient_facts mi
+            JOIN ingredients i ON i.id = mi.ingredient_id
+            ORDER BY mi.meal_id, mi.position;
 
         CREATE VIRTUAL TABLE IF NOT EXISTS meals_fts USING fts5(
             name, instructions, tags, category, area, ingredients
         );
 
-        CREATE TABLE IF NOT EXISTS meal_ingredients (
+        -- Precomputed neighbors (src/similar.py); rank 0 is the closest
+        CREATE TABLE IF NOT EXISTS meal_similar (
             meal_id INTEGER,
-            ingredient TEXT,
-            measure TEXT,
-            PRIMARY KEY (meal_id, ingredient),
-            FOREIGN KEY (meal_id) REFERENCES meals(id) ON DELETE CASCADE
+            rank INTEGER,
+            similar_id INTEGER,
+            score REAL,
+            PRIMARY KEY (meal_id, rank)
+        ) WITHOUT ROWID;
+
+        -- Delta replication (src/delta.py): content digest per meal, the meals changed
+        -- since the last committed generation, and that generation number
+        CREATE TABLE IF NOT EXISTS meal_digests (
+            meal_id INTEGER PRIMARY KEY,
+            digest TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meal_changes (
+            generation INTEGER,
+            meal_id INTEGER,
+            op TEXT NOT NULL,
+            PRIMARY KEY (generation, meal_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS index_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER
         );
         """
     )
+    if legacy:
+        _migrate_legacy_tables(cur)
+    cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     conn.close()
     logger.info(f"Initialized DB at {DB_PATH}")
 
 
-def upsert_meals(meals: Iterable[Dict[str, Any]]) -> int:
+def _rename_legacy_tables(cur: sqlite3.Cursor) -> bool:
+    """Move pre-dimension ``meals``/``meal_ingredients`` tables aside so views can take their names."""
+    row = cur.execute("SELECT type FROM sqlite_master WHERE name = 'meals'").fetchone()
+    if row is None or row[0] != "table":
+        return False
+    cur.execute("ALTER TABLE meal_ingredients RENAME TO legacy_meal_ingredients")
+    cur.execute("ALTER TABLE meals RENAME TO legacy_meals")
+    return True
+
+
+def _add_ingredient_position(cur: sqlite3.Cursor) -> None:
+    """Add ``meal_ingredient_facts.position`` to a pre-v4 index; the view is recreated with it.
+
+    Existing rows keep a NULL position until their meal is next re-indexed (the
+    prepared rows changed shape, so no stored digest matches).
+    """
+    columns = [row[1] for row in cur.execute("PRAGMA table_info(meal_ingredient_facts)")]
+    if not columns or "position" in columns:
+        return
+    cur.execute("ALTER TABLE meal_ingredient_facts ADD COLUMN position INTEGER")
+    cur.execute("DROP VIEW IF EXISTS meal_ingredients")
+
+
+def _migrate_legacy_tables(cur: sqlite3.Cursor) -> None:
+    cur.executescript(
+        """
+        INSERT OR IGNORE INTO categories(name)
+            SELECT DISTINCT category FROM legacy_meals WHERE category IS NOT NULL AND category != '';
+        INSERT OR IGNORE INTO areas(name)
+            SELECT DISTINCT area FROM legacy_meals WHERE area IS NOT NULL AND area != '';
+        INSERT OR IGNORE INTO ingredients(name)
+            SELECT DISTINCT ingredient FROM legacy_meal_ingredients;
+        INSERT INTO meal_facts(id, name, category_id, area_id, instructions, thumbnail, tags)
+            SELECT m.id, m.name, c.id, a.id, m.instructions, m.thumbnail, m.tags
+            FROM legacy_meals m
+            LEFT JOIN categories c ON c.name = m.category
+            LEFT JOIN areas a ON a.name = m.area;
+        INSERT OR IGNORE INTO meal_ingredient_facts(meal_id, ingredient_id, measure, position)
+            SELECT li.meal_id, i.id, li.measure, row_number() OVER (PARTITION BY li.meal_id ORDER BY li.rowid)
+            FROM legacy_meal_ingredients li JOIN ingredients i ON i.name = li.ingredient;
+        DROP TABLE legacy_meal_ingredients;
+        DROP TABLE legacy_meals;
+        """
+    )
+    logger.info("Migrated meals/meal_ingredients to dimension tables (run VACUUM to reclaim space)")
+
+
+DIMENSION_TABLES = ("categories", "areas", "ingredients")
+
+
+class DimensionIds:
+    """Name -> id maps for the dimension tables, inserting unseen names on demand."""
+
+    def __init__(self, cur: sqlite3.Cursor):
+        self.cur = cur
+        self.ids: Dict[str, Dict[str, int]] = {
+            table: {name: id_ for id_, name in cur.execute(f"SELECT id, name FROM {table}")}
+            for table in DIMENSION_TABLES
+        }
+
+    def get(self, table: str, name: Optional[str]) -> Optional[int]:
+        if not name:
+            return None
+        ids = self.ids[table]
+        id_ = ids.get(name)
+        if id_ is None:
+            self.cur.execute(f"INSERT INTO {table}(name) VALUES (?)", (name,))
+            id_ = ids[name] = self.cur.lastrowid
+        return id_
+
+
+def upsert_dimensions(categories: Iterable[Dict[str, Any]] = (), areas: Iterable[Dict[str, Any]] = (),
+                      ingredients: Iterable[Dict[str, Any]] = ()) -> int:
+    """Load TheMealDB lookup lists (``categories.php``, ``list.php?a=list``/``?i=list``).
+
+    Names referenced by meals but missing from the lists are added by ``write_prepared``
+    as they appear. Returns the number of rows written.
+    """
     conn = connect()
     cur = conn.cursor()
-    count = 0
-    for m in meals:
-        try:
-            meal_id = int(m.get("idMeal"))
-            name = m.get("strMeal")
-            category = m.get("strCategory")
-            area = m.get("strArea")
-            instructions = (m.get("strInstructions") or "").strip()
-            thumbnail = m.get("strMealThumb")
-            tags = m.get("strTags") or ""
+    rows = 0
+    for c in categories:
+        if c.get("strCategory"):
+            cur.execute(
+                "INSERT INTO categories(name, description, thumbnail) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET description=excluded.description, thumbnail=excluded.thumbnail",
+                (c["strCategory"], c.get("strCategoryDescription"), c.get("strCategoryThumb")),
+            )
+            rows += 1
+    for a in areas:
+        if a.get("strArea"):
+            cur.execute("INSERT OR IGNORE INTO areas(name) VALUES (?)", (a["strArea"],))
+            rows += 1
+    for i in ingredients:
+        if i.get("strIngredient"):
+            cur.execute(
+                "INSERT INTO ingredients(name, description) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET description=excluded.description",
+                (i["strIngredient"].strip(), i.get("strDescription")),
+            )
+            rows += 1
+    conn.commit()
+    conn.close()
+    logger.info(f"Upserted {rows} dimension rows")
+    return rows
+
 
+PreparedMeal = Tuple[tuple, List[tuple], tuple]
+
+
+def prepare_meal(m: Dict[str, Any]) -> PreparedMeal:
+    """Normalize a TheMealDB payload into (meals row, meal_ingredients rows, meals_fts row).
+
+    Ingredient rows are ``(meal_id, ingredient, measure, position)`` in recipe order,
+    ``position`` being the strIngredientN slot.
+
+    Pure Python with no DB access, so it can run in parallel shards ahead of a
+    single writer (see ``write_prepared``).
+    """
+    meal_id = int(m.get("idMeal"))
+    name = m.get("strMeal")
+    category = m.get("strCategory")
+    area = m.get("strArea")
+    instructions = (m.get("strInstructions") or "").strip()
+    thumbnail = m.get("strMealThumb")
+    tags = m.get("strTags") or ""
+
+    ingredient_rows: List[tuple] = []
+    ingredients: List[str] = []
+    for i in range(1, 21):
+        ing = (m.get(f"strIngredient{i}") or "").strip()
+        meas = (m.get(f"strMeasure{i}") or "").strip()
+        if ing:
+            ingredient_rows.append((meal_id, ing, meas, i))
+            ingredients.append(ing)
+    ingredients_text = ", ".join(ingredients)
+    return (
+        (meal_id, name, category, area, instructions, thumbnail, tags),
+        ingredient_rows,
+        (meal_id, name, instructions, tags, category, area, ingredients_text),
+    )
+
+
+def meal_digest(prepared: PreparedMeal) -> str:
+    """Stable digest of a prepared meal; unchanged meals are skipped on re-index."""
+    meal_row, ingredient_rows, fts_row = prepared
+    raw = json.dumps([list(meal_row), [list(r) for r in ingredient_rows], list(fts_row)], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def get_generation(cur: sqlite3.Cursor) -> int:
+    """The last committed index generation (0 before the first ``delta.commit_generation``)."""
+    try:
+        row = cur.execute("SELECT value FROM index_meta WHERE key = 'generation'").fetchone()
+    except sqlite3.OperationalError:  # built before schema v3
+        return 0
+    return row[0] if row else 0
+
+
+def write_prepared(prepared: Iterable[PreparedMeal], conn: sqlite3.Connection | None = None,
+                   record: bool = True) -> int:
+    """Upsert prepared meals in one transaction. Returns the number written or already current.
+
+    Meals whose digest matches the stored one are skipped. Once a generation has been
+    committed, changed meals are recorded in ``meal_changes`` for the next delta
+    (``record=False`` when applying a delta). With ``conn`` the caller commits.
+    """
+    started = time.perf_counter()
+    own = conn is None
+    conn = connect() if own else conn
+    cur = conn.cursor()
+    dims = DimensionIds(cur)
+    committed = get_generation(cur) if record else 0
+    generation = committed + 1 if committed else None
+    count = changed = 0
+    for meal_row, ingredient_rows, fts_row in prepared:
+        meal_id, name, category, area, instructions, thumbnail, tags = meal_row
+        try:
+            digest = meal_digest((meal_row, ingredient_rows, fts_row))
+            stored = cur.execute("SELECT digest FROM meal_digests WHERE meal_id = ?", (meal_id,)).fetchone()
+            if stored is not None and stored[0] == digest:
+                count += 1
+                continue
             cur.execute(
                 """
-                INSERT INTO meals(id, name, category, area, instructions, thumbnail, tags)
+                INSERT INTO meal_facts(id, name, category_id, area_id, instructions, thumbnail, tags)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(id) DO UPDATE SET
                   name=excluded.name,
-                  category=excluded.category,
-                  area=excluded.area,
+                  category_id=excluded.category_id,
+                  area_id=excluded.area_id,
                   instructions=excluded.instructions,
                   thumbnail=excluded.thumbnail,
                   tags=excluded.tags
                 """,
-                (meal_id, name, category, area, instructions, thumbnail, tags),
+                (meal_id, name, dims.get("categories", category), dims.get("areas", area),
+                 instructions, thumbnail, tags),
             )
 
             # Ingredients
-            cur.execute("DELETE FROM meal_ingredients WHERE meal_id = ?", (meal_id,))
-            ingredients: List[str] = []
-            for i in range(1, 21):
-                ing = (m.get(f"strIngredient{i}") or "").strip()
-                meas = (m.get(f"strMeasure{i}") or "").strip()
-                if ing:
-                    cur.execute(
-                        "INSERT OR REPLACE INTO meal_ingredients(meal_id, ingredient, measure) VALUES (?, ?, ?)",
-                        (meal_id, ing, meas),
-                    )
-                    ingredients.append(ing)
+            cur.execute("DELETE FROM meal_ingredient_facts WHERE meal_id = ?", (meal_id,))
+            # A repeated ingredient keeps its first slot, as the Django import does
+            cur.executemany(
+                "INSERT OR IGNORE INTO meal_ingredient_facts(meal_id, ingredient_id, measure, position) "
+                "VALUES (?, ?, ?, ?)",
+                [(meal_id, dims.get("ingredients", ing), meas, pos) for _, ing, meas, pos in ingredient_rows],
+            )
             # Update FTS - FTS5 doesn't support UPSERT, so delete then insert
-            ingredients_text = ", ".join(ingredients)
             cur.execute("DELETE FROM meals_fts WHERE rowid = ?", (meal_id,))
             cur.execute(
                 "INSERT INTO meals_fts(rowid, name, instructions, tags, category, area, ingredients) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (meal_id, name, instructions, tags, category, area, ingredients_text),
+                fts_row,
             )
+            cur.execute("INSERT OR REPLACE INTO meal_digests(meal_id, digest) VALUES (?, ?)", (meal_id, digest))
+            if generation is not None:
+                cur.execute("INSERT OR REPLACE INTO meal_changes(generation, meal_id, op) VALUES (?, ?, 'upsert')",
+                            (generation, meal_id))
             count += 1
+            changed += 1
         except Exception as e:
-            logger.warning(f"Failed upserting meal {m.get('idMeal')}: {e}")
-    conn.commit()
-    conn.close()
-    logger.info(f"Upserted {count} meals")
+            throttled("meal.upsert").warning("Failed upserting meal {}: {}", meal_id, e)
+    if own:
+        conn.commit()
+        conn.close()
+    flush_throttled("meal.upsert")
+    logger.bind(stage="index.write", elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+                meals=count, changed=changed).info("Upserted {} meals ({} changed)", count, changed)
+    return count
+
+
+def delete_meals(ids: Iterable[int], conn: sqlite3.Connection | None = None, record: bool = True) -> int:
+    """Remove meals from every index table. Returns the number deleted."""
+    own = conn is None
+    conn = connect() if own else conn
+    cur = conn.cursor()
+    committed = get_generation(cur) if record else 0
+    generation = committed + 1 if committed else None
+    count = 0
+    for meal_id in ids:
+        if cur.execute("DELETE FROM meal_facts WHERE id = ?", (meal_id,)).rowcount == 0:
+            continue
+        cur.execute("DELETE FROM meal_ingredient_facts WHERE meal_id = ?", (meal_id,))
+        cur.execute("DELETE FROM meals_fts WHERE rowid = ?", (meal_id,))
+        cur.execute("DELETE FROM meal_similar WHERE meal_id = ? OR similar_id = ?", (meal_id, meal_id))
+        cur.execute("DELETE FROM meal_digests WHERE meal_id = ?", (meal_id,))
+        if generation is not None:
+            cur.execute("INSERT OR REPLACE INTO meal_changes(generation, meal_id, op) VALUES (?, ?, 'delete')",
+                        (generation, meal_id))
+        count += 1
+    if own:
+        conn.commit()
+        conn.close()
+    if count:
+        logger.info("Deleted {} meals", count)
     return count
 
 
+def upsert_meals(meals: Iterable[Dict[str, Any]]) -> int:
+    def prepared() -> Iterator[PreparedMeal]:
+        for m in meals:
+            try:
+                yield prepare_meal(m)
+            except Exception as e:
+                throttled("meal.upsert").warning("Failed upserting meal {}: {}", m.get("idMeal"), e)
+
+    return write_prepared(prepared())
+
+
+SEARCH_SQL = (
+    "SELECT m.*, bm25(meals_fts) as score FROM meals_fts JOIN meals m ON meals_fts.rowid = m.id "
+    "WHERE meals_fts MATCH ? ORDER BY score LIMIT ?"
+)
+# Ranking only; callers holding meals in memory (see store.MealStore) skip the join
+SEARCH_IDS_SQL = (
+    "SELECT rowid AS id, bm25(meals_fts) as score FROM meals_fts "
+    "WHERE meals_fts MATCH ? ORDER BY score LIMIT ?"
+)
+
+
+SEARCH_MODES = ("bm25", "rerank")
+
+
+def _reranking() -> bool:
+    mode = settings.search_mode.lower()
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown SEARCH_MODE {mode!r}; expected one of {list(SEARCH_MODES)}")
+    return mode == "rerank"
+
+
 def search_meals(query: str, limit: int = 5) -> List[sqlite3.Row]:
-    conn = connect()
+    if _reranking():
+        from .rerank import rerank_ids
+        return meals_by_ids(rerank_ids(query, limit))
+    return _search(SEARCH_SQL, query, limit)
+
+
+def search_meal_ids(query: str, limit: int = 5) -> List[Tuple[int, float]]:
+    """Ranked ``(meal_id, score)`` pairs for ``query``, best (lowest score) first."""
+    if _reranking():
+        from .rerank import rerank_ids
+        return rerank_ids(query, limit)
+    return [(r[0], r[1]) for r in _search(SEARCH_IDS_SQL, query, limit)]
+
+
+def meals_by_ids(ranked: List[Tuple[int, float]]) -> List[sqlite3.Row]:
+    """Rows for ``(meal_id, score)`` pairs in the given order, shaped like ``search_meals`` rows.
+
+    A primary-key lookup per id; ids no longer in the index are skipped.
+    """
+    if not ranked:
+        return []
+    values = ", ".join("(?, ?, ?)" for _ in ranked)
+    params = [v for pos, (meal_id, score) in enumerate(ranked) for v in (meal_id, score, pos)]
+    sql = (f"WITH page(id, score, pos) AS (VALUES {values}) "
+           "SELECT m.*, page.score AS score FROM page JOIN meals m ON m.id = page.id ORDER BY page.pos")
+    serving = settings.db_read_only
+    conn = serving_connection() if serving else connect()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        if not serving:
+            conn.close()
+
+
+SIMILAR_SQL = (
+    "SELECT m.*, s.score FROM meal_similar s JOIN meals m ON m.id = s.similar_id "
+    "WHERE s.meal_id = ? ORDER BY s.rank LIMIT ?"
+)
+
+
+def similar_meals(meal_id: int, n: int = 5) -> List[sqlite3.Row]:
+    """Meals most like ``meal_id`` by shared ingredients, from the precomputed table."""
+    serving = settings.db_read_only
+    conn = serving_connection() if serving else connect()
+    try:
+        return conn.execute(SIMILAR_SQL, (meal_id, n)).fetchall()
+    finally:
+        if not serving:
+            conn.close()
+
+
+def query_terms(query: str) -> List[str]:
+    # Escape special characters for FTS5 and convert to simple query
+    # Remove special characters and use simple terms
+    return re.sub(r'[^\w\s]', ' ', query).split()
+
+
+def search_terms(query: str) -> List[str]:
+    """The terms a search matches: ``query_terms``, with FUZZY_SEARCH corrections applied."""
+    with span("search.clean"):
+        terms = query_terms(query)
+
+    # Terms are corrected one by one against the vocabulary: with OR matching, one
+    # known term already returns hits, so a result count would hide the misspelling
+    if settings.fuzzy_search and terms:
+        from .fuzzy import correct_terms
+        with span("search.fuzzy"):
+            corrected = correct_terms(terms)
+        if corrected != terms:
+            logger.opt(lazy=True).debug("Fuzzy search: {!r} -> {!r}", lambda: " ".join(terms),
+                                        lambda: " ".join(corrected))
+            terms = corrected
+    return terms
+
+
+def _search(sql: str, query: str, limit: int) -> List[sqlite3.Row]:
+    return _match(sql, query, search_terms(query), limit)
+
+
+def _match(sql: str, query: str, terms: List[str], limit: int) -> List[sqlite3.Row]:
+    # Join words with OR for broader matching
+    fts_query = ' OR '.join(terms)
+    serving = settings.db_read_only
+    with span("db.connect"):
+        conn = serving_connection() if serving else connect()
     cur = conn.cursor()
     try:
-        # Escape special characters for FTS5 and convert to simple query
-        # Remove special characters and use simple terms
-        import re
-        clean_query = re.sub(r'[^\w\s]', ' ', query)
-        # Join words with OR for broader matching
-        fts_query = ' OR '.join(clean_query.split())
-        
-        cur.execute(
-            "SELECT m.*, bm25(meals_fts) as score FROM meals_fts JOIN meals m ON meals_fts.rowid = m.id WHERE meals_fts MATCH ? ORDER BY score LIMIT ?",
-            (fts_query, limit),
-        )
-        rows = cur.fetchall()
+        started = time.perf_counter()
+        with span("db.match"):
+            cur.execute(sql, (fts_query, limit))
+        with span("db.fetch"):
+            rows = cur.fetchall()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if 0 < settings.slow_query_ms <= elapsed_ms:
+            _log_slow_query(conn, sql, query, fts_query, limit, len(rows), elapsed_ms)
         return rows
     finally:
-        conn.close()
+        if not serving:
+            conn.close()
+
+
+def _log_slow_query(conn: sqlite3.Connection, sql: str, query: str, fts_query: str, limit: int,
+                    row_count: int, elapsed_ms: float) -> None:
+    """Write one JSON line to the slow-query log with the rewritten MATCH and its plan."""
+    try:
+        plan = [r["detail"] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", (fts_query, limit))]
+    except sqlite3.Error as e:
+        plan = [f"unavailable: {e}"]
+    record = {
+        "query": query,
+        "match": fts_query,
+        "limit": limit,
+        "rows": row_count,
+        "elapsed_ms": round(elapsed_ms, 3),
+        "plan": plan,
+    }
+    logger.bind(slow_query=json.dumps(record, ensure_ascii=False)).warning(
+        "Slow search ({:.1f}ms, {} rows): {!r}", elapsed_ms, row_count, fts_query
+    )
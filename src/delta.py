@@ -0,0 +1,239 @@
+from __future__ import annotations
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from . import compression, db
+from .config import settings
+from .logger import logger
+
+# A delta is NDJSON like a snapshot: a header line, then one record per changed meal.
+# Upserts carry the prepared rows (see db.prepare_meal), so applying one touches only
+# the changed meals' rows in meal_facts, meal_ingredient_facts and meals_fts.
+# Upserts also carry the meal's meal_similar rows, and "similar" records ship the
+# rows of unchanged meals whose neighbors moved in the primary's rebuild.
+HEADER_KEY = "_delta"
+FORMAT_VERSION = 2
+APPLY_BATCH = 500
+
+
+class DeltaError(RuntimeError):
+    """A delta file is malformed or does not fit this index."""
+
+
+class GenerationMismatch(DeltaError):
+    """The replica is not at the generation a delta starts from; it needs a full snapshot."""
+
+    def __init__(self, current: int, header: Dict[str, Any]):
+        self.current = current
+        self.header = header
+        super().__init__(f"Replica is at generation {current} but the delta covers "
+                         f"{header.get('from')} -> {header.get('to')}")
+
+
+def generation(path: Path | None = None) -> int:
+    """The committed generation of the index at ``path`` (default: DB_PATH)."""
+    conn = sqlite3.connect(str(path or db.DB_PATH))
+    try:
+        return db.get_generation(conn.cursor())
+    finally:
+        conn.close()
+
+
+def delta_path(start: int, end: int, directory: Path | None = None) -> Path:
+    return Path(directory or settings.delta_dir) / f"delta-{start:08d}-{end:08d}.ndjson"
+
+
+def prune_missing(seen: Set[int]) -> int:
+    """Delete indexed meals that are absent from a full snapshot with ids ``seen``."""
+    if not seen:
+        logger.warning("Snapshot had no meals; not pruning the index")
+        return 0
+    conn = db.connect()
+    try:
+        missing = [meal_id for (meal_id,) in conn.execute("SELECT id FROM meal_facts") if meal_id not in seen]
+        deleted = db.delete_meals(missing, conn)
+        conn.commit()
+    finally:
+        conn.close()
+    return deleted
+
+
+def _similar_rows(conn: sqlite3.Connection, meal_id: int) -> List[List[Any]]:
+    return [list(r) for r in conn.execute(
+        "SELECT rank, similar_id, score FROM meal_similar WHERE meal_id = ? ORDER BY rank", (meal_id,))]
+
+
+def _records(conn: sqlite3.Connection, changes: List[Tuple[int, str]], end: int) -> Iterator[Dict[str, Any]]:
+    for meal_id, op in changes:
+        if op == "delete":
+            yield {"op": "delete", "id": meal_id, "generation": end}
+            continue
+        if op == "similar":
+            yield {"op": "similar", "id": meal_id, "generation": end, "similar": _similar_rows(conn, meal_id)}
+            continue
+        meal_row = conn.execute(
+            "SELECT id, name, category, area, instructions, thumbnail, tags FROM meals WHERE id = ?", (meal_id,)
+        ).fetchone()
+        if meal_row is None:  # deleted outside delete_meals; replicas drop it too
+            yield {"op": "delete", "id": meal_id, "generation": end}
+            continue
+        ingredient_rows = conn.execute(
+            "SELECT meal_id, ingredient, measure, position FROM meal_ingredients WHERE meal_id = ? ORDER BY position",
+            (meal_id,),
+        ).fetchall()
+        fts_row = conn.execute(
+            "SELECT rowid, name, instructions, tags, category, area, ingredients FROM meals_fts WHERE rowid = ?",
+            (meal_id,),
+        ).fetchone()
+        digest = conn.execute("SELECT digest FROM meal_digests WHERE meal_id = ?", (meal_id,)).fetchone()
+        yield {"op": "upsert", "id": meal_id, "generation": end, "digest": digest[0] if digest else None,
+               "meal": [list(meal_row), [list(r) for r in ingredient_rows], list(fts_row)],
+               "similar": _similar_rows(conn, meal_id)}
+
+
+def commit_generation(directory: Path | None = None) -> int:
+    """Close the current generation and write its change log to DELTA_DIR.
+
+    The first generation of an index has nothing to diff against, so replicas start
+    from a full snapshot (``bundle import``); each later generation with changes gets
+    a ``delta-<from>-<to>.ndjson`` file. Returns the committed generation.
+    """
+    conn = db.connect()
+    try:
+        cur = conn.cursor()
+        committed = db.get_generation(cur)
+        changes = cur.execute(
+            "SELECT meal_id, op FROM meal_changes WHERE generation > ? ORDER BY meal_id", (committed,)
+        ).fetchall()
+        if committed and not changes:
+            logger.info(f"No meals changed; index stays at generation {committed}")
+            return committed
+        end = committed + 1
+        if committed:
+            path = delta_path(committed, end, directory)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with compression.open_text(tmp, "w") as f:
+                header = {HEADER_KEY: FORMAT_VERSION, "schema_version": db.SCHEMA_VERSION,
+                          "from": committed, "to": end, "count": len(changes)}
+                f.write(json.dumps(header) + "\n")
+                for record in _records(conn, [tuple(c) for c in changes], end):
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(tmp, path)
+            logger.info(f"Wrote delta {path.name} ({len(changes)} changed meals)")
+        cur.execute("INSERT OR REPLACE INTO index_meta(key, value) VALUES ('generation', ?)", (end,))
+        cur.execute("DELETE FROM meal_changes")
+        conn.commit()
+    finally:
+        conn.close()
+    _prune_deltas(directory)
+    return end
+
+
+def _prune_deltas(directory: Path | None = None) -> None:
+    keep = settings.delta_keep
+    paths = sorted(Path(directory or settings.delta_dir).glob("delta-*.ndjson"))
+    for path in paths[:-keep] if keep > 0 else []:
+        path.unlink(missing_ok=True)
+
+
+def read_header(path: Path | str) -> Dict[str, Any]:
+    with compression.open_text(path) as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            header = None
+    if not isinstance(header, dict) or HEADER_KEY not in header:
+        raise DeltaError(f"{path} is not a delta file")
+    return header
+
+
+def apply_delta(path: Path | str) -> int:
+    """Apply one delta to the local index in a single transaction.
+
+    Returns the number of meals changed; 0 when the index already includes it.
+    Raises ``GenerationMismatch`` when the index is not at the delta's start.
+    """
+    header = read_header(path)
+    conn = db.connect()
+    try:
+        with compression.open_text(path) as f:
+            f.readline()
+            if header[HEADER_KEY] > FORMAT_VERSION:
+                raise DeltaError(f"{path} is delta format v{header[HEADER_KEY]}; "
+                                 f"this code reads up to v{FORMAT_VERSION}")
+            if header.get("schema_version", 0) > db.SCHEMA_VERSION:
+                raise DeltaError(f"{path} is for schema v{header['schema_version']}; "
+                                 f"this code reads up to v{db.SCHEMA_VERSION}")
+            cur = conn.cursor()
+            current = db.get_generation(cur)
+            if header["to"] <= current:
+                logger.info(f"Index at generation {current} already includes {Path(path).name}")
+                return 0
+            if header["from"] != current:
+                raise GenerationMismatch(current, header)
+
+            records = 0
+            batch: List[Dict[str, Any]] = []
+            for line in f:
+                record = json.loads(line)
+                records += 1
+                if record["op"] == "delete":
+                    db.delete_meals([record["id"]], conn, record=False)
+                elif record["op"] == "similar":
+                    _replace_similar(conn, record["id"], record["similar"])
+                else:
+                    batch.append(record)
+                    if len(batch) >= APPLY_BATCH:
+                        _apply_upserts(conn, batch)
+                        batch = []
+            _apply_upserts(conn, batch)
+        if records != header.get("count"):
+            raise DeltaError(f"{path} is truncated: {records} of {header.get('count')} records")
+        cur.execute("INSERT OR REPLACE INTO index_meta(key, value) VALUES ('generation', ?)", (header["to"],))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    logger.info(f"Applied {Path(path).name}: {records} meals, now at generation {header['to']}")
+    return records
+
+
+def _apply_upserts(conn: sqlite3.Connection, batch: List[Dict[str, Any]]) -> None:
+    if not batch:
+        return
+    written = db.write_prepared([record["meal"] for record in batch], conn, record=False)
+    if written != len(batch):
+        raise DeltaError(f"Only {written} of {len(batch)} meals could be applied")
+    for record in batch:
+        _replace_similar(conn, record["id"], record.get("similar", []))  # v1 deltas carry none
+    # Keep the primary's digests so a later rebuild of this replica compares like with like
+    conn.executemany("INSERT OR REPLACE INTO meal_digests(meal_id, digest) VALUES (?, ?)",
+                     [(record["id"], record["digest"]) for record in batch if record.get("digest")])
+
+
+def _replace_similar(conn: sqlite3.Connection, meal_id: int, rows: List[List[Any]]) -> None:
+    conn.execute("DELETE FROM meal_similar WHERE meal_id = ?", (meal_id,))
+    conn.executemany("INSERT INTO meal_similar(meal_id, rank, similar_id, score) VALUES (?, ?, ?, ?)",
+                     [(meal_id, rank, similar_id, score) for rank, similar_id, score in rows])
+
+
+def apply_deltas(paths: Iterable[Path | str]) -> int:
+    """Apply delta files (or directories of them) in generation order. Returns meals changed.
+
+    Deltas the index already includes are skipped, so a replica can be pointed at
+    the whole DELTA_DIR. A gap in the chain raises ``GenerationMismatch``.
+    """
+    files: List[Path] = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("delta-*.ndjson")) if path.is_dir() else [path])
+    files.sort(key=lambda p: read_header(p)["from"])
+    changed = sum(apply_delta(path) for path in files)
+    if changed:
+        db.reset_serving_connections()
+    return changed
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from . import db
+from .config import settings
+from .logger import logger
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal-string-alignment distance (adjacent swaps count 1), or ``max_distance + 1``
+    as soon as it is known to exceed ``max_distance``."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class Vocabulary:
+    """Index terms with document frequencies and a symmetric-delete candidate map.
+
+    Every term is stored under each string obtainable by deleting up to
+    ``max_distance`` characters from its first ``prefix_length`` characters; a
+    misspelling is looked up under its own deletes, so candidates come from a few
+    dict hits instead of a scan, and only those are checked with ``edit_distance``.
+    """
+
+    def __init__(self, terms: Dict[str, int], max_distance: int = 2, prefix_length: int = 7):
+        self.freq = terms
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.deletes: Dict[str, List[str]] = {}
+        for term in terms:
+            for variant in self._deletes(term):
+                self.deletes.setdefault(variant, []).append(term)
+
+    @classmethod
+    def load(cls, **kwargs) -> "Vocabulary":
+        """Read terms from the FTS index via a temporary fts5vocab table."""
+        if settings.db_read_only:
+            conn = db.connect_readonly()
+            conn.execute("PRAGMA query_only = OFF")  # a mode=ro file still allows temp tables
+        else:
+            conn = db.connect()
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS temp.meals_fts_vocab USING fts5vocab(main, meals_fts, row)"
+            )
+            terms = {term: docs for term, docs in conn.execute("SELECT term, doc FROM temp.meals_fts_vocab")
+                     if not term.isdigit()}
+        finally:
+            conn.close()
+        vocab = cls(terms, **kwargs)
+        logger.info(f"Loaded fuzzy vocabulary: {len(terms)} terms, {len(vocab.deletes)} delete variants")
+        return vocab
+
+    def _deletes(self, word: str) -> Set[str]:
+        word = word[:self.prefix_length]
+        found = {word}
+        frontier = {word}
+        for _ in range(self.max_distance):
+            frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+            found |= frontier
+        return found
+
+    def correct(self, word: str) -> Optional[str]:
+        """The closest known term (most frequent among ties), ``word`` if known, else None."""
+        word = word.lower()
+        if word in self.freq:
+            return word
+        # Short words have too many neighbours to correct reliably
+        max_distance = min(self.max_distance, max(0, len(word) - 3))
+        if max_distance == 0:
+            return None
+        best: Optional[str] = None
+        best_key = (max_distance + 1, 0)
+        seen: Set[str] = set()
+        for variant in self._deletes(word):
+            for term in self.deletes.get(variant, ()):
+                if term in seen:
+                    continue
+                seen.add(term)
+                distance = edit_distance(word, term, max_distance)
+                key = (distance, -self.freq[term])
+                if distance <= max_distance and key < best_key:
+                    best, best_key = term, key
+        return best
+
+
+_vocabulary: Optional[Vocabulary] = None
+_vocabulary_lock = threading.Lock()
+
+
+def get_vocabulary() -> Vocabulary:
+    global _vocabulary
+    if _vocabulary is None:
+        with _vocabulary_lock:
+            if _vocabulary is None:
+                _vocabulary = Vocabulary.load(max_distance=settings.fuzzy_max_distance)
+    return _vocabulary
+
+
+def reset_vocabulary() -> None:
+    """Drop the loaded vocabulary (e.g. after a rebuild); the next lookup reloads it."""
+    global _vocabulary
+    with _vocabulary_lock:
+        _vocabulary = None
+
+
+def correct_terms(terms: Iterable[str]) -> List[str]:
+    """Replace query terms missing from the vocabulary with their closest index term.
+
+    Known terms, numbers (not in the vocabulary) and uncorrectable terms are kept as given.
+    """
+    vocab = get_vocabulary()
+    return [t if t.isdigit() or t.lower() in vocab.freq else vocab.correct(t) or t for t in terms]
@@ -1,23 +1,133 @@
 from __future__ import annotations
+import asyncio
 import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Set
 
-from .logger import logger
-from .mealdb_api import dump_full_dataset_json
-from .db import init_db, upsert_meals
+from .logger import flush_throttled, logger, throttled
+from .metrics import collect_timings, span
+from .mealdb_api import MealDBClient, dump_full_dataset_json
+from .db import init_db, upsert_dimensions, upsert_meals, prepare_meal, write_prepared
 from .config import settings
+from .cache import cache, mirror_stats_to_django
+from .delta import commit_generation, prune_missing
+from .snapshot import iter_snapshot
+from .similar import build_similar_index
+from .warmup import save_state, warm
 
 
 async def build_index(output_json: Path | None = None) -> None:
     if output_json is None:
-        output_json = settings.data_dir / "meals.json"
-    await dump_full_dataset_json(str(output_json))
+        output_json = settings.data_dir / "meals.ndjson"
+    with collect_timings() as timings:
+        with span("index.crawl"):
+            # The lookup lists are small; fetch them while the letter crawl runs
+            lookups, _ = await asyncio.gather(_fetch_lookups(), dump_full_dataset_json(str(output_json)))
 
-    with open(output_json, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    meals: List[Dict[str, Any]] = data.get("meals") or []
+        with span("index.write"):
+            init_db()
+            upsert_dimensions(**lookups)
+            index_snapshot(output_json, commit=False)
+        if settings.similar_top_n > 0:
+            try:
+                with span("index.similar"):
+                    build_similar_index()
+            except RuntimeError as e:
+                logger.warning("Skipping similar-meals index: {}", e)
+        # After the neighbor rebuild, so the delta also ships the meal_similar rows it changed
+        with span("index.commit"):
+            generation = commit_generation()
+        if settings.warm_queries > 0:
+            try:
+                with span("index.warm"):
+                    warm()
+                    save_state()
+            except Exception as e:
+                logger.warning("Warm-up failed: {}", e)
+    # One structured record per build; with LOG_JSON the stage timings land in record.extra
+    logger.bind(timings_ms={stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+                generation=generation).info("Index build complete (cache: {})", cache.stats())
+    if settings.cache_mirror_stats:
+        try:
+            mirror_stats_to_django(cache)
+        except Exception as e:
+            logger.warning(f"Failed mirroring cache stats to Django: {e}")
 
+
+def index_snapshot(path: Path, commit: bool = True) -> int:
+    """Bring the index in line with a full snapshot and commit a new generation.
+
+    Unchanged meals are skipped, meals the snapshot no longer has are deleted, and
+    the changes are written as a delta for replicas (``cli apply-delta``). With
+    ``commit=False`` the caller commits later and 0 is returned.
+    """
+    seen: Set[int] = set()
+
+    def meals() -> Iterator[Dict[str, Any]]:
+        for m in iter_snapshot(path):
+            try:
+                seen.add(int(m.get("idMeal")))
+            except (TypeError, ValueError):
+                pass  # upsert_meals logs the bad record
+            yield m
+
+    upsert_meals(meals())
+    prune_missing(seen)
+    return commit_generation() if commit else 0
+
+
+async def _fetch_lookups() -> Dict[str, List[Dict[str, Any]]]:
+    try:
+        return await MealDBClient().fetch_lookups()
+    except Exception as e:
+        # Dimensions are still filled from the meals themselves
+        logger.warning(f"Failed fetching lookup lists: {e}")
+        return {}
+
+
+def build_shard(meals: Iterable[Dict[str, Any]], path: Path) -> int:
+    """Normalize one crawl shard into rows for ``merge_shards`` and save them to ``path``.
+
+    This is the CPU-side half of ``upsert_meals``; it touches no database, so shards
+    can be built by parallel workers.
+    """
+    prepared = []
+    for m in meals:
+        try:
+            prepared.append(prepare_meal(m))
+        except Exception as e:
+            throttled("meal.prepare").warning("Failed preparing meal {}: {}", m.get("idMeal"), e)
+    flush_throttled("meal.prepare")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(prepared, f, ensure_ascii=False)
+    return len(prepared)
+
+
+def merge_shards(paths: Iterable[Path], chunk_size: int = 500,
+                 progress: Optional[Callable[[int, int], None]] = None, prune: bool = True) -> int:
+    """Write shard outputs into the index from this single process and commit a generation.
+
+    SQLite allows one writer at a time, so shards never write to ``meals.db``
+    themselves. Meals appearing in several shards are written once (last shard wins).
+    ``progress(done, total)`` is called after each committed chunk. As in
+    ``index_snapshot``, meals missing from the shards are then deleted (unless
+    ``prune`` is False, for a partial crawl) and the changes go out as a delta.
+    """
+    by_id: Dict[int, Any] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for prepared in json.load(f):
+                by_id[prepared[0][0]] = prepared
     init_db()
-    upsert_meals(meals)
-    logger.info("Index build complete")
+    rows = [by_id[meal_id] for meal_id in sorted(by_id)]
+    written = 0
+    for start in range(0, len(rows), chunk_size):
+        written += write_prepared(rows[start:start + chunk_size])
+        if progress is not None:
+            progress(written, len(rows))
+    logger.info("Merged {} meals from shards", written)
+    if prune:
+        prune_missing(set(by_id))
+    commit_generation()
+    return written
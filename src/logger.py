@@ -1,10 +1,221 @@
 from __future__ import annotations
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
 from loguru import logger
 from .config import settings
 
-# Configure logger once on import
+ROTATION_BYTES = 10 * 1024 * 1024
+RETENTION_SECONDS = 10 * 24 * 3600
+
+
+class QueuedSink:
+    """Loguru sink that hands formatted messages to a background writer thread.
+
+    Callers pay for formatting plus a queue put; the writer thread does the I/O and
+    flushes once the queue runs dry. Unlike loguru's ``enqueue=True`` nothing is
+    pickled or sent through a pipe (that costs more per record than a direct write).
+    """
+
+    def __init__(self, write: Callable[[str], object], flush: Optional[Callable[[], object]] = None):
+        self._write = write
+        self._flush = flush
+        self._pid = -1
+        self._start()
+
+    def _start(self) -> None:
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message: str) -> None:
+        if self._pid != os.getpid():  # forked: the writer thread did not come along
+            self._start()
+        self._queue.put(str(message))
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            while True:
+                if isinstance(item, str):
+                    self._guard(self._write, item)
+                elif isinstance(item, threading.Event):
+                    self._guard(self._flush)
+                    item.set()
+                else:  # stop
+                    self._guard(self._flush)
+                    return
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._guard(self._flush)
+
+    @staticmethod
+    def _guard(call: Optional[Callable], *args) -> None:
+        try:
+            if call is not None:
+                call(*args)
+        except (OSError, ValueError):  # closed or redirected stream; never take the writer down
+            pass
+
+    def complete(self, timeout: float | None = 5.0) -> None:
+        """Block until every message queued so far is written and flushed."""
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+
+class RotatingFile:
+    """Append-only log file rotated at ``max_bytes``; rotated files older than ``retention`` are removed."""
+
+    def __init__(self, path: Path, max_bytes: int = ROTATION_BYTES, retention_seconds: float = RETENTION_SECONDS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._open()
+
+    def _open(self) -> None:
+        self._file = self.path.open("a", encoding="utf-8")
+        self.size = self._file.tell()
+
+    def write(self, text: str) -> None:
+        if self.size and self.size + len(text) > self.max_bytes:
+            self._rotate()
+        self._file.write(text)
+        self.size += len(text)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        stamp = time.strftime("%Y-%m-%d_%H-%M-%S") + f"_{time.time_ns() % 10**9:09d}"
+        os.replace(self.path, self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}"))
+        cutoff = time.time() - self.retention_seconds
+        for old in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}"):
+            if old.stat().st_mtime < cutoff:
+                old.unlink(missing_ok=True)
+        self._open()
+
+
+_queued: List[QueuedSink] = []
+
+
+def _add_file(path: Path, **kwargs) -> None:
+    if settings.log_enqueue:
+        target = RotatingFile(path)
+        sink = QueuedSink(target.write, target.flush)
+        _queued.append(sink)
+        logger.add(sink, **kwargs)
+    else:
+        logger.add(path, rotation="10 MB", retention="10 days", **kwargs)
+
+
+def _console(text: str) -> None:
+    sys.stdout.write(text)  # looked up per write so redirected stdout is honoured
+
+
+# Configure logger once on import. With LOG_ENQUEUE the sinks write from a background
+# thread, so callers never wait on file or console I/O. Log with loguru's lazy style
+# (logger.info("Upserted {} meals", n)): the message is only formatted when some sink
+# takes the record.
 logger.remove()
-logger.add(settings.log_file, level=settings.log_level, rotation="10 MB", retention="10 days")
-logger.add(lambda msg: print(msg, end=""), level=settings.log_level)
+_add_file(settings.log_file, level=settings.log_level, serialize=settings.log_json)
+if settings.log_enqueue:
+    _queued.append(QueuedSink(_console, lambda: sys.stdout.flush()))
+    logger.add(_queued[-1], level=settings.log_level)
+else:
+    logger.add(lambda msg: print(msg, end=""), level=settings.log_level)
+# Slow-query records (bound via logger.bind(slow_query=<json>)) also go to their own JSON-lines file
+_add_file(settings.slow_query_log, level="WARNING", format="{extra[slow_query]}",
+          filter=lambda record: "slow_query" in record["extra"])
+
+
+def complete() -> None:
+    """Wait until queued log messages are written (e.g. before reading the log file)."""
+    for sink in _queued:
+        sink.complete()
+
+
+class Throttle:
+    """Rate limit for repetitive messages: ``burst`` records per key per ``window`` seconds.
+
+    Records over the limit are counted, and the count is logged once when the window
+    rolls over, on ``flush`` and at exit.
+    """
+
+    def __init__(self, burst: int | None = None, window_seconds: float | None = None):
+        self.burst = settings.log_burst if burst is None else burst
+        self.window_seconds = settings.log_window_seconds if window_seconds is None else window_seconds
+        # key -> [window start, emitted, suppressed]
+        self._windows: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is not None and now - state[0] < self.window_seconds:
+                if state[1] >= self.burst:
+                    state[2] += 1
+                    return False
+                state[1] += 1
+                return True
+            self._windows[key] = [now, 1, 0]
+        if state is not None and state[2]:
+            self._report(key, int(state[2]))
+        return True
+
+    def flush(self, key: Optional[str] = None) -> None:
+        """Log the suppressed counts (of ``key``, or every key) now and start new windows."""
+        with self._lock:
+            keys = [key] if key is not None else list(self._windows)
+            suppressed = [(k, int(self._windows.pop(k)[2])) for k in keys if k in self._windows]
+        for k, count in suppressed:
+            if count:
+                self._report(k, count)
+
+    def _report(self, key: str, count: int) -> None:
+        logger.bind(throttled=key, suppressed=count).warning("Suppressed {} more {!r} messages", count, key)
+
+
+class _MutedLogger:
+    """Stands in for ``logger`` when a throttled record is dropped."""
+
+    def _drop(self, *args, **kwargs) -> None:
+        return None
+
+    trace = debug = info = success = warning = error = exception = _drop
+
+
+_throttle = Throttle()
+_muted = _MutedLogger()
+# atexit runs last-registered first: report suppressed counts, then drain the queues
+atexit.register(complete)
+atexit.register(lambda: _throttle.flush())
+
+
+def throttled(key: str):
+    """``logger`` if a record for ``key`` may be emitted now, else a no-op stand-in.
+
+    ``throttled("meal.upsert").warning("Failed upserting meal {}: {}", meal_id, e)``
+    """
+    return logger if _throttle.allow(key) else _muted
+
+
+def flush_throttled(key: Optional[str] = None) -> None:
+    _throttle.flush(key)
+
 
-__all__ = ["logger"]
+__all__ = ["logger", "throttled", "flush_throttled", "complete", "Throttle", "QueuedSink", "RotatingFile"]
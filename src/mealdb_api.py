@@ -1,20 +1,81 @@
 from __future__ import annotations
 import asyncio
-import json
-from typing import Any, Dict, List, Optional
+import os
+import random
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlencode
 
 import aiohttp
 
+from . import compression
 from .config import settings
 from .cache import cache
-from .logger import logger
+from .snapshot import write_snapshot
+from .logger import logger, throttled
+
+# TheMealDB's search.php?f= crawl shards
+SHARD_LETTERS = [chr(c) for c in range(ord('a'), ord('z')+1)] + [str(d) for d in range(0,10)]
+# Cached empty/404 payloads are wrapped as {NEGATIVE_UNTIL: expiry, "data": payload}
+NEGATIVE_UNTIL = "_negative_until"
+RETRYABLE = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class IncompleteCrawlError(RuntimeError):
+    """Some shards still failed after retries; finished shards stay checkpointed."""
+
+    def __init__(self, letters: List[str]):
+        super().__init__(f"Crawl incomplete, failed shards: {', '.join(letters)}; rerun to resume")
+        self.letters = letters
+
+
+class CrawlCheckpoint:
+    """Finished crawl shards saved one file per letter, so a restarted crawl skips them."""
+
+    def __init__(self, path: Path | None = None, max_age_hours: float | None = None):
+        self.path = Path(path or settings.crawl_checkpoint_dir)
+        self.max_age_seconds = (settings.cache_expiry_hours if max_age_hours is None else max_age_hours) * 3600
+
+    def _file(self, letter: str) -> Path:
+        return self.path / f"{letter}.json"
+
+    def load(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Meals of every checkpointed shard that is not older than ``max_age_hours``."""
+        done: Dict[str, List[Dict[str, Any]]] = {}
+        for letter in SHARD_LETTERS:
+            path = self._file(letter)
+            try:
+                if self.max_age_seconds > 0 and time.time() - path.stat().st_mtime > self.max_age_seconds:
+                    continue
+                done[letter] = compression.loads(path.read_bytes())
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable crawl checkpoint {path}: {e}")
+        return done
+
+    def save(self, letter: str, meals: List[Dict[str, Any]]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self._file(letter).with_suffix(".tmp")
+        tmp.write_bytes(compression.dumps(meals))
+        os.replace(tmp, self._file(letter))  # a crash never leaves a half-written shard
+
+    def clear(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _is_empty(data: Any) -> bool:
+    return not data or (isinstance(data, dict) and not any(data.values()))
 
 
 class MealDBClient:
     def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
         self.base_url = base_url or settings.themealdb_base_url
         self.api_key = api_key or settings.themealdb_api_key
+        # Cache hits resolved up front by ``prefetch``; consumed by ``_get_json``
+        self._prefetched: Dict[str, Any] = {}
 
     def _url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
         if params is None:
@@ -25,16 +86,53 @@ class MealDBClient:
             url = f"{url}?{qp}"
         return url
 
+    async def prefetch(self, requests: List[Tuple[str, Optional[Dict[str, Any]]]]) -> int:
+        """Resolve the cached ``(path, params)`` requests in one batched, off-loop read.
+
+        Returns the number of hits; only the misses reach the network afterwards.
+        """
+        urls = [self._url(path, params) for path, params in requests]
+        found = await cache.aget_many(urls)
+        self._prefetched.update(found)
+        logger.debug("Prefetched {}/{} cached responses", len(found), len(urls))
+        return len(found)
+
     async def _get_json(self, session: aiohttp.ClientSession, path: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
         url = self._url(path, params)
-        cached = cache.get(url)
+        cached = self._prefetched.pop(url, None)
+        if cached is None:
+            cached = await cache.aget(url)
         if cached is not None:
-            return cached
+            if not (isinstance(cached, dict) and NEGATIVE_UNTIL in cached):
+                return cached
+            if cached[NEGATIVE_UNTIL] > time.time():
+                return cached["data"]
         async with session.get(url, timeout=30) as resp:
-            resp.raise_for_status()
-            data = await resp.json()
-            cache.set(url, data)
-            return data
+            if resp.status == 404:
+                data: Dict[str, Any] = {}
+            else:
+                resp.raise_for_status()
+                data = await resp.json()
+        if _is_empty(data):
+            # Remember "nothing here" briefly: long enough to stop hammering upstream, short
+            # enough that new meals show up; failures (5xx, timeouts) are never cached
+            await cache.aset(url, {NEGATIVE_UNTIL: time.time() + settings.negative_cache_seconds, "data": data})
+        else:
+            await cache.aset(url, data)
+        return data
+
+    async def _retry(self, call: Callable[[], Awaitable[Any]], what: str) -> Any:
+        """Await ``call()``, retrying network errors with full-jitter exponential backoff."""
+        for attempt in range(settings.crawl_retries + 1):
+            try:
+                return await call()
+            except RETRYABLE as e:
+                if attempt == settings.crawl_retries:
+                    raise
+                delay = random.uniform(0, settings.crawl_backoff_seconds * 2 ** attempt)
+                throttled("crawl.retry").warning("Fetching {} failed ({!r}); retry {}/{} in {:.1f}s", what, e,
+                                                 attempt + 1, settings.crawl_retries, delay)
+                await asyncio.sleep(delay)
 
     async def search_by_first_letter(self, session: aiohttp.ClientSession, letter: str) -> List[Dict[str, Any]]:
         data = await self._get_json(session, "search.php", {"f": letter})
@@ -54,29 +152,63 @@ class MealDBClient:
         data = await self._get_json(session, "list.php", {kind: "list"})
         return data.get("meals") or []
 
-    async def fetch_all_meals(self) -> List[Dict[str, Any]]:
-        letters = [chr(c) for c in range(ord('a'), ord('z')+1)] + [str(d) for d in range(0,10)]
-        results: List[Dict[str, Any]] = []
+    async def fetch_lookups(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch the category, area and ingredient lookup lists concurrently."""
+        await self.prefetch([("categories.php", None), ("list.php", {"a": "list"}), ("list.php", {"i": "list"})])
+        async with aiohttp.ClientSession() as session:
+            categories, areas, ingredients = await asyncio.gather(
+                self._retry(lambda: self.list_all_categories(session), "categories"),
+                self._retry(lambda: self.list_basic(session, "a"), "areas"),
+                self._retry(lambda: self.list_basic(session, "i"), "ingredients"),
+            )
+        return {"categories": categories, "areas": areas, "ingredients": ingredients}
+
+    async def fetch_shard(self, letter: str) -> List[Dict[str, Any]]:
+        """Fetch one crawl shard (all meals starting with ``letter``) in its own session."""
+        async with aiohttp.ClientSession() as session:
+            return await self.search_by_first_letter(session, letter)
+
+    async def fetch_all_meals(self, checkpoint: CrawlCheckpoint | None = None) -> List[Dict[str, Any]]:
+        """Crawl every shard, resuming from ``checkpoint`` and checkpointing each finished shard.
+
+        Raises ``IncompleteCrawlError`` if a shard still fails after CRAWL_RETRIES; the
+        next call then only fetches the missing shards.
+        """
+        checkpoint = checkpoint or CrawlCheckpoint()
+        done = checkpoint.load()
+        if done:
+            logger.info(f"Resuming crawl: {len(done)}/{len(SHARD_LETTERS)} shards checkpointed")
+        pending = [letter for letter in SHARD_LETTERS if letter not in done]
+        failed: List[str] = []
+        await self.prefetch([("search.php", {"f": letter}) for letter in pending])
         async with aiohttp.ClientSession() as session:
-            for letter in letters:
+            for letter in pending:
                 try:
-                    meals = await self.search_by_first_letter(session, letter)
-                    results.extend(meals)
+                    meals = await self._retry(lambda: self.search_by_first_letter(session, letter),
+                                              f"letter {letter}")
                 except Exception as e:
-                    logger.warning(f"Failed fetching meals for letter {letter}: {e}")
+                    logger.warning("Failed fetching meals for letter {}: {}", letter, e)
+                    failed.append(letter)
+                    continue
+                checkpoint.save(letter, meals)
+                done[letter] = meals
+        if failed:
+            raise IncompleteCrawlError(failed)
+        results = [meal for letter in SHARD_LETTERS for meal in done[letter]]
         logger.info(f"Fetched {len(results)} meals (raw)")
         return results
 
 
 async def dump_full_dataset_json(path: str) -> None:
     client = MealDBClient()
-    meals = await client.fetch_all_meals()
+    checkpoint = CrawlCheckpoint()
+    meals = await client.fetch_all_meals(checkpoint)
     # Ensure unique by idMeal
     by_id: Dict[str, Dict[str, Any]] = {}
     for m in meals:
         mid = str(m.get("idMeal"))
         by_id[mid] = m
     data = sorted(by_id.values(), key=lambda x: int(x.get("idMeal", 0)))
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({"meals": data}, f, ensure_ascii=False)
+    write_snapshot(path, data, count=len(data))
+    checkpoint.clear()
     logger.info(f"Saved {len(data)} unique meals to {path}")
@@ -0,0 +1,235 @@
+from __future__ import annotations
+import atexit
+import bisect
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional
+
+from .config import settings
+from .logger import logger
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RESERVOIR_SIZE = 2048
+
+
+class Histogram:
+    """Bucketed latency histogram plus a window of recent samples for percentiles."""
+
+    __slots__ = ("counts", "total", "count", "recent")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.recent: Deque[float] = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.count += other.count
+        self.recent.extend(other.recent)
+
+    def to_dict(self) -> Dict:
+        return {"counts": self.counts, "total": self.total, "count": self.count, "recent": list(self.recent)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Histogram":
+        h = cls()
+        h.counts = list(data["counts"])
+        h.total = data["total"]
+        h.count = data["count"]
+        h.recent.extend(data["recent"])
+        return h
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            h = self.histograms.get(stage)
+            if h is None:
+                h = self.histograms[stage] = Histogram()
+            h.observe(seconds)
+
+    def merge(self, other: "Registry") -> None:
+        with self._lock:
+            for stage, h in other.histograms.items():
+                self.histograms.setdefault(stage, Histogram()).merge(h)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage count, mean and p50/p95/p99 in milliseconds."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "mean_ms": (h.total / h.count * 1000) if h.count else 0.0,
+                    "p50_ms": h.percentile(0.50) * 1000,
+                    "p95_ms": h.percentile(0.95) * 1000,
+                    "p99_ms": h.percentile(0.99) * 1000,
+                }
+                for stage, h in sorted(self.histograms.items())
+            }
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP mealdb_stage_seconds Latency of retrieve/answer pipeline stages",
+            "# TYPE mealdb_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, h.counts):
+                    cumulative += n
+                    lines.append(f'mealdb_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'mealdb_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'mealdb_stage_seconds_sum{{stage="{stage}"}} {h.total}')
+                lines.append(f'mealdb_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {stage: h.to_dict() for stage, h in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Registry":
+        r = cls()
+        r.histograms = {stage: Histogram.from_dict(h) for stage, h in data.items()}
+        return r
+
+
+registry = Registry()
+_enabled = settings.metrics_enabled
+# Per-request breakdown (stage -> seconds), set by ``collect_timings``
+_collector: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("timings", default=None)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("stage", "collector", "start")
+
+    def __init__(self, stage: str, collector: Optional[Dict[str, float]]) -> None:
+        self.stage = stage
+        self.collector = collector
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        elapsed = time.perf_counter() - self.start
+        if _enabled:
+            registry.observe(self.stage, elapsed)
+        if self.collector is not None:
+            self.collector[self.stage] = self.collector.get(self.stage, 0.0) + elapsed
+        return False
+
+
+def span(stage: str):
+    """Time a pipeline stage. Returns a shared no-op context when nothing is listening."""
+    collector = _collector.get()
+    if not _enabled and collector is None:
+        return _NULL_SPAN
+    return _Span(stage, collector)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """Collect the per-stage breakdown (seconds) of everything timed inside the block."""
+    timings: Dict[str, float] = {}
+    token = _collector.set(timings)
+    try:
+        yield timings
+    finally:
+        _collector.reset(token)
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{stage}={seconds * 1000:.3f}ms" for stage, seconds in timings.items())
+
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def load_snapshot(path: Path | None = None) -> Registry:
+    path = Path(path or settings.metrics_file)
+    if not path.exists():
+        return Registry()
+    with path.open("r", encoding="utf-8") as f:
+        return Registry.from_dict(json.load(f))
+
+
+def save_snapshot(path: Path | None = None) -> None:
+    """Merge this process's histograms into the snapshot file read by ``cli stats``."""
+    path = Path(path or settings.metrics_file)
+    if not registry.histograms:
+        return
+    lock_path = path.with_suffix(path.suffix + ".lock")
+    try:
+        with open(lock_path, "w") as lock:
+            try:
+                import fcntl
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            except ImportError:  # pragma: no cover - non-POSIX
+                pass
+            merged = load_snapshot(path)
+            merged.merge(registry)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(merged.to_dict(), f)
+            os.replace(tmp, path)
+        registry.clear()
+    except Exception as e:
+        logger.warning(f"Failed saving metrics snapshot to {path}: {e}")
+
+
+def _save_at_exit() -> None:
+    if _enabled:
+        save_snapshot()
+
+
+atexit.register(_save_at_exit)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from . import db
+from .config import settings
+from .metrics import span
+
+Ranked = List[Tuple[int, float]]
+
+
+class RankedCache:
+    """Short-lived LRU of ranked ``(meal_id, score)`` lists, keyed by query and index version.
+
+    Per process: a cursor landing on another worker (or after expiry) re-ranks once,
+    so the cache only ever saves work and never changes results.
+    """
+
+    def __init__(self, max_entries: int | None = None, ttl_seconds: float | None = None):
+        self.max_entries = settings.search_cursor_cache_size if max_entries is None else max_entries
+        self.ttl_seconds = settings.search_cursor_ttl if ttl_seconds is None else ttl_seconds
+        self._entries: OrderedDict[Tuple[str, int], Tuple[float, Ranked]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, int]) -> Optional[Ranked]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Tuple[str, int], ranked: Ranked) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), ranked)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+ranked_cache = RankedCache()
+
+
+def encode_cursor(query: str, offset: int) -> str:
+    raw = json.dumps({"q": query, "o": offset}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        query, offset = state["q"], state["o"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid search cursor: {cursor!r}") from e
+    if not isinstance(query, str) or not isinstance(offset, int) or offset < 0:
+        raise ValueError(f"Invalid search cursor: {cursor!r}")
+    return query, offset
+
+
+def _index_version() -> int:
+    # A rebuilt index gets a new mtime, so rankings from the old one are never reused
+    try:
+        return db.DB_PATH.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def ranked_ids(query: str) -> Ranked:
+    """Up to SEARCH_MAX_RESULTS ranked ids for ``query``, from the cache when possible."""
+    key = (query, _index_version())
+    ranked = ranked_cache.get(key)
+    if ranked is None:
+        ranked = db.search_meal_ids(query, limit=settings.search_max_results)
+        ranked_cache.set(key, ranked)
+    return ranked
+
+
+def search_page(query: str | None = None, cursor: str | None = None,
+                page_size: int = 10) -> Tuple[List, Optional[str]]:
+    """One page of ``search_meals`` results and the cursor for the next page (None at the end).
+
+    Start with ``query``; continue by passing only the returned ``cursor``. The full
+    ranking is computed once per query and cached, so later pages cost a slice of
+    the cached ids plus a primary-key fetch of just those rows.
+    """
+    if cursor is not None:
+        query, offset = decode_cursor(cursor)
+    elif query is None:
+        raise ValueError("search_page needs a query or a cursor")
+    else:
+        offset = 0
+    page_size = max(1, min(page_size, settings.search_max_results))
+
+    with span("search.rank"):
+        ranked = ranked_ids(query)
+    page = ranked[offset:offset + page_size]
+    with span("search.page"):
+        rows = db.meals_by_ids(page)
+    end = offset + len(page)
+    return rows, (encode_cursor(query, end) if end < len(ranked) else None)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .logger import logger
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts.
+
+    cProfile only keeps caller/callee pairs, so flamegraphs come from these samples
+    instead. The output format (``frame;frame;frame count`` per line) is what
+    flamegraph.pl, speedscope and inferno accept.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.001):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def write_collapsed(self, path: Path) -> None:
+        with path.open("w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile(path: Path, sample_interval: float = 0.001, top: int = 25) -> Iterator[None]:
+    """Profile the enclosed block.
+
+    Writes cProfile stats to ``path`` (load with ``pstats`` or snakeviz) and sampled
+    collapsed stacks to ``path`` with a ``.collapsed`` suffix, then logs the top
+    functions by cumulative time.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval=sample_interval)
+    started = time.perf_counter()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        elapsed = time.perf_counter() - started
+        profiler.dump_stats(str(path))
+        collapsed = path.with_suffix(".collapsed")
+        sampler.write_collapsed(collapsed)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        logger.info(f"Profile ({elapsed:.3f}s) written to {path} and {collapsed}\n{out.getvalue()}")
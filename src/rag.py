@@ -1,9 +1,14 @@
 from __future__ import annotations
+import time
 from typing import List, Dict
 
-from .db import search_meals
+from .analytics import SearchEvent, record_search
+from .db import meals_by_ids
 from .logger import logger
 from .config import settings
+from .metrics import collect_timings, format_timings, span
+from .paging import ranked_ids
+from .store import get_store
 
 try:
     from toolfront import Database  # Optional: use ToolFront Text2SQL for advanced queries
@@ -12,24 +17,41 @@ except Exception:
     _TOOLFRONT_AVAILABLE = False
 
 
+# Schema description handed to ToolFront; the views keep the original column names
+TOOLFRONT_SCHEMA = (
+    "The database contains views meals(id, name, category, area, instructions, thumbnail, tags) and "
+    "meal_ingredients(meal_id, ingredient, measure, position). They are built on normalized tables "
+    "meal_facts(id, name, category_id, area_id, instructions, thumbnail, tags), "
+    "meal_ingredient_facts(meal_id, ingredient_id, measure, position), categories(id, name, description, thumbnail), "
+    "areas(id, name) and ingredients(id, name, description); filter or group on the integer ids "
+    "when joining many rows."
+)
+
+
 def retrieve(question: str, k: int = 5) -> List[Dict]:
-    # Use a simple FTS query; allow natural language by quoting terms with OR
-    # For simplicity, we pass the raw question to MATCH; users can also specify FTS syntax
-    rows = search_meals(question, limit=k)
+    if settings.meal_store:
+        return get_store().retrieve(question, k)
+    # The top k of the query's cached ranking (see paging.ranked_ids): a repeated or
+    # warmed-up question skips the FTS match and costs a primary-key fetch
+    with span("search.rank"):
+        ranked = ranked_ids(question)[:k]
+    rows = meals_by_ids(ranked)
     contexts = []
-    for r in rows:
-        ingredients_preview = ""  # Could join from meal_ingredients if needed
-        contexts.append(
-            {
-                "id": r["id"],
-                "name": r["name"],
-                "category": r["category"],
-                "area": r["area"],
-                "tags": r["tags"],
-                "instructions": r["instructions"],
-                "thumbnail": r["thumbnail"],
-            }
-        )
+    with span("retrieve.build"):
+        for r in rows:
+            ingredients_preview = ""  # Could join from meal_ingredients if needed
+            contexts.append(
+                {
+                    "id": r["id"],
+                    "name": r["name"],
+                    "category": r["category"],
+                    "area": r["area"],
+                    "tags": r["tags"],
+                    "instructions": r["instructions"],
+                    "thumbnail": r["thumbnail"],
+                    "score": r["score"],
+                }
+            )
     return contexts
 
 
@@ -45,30 +67,60 @@ def make_context_block(contexts: List[Dict]) -> str:
     return "\n---\n".join(blocks)
 
 
-def answer(question: str, k: int = 5, use_toolfront_sql: bool = False, model: str | None = None) -> str:
+def answer(question: str, k: int = 5, use_toolfront_sql: bool = False, model: str | None = None,
+           debug: bool = False) -> str:
+    """Retrieve contexts and compose a response. With ``debug`` (or DEBUG_TIMINGS), the
+    per-stage timing breakdown is appended to the response."""
     model = model or settings.default_model
+    if debug or settings.debug_timings:
+        with collect_timings() as timings:
+            response = _answer(question, k, use_toolfront_sql, model)
+        return response + "\n\nTimings: " + format_timings(timings)
+    return _answer(question, k, use_toolfront_sql, model)
+
 
-    # Retrieve contexts
-    contexts = retrieve(question, k=k)
+def _answer(question: str, k: int, use_toolfront_sql: bool, model: str) -> str:
+    started = time.perf_counter()
+    used_toolfront = False
+    contexts: List[Dict] = []
+    try:
+        with span("answer.total"):
+            contexts = retrieve(question, k=k)
+            response, used_toolfront = _compose_answer(question, contexts, use_toolfront_sql, model)
+        return response
+    finally:
+        record_search(SearchEvent(
+            query=question,
+            response_time=time.perf_counter() - started,
+            results=[(c["id"], c["score"]) for c in contexts],
+            use_toolfront=used_toolfront,
+            model_used=model if used_toolfront else "",
+        ))
+
+
+def _compose_answer(question: str, contexts: List[Dict], use_toolfront_sql: bool, model: str) -> tuple[str, bool]:
+    """Build the response for ``answer``; also reports whether ToolFront produced it."""
     if not contexts:
-        return "No relevant meals found. Try different keywords."
+        return "No relevant meals found. Try different keywords.", False
 
-    context_block = make_context_block(contexts)
+    with span("answer.context"):
+        context_block = make_context_block(contexts)
 
     # If ToolFront Database is available and requested, let it formulate SQL to fetch structured answers
     if use_toolfront_sql and _TOOLFRONT_AVAILABLE:
         try:
-            db = Database(f"sqlite:///{(settings.data_dir / 'meals.db').resolve()}")
-            tf_answer = db.ask(
-                f"Using meals and meal_ingredients tables, answer: {question}. If relevant, include meal names.",
-                model=model,
-                context="The database contains tables: meals(id, name, category, area, instructions, thumbnail, tags) and meal_ingredients(meal_id, ingredient, measure).",
-            )
+            with span("answer.toolfront"):
+                db = Database(f"sqlite:///{(settings.data_dir / 'meals.db').resolve()}")
+                tf_answer = db.ask(
+                    f"Using meals and meal_ingredients tables, answer: {question}. If relevant, include meal names.",
+                    model=model,
+                    context=TOOLFRONT_SCHEMA,
+                )
             # Combine structured answer with retrieved context
             return (
                 "Answer (ToolFront Text2SQL):\n" + str(tf_answer) +
                 "\n\nTop supporting context:\n" + context_block
-            )
+            ), True
         except Exception as e:
             logger.warning(f"ToolFront Database.ask failed, falling back to context-only response: {e}")
 
@@ -79,4 +131,4 @@ def answer(question: str, k: int = 5, use_toolfront_sql: bool = False, model: st
         "\n\nProvide a concise answer using the context above."
     )
     # We don't invoke a model directly; ToolFront can be used by the caller if desired.
-    return synthesized
+    return synthesized, False
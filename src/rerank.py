@@ -0,0 +1,170 @@
+from __future__ import annotations
+import re
+import threading
+from typing import Dict, List, Sequence, Set, Tuple
+
+from . import db
+from .config import settings
+from .metrics import span
+
+try:
+    import numpy as np  # Optional: only needed for SEARCH_MODE=rerank
+    _RERANK_AVAILABLE = True
+except Exception:
+    _RERANK_AVAILABLE = False
+
+# Stage 1 matches the short columns only: far fewer postings than instructions
+CANDIDATE_SQL = (
+    "SELECT rowid AS id, bm25(meals_fts) AS score FROM meals_fts "
+    "WHERE meals_fts MATCH '{name tags ingredients} : (' || ? || ')' ORDER BY score LIMIT ?"
+)
+# bm25 is recomputed per column over the candidates' own text: re-scoring them in
+# FTS5 would walk the full doclists of common terms again.
+COLUMNS = ("name", "instructions", "tags", "ingredients")
+FEATURES = COLUMNS + ("overlap", "category", "area")
+DEFAULT_WEIGHTS = {"name": 1.0, "instructions": 0.2, "tags": 0.5, "ingredients": 0.5,
+                   "overlap": 1.5, "category": 2.0, "area": 2.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+TOKEN = re.compile(r"\w+")
+
+# Index-wide document frequencies; counting one term walks its doclist, so cache them
+_doc_freq: Dict[str, int] = {}
+_doc_freq_version: Tuple[int, ...] = ()
+_doc_freq_lock = threading.Lock()
+
+
+def parse_weights(spec: str | None = None) -> Dict[str, float]:
+    """``DEFAULT_WEIGHTS`` overridden by a ``name=1.5,area=3`` spec (default: RERANK_WEIGHTS)."""
+    spec = settings.rerank_weights if spec is None else spec
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        feature, _, value = item.partition("=")
+        feature = feature.strip()
+        if feature not in weights:
+            raise ValueError(f"Unknown rerank feature {feature!r}; expected one of {list(FEATURES)}")
+        weights[feature] = float(value)
+    return weights
+
+
+def _matches(words: Sequence[str], terms: Set[str]) -> bool:
+    return bool(words) and all(w in terms for w in words)
+
+
+def idf(terms: List[str]):
+    """bm25 IDF per term from the FTS index's document counts (cached per index build)."""
+    global _doc_freq, _doc_freq_version
+    try:
+        version = (db.DB_PATH.stat().st_mtime_ns,)
+    except OSError:
+        version = (0,)
+    with _doc_freq_lock:
+        if version != _doc_freq_version:
+            _doc_freq, _doc_freq_version = {}, version
+        missing = [t for t in set(terms) | {""} if t not in _doc_freq]
+    if missing:
+        if settings.db_read_only:
+            conn = db.connect_readonly()
+            conn.execute("PRAGMA query_only = OFF")  # a mode=ro file still allows temp tables
+        else:
+            conn = db.connect()
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS temp.meals_fts_vocab USING fts5vocab(main, meals_fts, row)"
+            )
+            found = {"": conn.execute("SELECT count(*) FROM meals_fts").fetchone()[0]}
+            placeholders = ", ".join("?" for _ in missing)
+            found.update(conn.execute(f"SELECT term, doc FROM temp.meals_fts_vocab WHERE term IN ({placeholders})",
+                                      missing).fetchall())
+        finally:
+            conn.close()
+        with _doc_freq_lock:
+            _doc_freq.update({t: found.get(t, 0) for t in missing})
+    n = _doc_freq[""]
+    df = np.array([_doc_freq[t] for t in terms], dtype=np.float64)
+    return np.log((n - df + 0.5) / (df + 0.5) + 1)
+
+
+def bm25(tf, lengths, weights):
+    """Vectorized bm25 of an (n x terms) term-frequency matrix; ``avgdl`` is the candidates' mean."""
+    avgdl = max(lengths.mean(), 1.0)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avgdl)
+    return (tf * (BM25_K1 + 1) / (tf + norm[:, None])) @ weights
+
+
+def features(conn, ids: List[int], terms: List[str]):
+    """Feature matrix (len(ids) x len(FEATURES)); higher is better for every feature."""
+    terms = list(dict.fromkeys(t.lower() for t in terms))
+    index = {meal_id: i for i, meal_id in enumerate(ids)}
+    term_index = {t: j for j, t in enumerate(terms)}
+    term_set = set(terms)
+    placeholders = ", ".join("?" for _ in ids)
+    x = np.zeros((len(ids), len(FEATURES)), dtype=np.float64)
+    tf = np.zeros((len(COLUMNS), len(ids), len(terms)), dtype=np.float64)
+    lengths = np.zeros((len(COLUMNS), len(ids)), dtype=np.float64)
+
+    def count(column: int, row: int, text: str | None) -> None:
+        tokens = TOKEN.findall(text.lower()) if text else []
+        lengths[column, row] += len(tokens)
+        for token in tokens:
+            j = term_index.get(token)
+            if j is not None:
+                tf[column, row, j] += 1
+
+    overlap = FEATURES.index("overlap")
+    category, area = FEATURES.index("category"), FEATURES.index("area")
+    for meal_id, name, instructions, tags, cat, ar in conn.execute(
+        f"SELECT id, name, instructions, tags, lower(category), lower(area) FROM meals WHERE id IN ({placeholders})",
+        ids,
+    ):
+        i = index[meal_id]
+        count(0, i, name)
+        count(1, i, instructions)
+        count(2, i, tags)
+        x[i, category] = _matches((cat or "").split(), term_set)
+        x[i, area] = _matches((ar or "").split(), term_set)
+    for meal_id, ingredient in conn.execute(
+        f"SELECT meal_id, ingredient FROM meal_ingredients WHERE meal_id IN ({placeholders})", ids
+    ):
+        count(3, index[meal_id], ingredient)
+        if ingredient and _matches(ingredient.lower().split(), term_set):
+            x[index[meal_id], overlap] += 1
+
+    weights = idf(terms)
+    for c in range(len(COLUMNS)):
+        x[:, c] = bm25(tf[c], lengths[c], weights)
+    return x
+
+
+def rerank_ids(query: str, limit: int = 5, candidates: int | None = None,
+               weights: Dict[str, float] | None = None) -> List[Tuple[int, float]]:
+    """Two-stage search: cheap candidates, then a weighted feature score over them.
+
+    Returns ``(meal_id, -score)`` pairs best first, so lower is better as with bm25.
+    """
+    if not _RERANK_AVAILABLE:
+        raise RuntimeError("SEARCH_MODE=rerank requires numpy")
+    # Corrected once, so candidates and feature scores see the same terms
+    terms = db.search_terms(query)
+    if not terms:
+        return []
+    candidates = max(limit, settings.rerank_candidates if candidates is None else candidates)
+    with span("rerank.candidates"):
+        ids = [r[0] for r in db._match(CANDIDATE_SQL, query, terms, candidates)]
+    if not ids:
+        return []
+    w = parse_weights() if weights is None else {**DEFAULT_WEIGHTS, **weights}
+
+    serving = settings.db_read_only
+    conn = db.serving_connection() if serving else db.connect()
+    try:
+        with span("rerank.features"):
+            x = features(conn, ids, terms)
+    finally:
+        if not serving:
+            conn.close()
+    with span("rerank.score"):
+        scores = x @ np.array([w[f] for f in FEATURES])
+        # Stable sort keeps stage-1 order among equal scores
+        order = np.argsort(-scores, kind="stable")[:limit]
+    return [(ids[i], -float(scores[i])) for i in order]
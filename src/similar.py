@@ -0,0 +1,134 @@
+from __future__ import annotations
+import sqlite3
+from array import array
+from typing import Dict
+
+from .config import settings
+from .db import connect, get_generation
+from .logger import logger
+
+try:
+    import numpy as np  # Optional: only needed to build the similar-meals table
+    from scipy import sparse
+    _SIMILAR_AVAILABLE = True
+except Exception:
+    _SIMILAR_AVAILABLE = False
+
+# Neighbor scores within this of the previous build count as unchanged (the CLI
+# shows three decimals); see _record_changes
+SCORE_TOLERANCE = 1e-3
+
+
+def build_similar_index(top_n: int | None = None, memory_mb: float | None = None) -> int:
+    """Precompute the ``top_n`` most similar meals of every meal into ``meal_similar``.
+
+    Meals are rows of a sparse meal x ingredient matrix weighted by IDF (so shared
+    salt or water counts for little) and L2-normalized; similarity is their cosine.
+    Rows are scored in blocks sized so a dense block of scores plus its partition
+    indices (~16 bytes per meal pair) stays under ``memory_mb``. Once a generation
+    has been committed, meals whose neighbors changed are recorded in ``meal_changes``
+    so the next delta ships their rows. Returns the number of neighbor rows written.
+    """
+    if not _SIMILAR_AVAILABLE:
+        raise RuntimeError("Building the similar-meals index requires numpy and scipy")
+    top_n = settings.similar_top_n if top_n is None else top_n
+    memory_mb = memory_mb or settings.similar_memory_mb
+
+    conn = connect()
+    try:
+        meal_index: Dict[int, int] = {}
+        ingredient_index: Dict[str, int] = {}
+        rows, cols = array("l"), array("l")
+        for meal_id, ingredient in conn.execute(
+            "SELECT mi.meal_id, lower(trim(i.name)) FROM meal_ingredient_facts mi "
+            "JOIN ingredients i ON i.id = mi.ingredient_id"
+        ):
+            rows.append(meal_index.setdefault(meal_id, len(meal_index)))
+            cols.append(ingredient_index.setdefault(ingredient, len(ingredient_index)))
+        n = len(meal_index)
+
+        committed = get_generation(conn.cursor())
+        if committed:
+            conn.execute("CREATE TEMP TABLE previous_similar (meal_id INTEGER, rank INTEGER, similar_id INTEGER, "
+                         "score REAL, PRIMARY KEY (meal_id, rank)) WITHOUT ROWID")
+            conn.execute("INSERT INTO previous_similar SELECT meal_id, rank, similar_id, score FROM meal_similar")
+        conn.execute("DELETE FROM meal_similar")
+        written = 0
+        k = min(top_n, n - 1)
+        if k > 0:
+            x = sparse.csr_matrix(
+                (np.ones(len(rows), dtype=np.float32), (np.asarray(rows), np.asarray(cols))),
+                shape=(n, len(ingredient_index)),
+            )
+            x.data[:] = 1.0  # case-folded duplicates collapse to one entry
+            df = np.bincount(x.indices, minlength=x.shape[1])
+            x = x.multiply(np.log((1 + n) / (1 + df)).astype(np.float32) + 1).tocsr()
+            norms = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+            x = sparse.diags(1 / np.maximum(norms, 1e-12)).dot(x).astype(np.float32).tocsr()
+
+            meal_ids = np.fromiter(meal_index, dtype=np.int64, count=n)
+            block = max(1, int(memory_mb * 2**20) // (n * 16))
+            for start in range(0, n, block):
+                stop = min(start + block, n)
+                # sparse x dense is far cheaper than sparse x sparse with a dense result
+                scores = np.ascontiguousarray(x.dot(x[start:stop].T.toarray()).T)
+                scores[np.arange(stop - start), np.arange(start, stop)] = -1.0  # never yourself
+                np.negative(scores, out=scores)  # partition ascending, in place
+                top = np.argpartition(scores, k - 1, axis=1)[:, :k]
+                top_scores = np.take_along_axis(scores, top, axis=1)
+                order = np.argsort(top_scores, axis=1, kind="stable")
+                top = np.take_along_axis(top, order, axis=1)
+                top_scores = -np.take_along_axis(top_scores, order, axis=1)
+                batch = [
+                    (int(meal_ids[start + i]), rank, int(meal_ids[j]), float(score))
+                    for i in range(stop - start)
+                    for rank, (j, score) in enumerate(zip(top[i], top_scores[i]))
+                    if score > 0
+                ]
+                conn.executemany(
+                    "INSERT INTO meal_similar(meal_id, rank, similar_id, score) VALUES (?, ?, ?, ?)", batch
+                )
+                written += len(batch)
+        changed = _record_changes(conn, committed + 1) if committed else n
+        conn.commit()
+    finally:
+        conn.close()
+    logger.info("Built similar-meals index: {} neighbors for {} meals ({} changed)", written, n, changed)
+    return written
+
+
+def _record_changes(conn: sqlite3.Connection, generation: int) -> int:
+    """Diff ``meal_similar`` against ``previous_similar`` and record the changed meals.
+
+    Any changed meal moves every IDF weight a little, which reorders near-ties and
+    nudges scores. A meal counts as changed only when its set of neighbors differs
+    or a score moved by more than ``SCORE_TOLERANCE``; the others get their previous
+    rows back. Replicas, which only receive the changed meals, then stay identical to
+    the primary and the drift cannot add up over generations. Returns the number of
+    changed meals.
+    """
+    conn.execute("CREATE TEMP TABLE changed_similar (meal_id INTEGER PRIMARY KEY)")
+    conn.execute(
+        """
+        INSERT INTO changed_similar(meal_id)
+        SELECT n.meal_id FROM meal_similar n
+        LEFT JOIN previous_similar o ON o.meal_id = n.meal_id AND o.similar_id = n.similar_id
+        WHERE o.meal_id IS NULL OR abs(o.score - n.score) > ?
+        UNION
+        SELECT o.meal_id FROM previous_similar o
+        LEFT JOIN meal_similar n ON n.meal_id = o.meal_id AND n.similar_id = o.similar_id
+        WHERE n.meal_id IS NULL
+        """,
+        (SCORE_TOLERANCE,),
+    )
+    conn.execute("DELETE FROM meal_similar WHERE meal_id NOT IN (SELECT meal_id FROM changed_similar)")
+    conn.execute("INSERT INTO meal_similar(meal_id, rank, similar_id, score) "
+                 "SELECT meal_id, rank, similar_id, score FROM previous_similar "
+                 "WHERE meal_id NOT IN (SELECT meal_id FROM changed_similar)")
+    # Upserted and deleted meals already ship (or drop) their neighbor rows
+    conn.execute("INSERT OR IGNORE INTO meal_changes(generation, meal_id, op) "
+                 "SELECT ?, meal_id, 'similar' FROM changed_similar", (generation,))
+    changed = conn.execute("SELECT count(*) FROM changed_similar").fetchone()[0]
+    conn.execute("DROP TABLE changed_similar")
+    conn.execute("DROP TABLE previous_similar")
+    return changed
@@ -0,0 +1,63 @@
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .compression import open_text
+
+# Snapshots are NDJSON: an optional header line, then one meal per line, so
+# readers start on the first record and never hold the whole dataset. Legacy
+# `{"meals": [...]}` (or bare list) documents are still read, just not streamed.
+HEADER_KEY = "_snapshot"
+FORMAT_VERSION = 1
+
+
+def write_snapshot(path: Path | str, meals: Iterable[Dict[str, Any]], count: Optional[int] = None,
+                   codec: str | None = None) -> int:
+    """Stream ``meals`` to ``path`` (compressed per ``codec``/COMPRESSION). Returns meals written.
+
+    Pass ``count`` when known up front; readers use it for progress via ``read_header``.
+    """
+    written = 0
+    with open_text(path, "w", codec) as f:
+        header: Dict[str, Any] = {HEADER_KEY: FORMAT_VERSION}
+        if count is not None:
+            header["count"] = count
+        f.write(json.dumps(header) + "\n")
+        for meal in meals:
+            f.write(json.dumps(meal, ensure_ascii=False) + "\n")
+            written += 1
+    return written
+
+
+def _is_legacy(record: Any) -> bool:
+    return isinstance(record, list) or (isinstance(record, dict) and "meals" in record)
+
+
+def read_header(path: Path | str) -> Dict[str, Any]:
+    """The snapshot's header line, or ``{}`` for legacy documents and header-less files."""
+    with open_text(path) as f:
+        first = f.readline()
+    try:
+        record = json.loads(first)
+    except ValueError:
+        return {}
+    return record if isinstance(record, dict) and HEADER_KEY in record else {}
+
+
+def iter_snapshot(path: Path | str) -> Iterator[Dict[str, Any]]:
+    """Yield meals from an NDJSON snapshot as they are read, or from a legacy document."""
+    with open_text(path) as f:
+        first = f.readline()
+        try:
+            record = json.loads(first) if first.strip() else None
+        except ValueError:
+            record = json.loads(first + f.read())  # multi-line legacy document
+        if _is_legacy(record):
+            yield from (record if isinstance(record, list) else record.get("meals") or [])
+            return
+        if isinstance(record, dict) and HEADER_KEY not in record:
+            yield record
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
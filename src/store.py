@@ -0,0 +1,154 @@
+from __future__ import annotations
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import db
+from .config import settings
+from .logger import logger
+from .metrics import span
+from .paging import ranked_ids
+
+
+class MealRecord:
+    """Serving fields of one meal.
+
+    Category, area and tags are interned at load time, so the handful of distinct
+    values is shared by every record. Instructions (the bulk of each row) stay in
+    SQLite and are fetched on demand by ``MealStore.instructions``.
+    """
+
+    __slots__ = ("id", "name", "category", "area", "tags", "thumbnail")
+
+    def __init__(self, id: int, name: str, category: Optional[str], area: Optional[str],
+                 tags: Optional[str], thumbnail: Optional[str]):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.area = area
+        self.tags = tags
+        self.thumbnail = thumbnail
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+class MealStore:
+    """Meals held in memory for serving; FTS only supplies the ranked ids.
+
+    Load once per process (``get_store``), ideally in the parent before forking
+    workers. The store is a snapshot: meals indexed after loading are skipped
+    until ``reset_store`` is called.
+    """
+
+    def __init__(self, path: Path | None = None, instructions_cache: int | None = None):
+        self.path = Path(path or db.DB_PATH)
+        self.meals: Dict[int, MealRecord] = {}
+        self.instructions_cache = (settings.meal_store_instructions_cache
+                                   if instructions_cache is None else instructions_cache)
+        self._instructions: OrderedDict[int, Optional[str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path | None = None, instructions_cache: int | None = None) -> "MealStore":
+        store = cls(path, instructions_cache)
+        conn = db.connect_readonly(store.path, immutable=False)
+        conn.row_factory = None
+        try:
+            cur = conn.execute("SELECT id, name, category, area, tags, thumbnail FROM meals")
+            while True:
+                rows = cur.fetchmany(1000)
+                if not rows:
+                    break
+                for meal_id, name, category, area, tags, thumbnail in rows:
+                    store.meals[meal_id] = MealRecord(
+                        meal_id, name, _intern(category), _intern(area), _intern(tags), thumbnail
+                    )
+        finally:
+            conn.close()
+        logger.info(f"Loaded {len(store.meals)} meals into the in-memory store")
+        return store
+
+    def __len__(self) -> int:
+        return len(self.meals)
+
+    def instructions(self, meal_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+        """Instructions for ``meal_ids``, from a small LRU backed by one IN query for misses."""
+        found: Dict[int, Optional[str]] = {}
+        missing: List[int] = []
+        with self._lock:
+            for meal_id in meal_ids:
+                if meal_id in self._instructions:
+                    self._instructions.move_to_end(meal_id)
+                    found[meal_id] = self._instructions[meal_id]
+                else:
+                    missing.append(meal_id)
+        if not missing:
+            return found
+
+        serving = settings.db_read_only
+        conn = db.serving_connection() if serving else db.connect()
+        try:
+            placeholders = ",".join("?" * len(missing))
+            rows = conn.execute(
+                f"SELECT id, instructions FROM meal_facts WHERE id IN ({placeholders})", missing
+            ).fetchall()
+        finally:
+            if not serving:
+                conn.close()
+        with self._lock:
+            for meal_id, text in rows:
+                found[meal_id] = text
+                if self.instructions_cache > 0:
+                    self._instructions[meal_id] = text
+            while len(self._instructions) > self.instructions_cache:
+                self._instructions.popitem(last=False)
+        return found
+
+    def retrieve(self, question: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Same result shape as ``rag.retrieve``, assembled from memory."""
+        with span("search.rank"):
+            ranked = ranked_ids(question)[:k]
+        contexts = []
+        with span("retrieve.build"):
+            instructions = self.instructions(meal_id for meal_id, _ in ranked)
+            for meal_id, score in ranked:
+                m = self.meals.get(meal_id)
+                if m is None:
+                    continue  # indexed after this store was loaded
+                contexts.append(
+                    {
+                        "id": m.id,
+                        "name": m.name,
+                        "category": m.category,
+                        "area": m.area,
+                        "tags": m.tags,
+                        "instructions": instructions.get(meal_id),
+                        "thumbnail": m.thumbnail,
+                        "score": score,
+                    }
+                )
+        return contexts
+
+
+_store: Optional[MealStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> MealStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MealStore.load()
+    return _store
+
+
+def reset_store() -> None:
+    """Drop the loaded store (e.g. after a rebuild); the next ``get_store`` reloads."""
+    global _store
+    with _store_lock:
+        _store = None
@@ -0,0 +1,149 @@
+from __future__ import annotations
+import heapq
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import db
+from .logger import logger
+
+# Most suggestions a caller can ask for; also the length of the precomputed lists
+MAX_SUGGESTIONS = 20
+# Prefix ranges longer than this get their top entries precomputed at load time
+SCAN_LIMIT = 256
+# Kinds are ranked separately and interleaved in this order
+KINDS = ("meal", "ingredient")
+
+
+class Suggester:
+    """Prefix autocomplete over meal names and ingredients, ranked by popularity.
+
+    Popularity is only comparable within a kind (meals sharing a name vs meals using
+    an ingredient), so each kind is ranked on its own and the rankings are
+    interleaved: the top meal, the top ingredient, the second meal, and so on.
+    Entries are stored in that order, so an entry's index is its rank. Every word
+    start of an entry's text becomes a lowercased key in one sorted list with a
+    parallel array of entry indices: a prefix is a contiguous ``bisect`` range and
+    its best entries are the smallest indices in it. Ranges too long to scan per
+    keystroke (short prefixes) have their top ``MAX_SUGGESTIONS`` computed up front.
+    """
+
+    def __init__(self, entries: List[Tuple[str, str, int]]):
+        entries = _interleave(entries)
+        self.texts = [sys.intern(text) for text, _, _ in entries]
+        self.kinds = [kind for _, kind, _ in entries]
+        self.popularity = array("l", (count for _, _, count in entries))
+
+        keyed = sorted(
+            (text[start:].lower(), i)
+            for i, text in enumerate(self.texts)
+            for start in _word_starts(text)
+        )
+        self.keys = [key for key, _ in keyed]
+        self.entry_ids = array("l", (i for _, i in keyed))
+        self.top: Dict[str, List[int]] = {}
+        self._precompute()
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "Suggester":
+        conn = db.connect_readonly(path, immutable=False)
+        conn.row_factory = None
+        try:
+            entries = [(name, "meal", count) for name, count in conn.execute(
+                "SELECT min(name), COUNT(*) FROM meal_facts GROUP BY lower(trim(name))"
+            )]
+            entries += [(name, "ingredient", count) for name, count in conn.execute(
+                "SELECT min(i.name), COUNT(DISTINCT mi.meal_id) FROM ingredients i "
+                "JOIN meal_ingredient_facts mi ON mi.ingredient_id = i.id "
+                "GROUP BY lower(trim(i.name))"
+            )]
+        finally:
+            conn.close()
+        suggester = cls([(text.strip(), kind, count) for text, kind, count in entries if text and text.strip()])
+        logger.info(f"Loaded autocomplete index: {len(suggester.texts)} entries, {len(suggester.keys)} keys, "
+                    f"{len(suggester.top)} precomputed prefixes")
+        return suggester
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        # Every key starting with prefix sorts before prefix + the highest code point
+        return lo, bisect_left(self.keys, prefix + "\U0010ffff", lo)
+
+    def _best(self, lo: int, hi: int, n: int) -> List[int]:
+        return heapq.nsmallest(n, set(self.entry_ids[lo:hi]))
+
+    def _precompute(self) -> None:
+        pending = [""]
+        while pending:
+            prefix = pending.pop()
+            lo, hi = self._range(prefix)
+            if hi - lo <= SCAN_LIMIT:
+                continue
+            if prefix:
+                self.top[prefix] = self._best(lo, hi, MAX_SUGGESTIONS)
+            # Recurse into the distinct next characters present in this range
+            i = lo
+            while i < hi:
+                key = self.keys[i]
+                if len(key) == len(prefix):
+                    i += 1
+                    continue
+                child = key[:len(prefix) + 1]
+                pending.append(child)
+                i = bisect_left(self.keys, child + "\U0010ffff", i, hi)
+
+    def suggest(self, prefix: str, n: int = 10) -> List[Dict[str, object]]:
+        """Up to ``n`` meal names/ingredients with a word starting with ``prefix``, most popular first."""
+        prefix = " ".join(prefix.lower().split())
+        n = max(0, min(n, MAX_SUGGESTIONS))
+        if not prefix or not n:
+            return []
+        best = self.top.get(prefix)
+        if best is None:
+            best = self._best(*self._range(prefix), n)
+        return [{"text": self.texts[i], "kind": self.kinds[i], "popularity": self.popularity[i]}
+                for i in best[:n]]
+
+
+def _interleave(entries: List[Tuple[str, str, int]]) -> List[Tuple[str, str, int]]:
+    by_kind: Dict[str, List[Tuple[str, str, int]]] = {}
+    for entry in entries:
+        by_kind.setdefault(entry[1], []).append(entry)
+    ranked = []
+    for kind, group in by_kind.items():
+        group.sort(key=lambda e: (-e[2], e[0].lower()))
+        order = KINDS.index(kind) if kind in KINDS else len(KINDS)
+        ranked.extend((rank, order, entry) for rank, entry in enumerate(group))
+    ranked.sort(key=lambda r: (r[0], r[1]))
+    return [entry for _, _, entry in ranked]
+
+
+def _word_starts(text: str) -> List[int]:
+    return [i for i, ch in enumerate(text) if not ch.isspace() and (i == 0 or text[i - 1].isspace())]
+
+
+_suggester: Optional[Suggester] = None
+_suggester_lock = threading.Lock()
+
+
+def get_suggester() -> Suggester:
+    global _suggester
+    if _suggester is None:
+        with _suggester_lock:
+            if _suggester is None:
+                _suggester = Suggester.load()
+    return _suggester
+
+
+def reset_suggester() -> None:
+    """Drop the loaded index (e.g. after a rebuild); the next call reloads it."""
+    global _suggester
+    with _suggester_lock:
+        _suggester = None
+
+
+def suggest(prefix: str, n: int = 10) -> List[Dict[str, object]]:
+    return get_suggester().suggest(prefix, n)
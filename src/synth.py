@@ -0,0 +1,106 @@
+"""Deterministic synthetic TheMealDB payloads for offline benchmarks and tests.
+
+Records have the same keys as `search.php` results (20 ingredient/measure slots,
+unused ones empty) with ingredient counts, instruction lengths and tag/area/category
+distributions loosely modelled on the real dataset.
+"""
+from __future__ import annotations
+import random
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from . import snapshot
+
+CATEGORIES = ["Beef", "Breakfast", "Chicken", "Dessert", "Goat", "Lamb", "Miscellaneous", "Pasta",
+              "Pork", "Seafood", "Side", "Starter", "Vegan", "Vegetarian"]
+# Weighted towards the areas that dominate TheMealDB
+AREAS = (["British"] * 6 + ["American"] * 5 + ["French"] * 4 + ["Italian"] * 4 + ["Indian"] * 3
+         + ["Mexican"] * 3 + ["Chinese"] * 3 + ["Canadian", "Croatian", "Dutch", "Egyptian", "Filipino",
+         "Greek", "Irish", "Jamaican", "Japanese", "Kenyan", "Malaysian", "Moroccan", "Polish", "Portuguese",
+         "Russian", "Spanish", "Thai", "Tunisian", "Turkish", "Ukrainian", "Vietnamese"])
+PROTEINS = ["Chicken", "Beef", "Pork", "Lamb", "Salmon", "Prawn", "Tofu", "Cod", "Duck", "Turkey",
+            "Chickpea", "Lentil", "Mushroom", "Egg", "Sausage", "Tuna", "Goat", "Halloumi"]
+DISHES = ["Curry", "Stew", "Pie", "Tart", "Salad", "Soup", "Casserole", "Stir Fry", "Tagine", "Risotto",
+          "Pasta Bake", "Burger", "Tacos", "Kebab", "Roast", "Noodles", "Biryani", "Gratin", "Wellington"]
+STYLES = ["Classic", "Spicy", "Creamy", "Smoky", "Easy", "Rustic", "Honey Glazed", "Garlic", "Lemon",
+          "Slow Cooked", "Crispy", "Herby", "Sticky", "Baked", "Grilled", "Braised", "Mediterranean"]
+INGREDIENTS = [
+    "Salt", "Black Pepper", "Olive Oil", "Butter", "Onion", "Garlic", "Water", "Eggs", "Plain Flour",
+    "Sugar", "Milk", "Vegetable Oil", "Tomatoes", "Carrots", "Chicken Stock", "Lemon", "Ginger", "Cumin",
+    "Coriander", "Paprika", "Thyme", "Bay Leaf", "Parsley", "Red Pepper", "Potatoes", "Rice", "Soy Sauce",
+    "Honey", "Double Cream", "Cheddar Cheese", "Parmesan", "Spinach", "Mushrooms", "Celery", "Chilli",
+    "Cinnamon", "Turmeric", "Garam Masala", "Coconut Milk", "Lime", "Spring Onions", "Beef Stock",
+    "Tomato Puree", "Red Wine", "White Wine", "Basil", "Oregano", "Rosemary", "Mozzarella", "Yogurt",
+    "Brown Sugar", "Baking Powder", "Vanilla Extract", "Breadcrumbs", "Peas", "Leek", "Cabbage", "Apple",
+    "Chickpeas", "Lentils", "Fish Sauce", "Sesame Oil", "Worcestershire Sauce", "Mustard", "Vinegar",
+    "Cornflour", "Nutmeg", "Cloves", "Cardamom", "Saffron", "Mint", "Dill", "Avocado", "Sweetcorn",
+    "Courgette", "Aubergine", "Pine Nuts", "Almonds", "Raisins", "Feta", "Puff Pastry", "Bacon",
+] + PROTEINS
+UNITS = ["g", "kg", "ml", "l", " tbs", " tsp", " cup", " cups", " oz", " lb", " pinch", " handful",
+         " cloves", " chopped", " sliced", " to taste", ""]
+VERBS = ["Heat", "Add", "Stir", "Chop", "Mix", "Simmer", "Bake", "Fry", "Season", "Whisk", "Pour",
+         "Serve", "Preheat", "Cover", "Drain", "Roast", "Blend", "Fold", "Marinate", "Slice"]
+FILLER = ["the", "into", "with", "until", "for", "minutes", "over", "medium", "heat", "a", "large",
+          "pan", "bowl", "oven", "gently", "golden", "soft", "then", "and", "well", "remaining",
+          "mixture", "sauce", "together", "about", "hot", "tender", "lid", "reduce", "boil"]
+TAGS = ["Meat", "Casserole", "Pie", "Curry", "Spicy", "Baking", "Dessert", "Vegetarian", "Vegan",
+        "Quick", "Easy", "Streetfood", "Soup", "Salad", "Onthego", "Sidedish", "Dinnerparty", "Mainmeal",
+        "Breakfast", "Fish", "Seafood", "Pasta", "Cake", "Sweet", "Savory", "Christmas", "Summer"]
+
+
+def _instructions(rnd: random.Random, ingredients: list[str]) -> str:
+    sentences = []
+    # Real instructions run from a few lines to several paragraphs; skew long-tailed
+    for _ in range(max(3, int(rnd.lognormvariate(2.3, 0.5)))):
+        words = [rnd.choice(VERBS)]
+        words += rnd.choices(FILLER, k=rnd.randint(5, 16))
+        words.insert(rnd.randint(1, len(words)), rnd.choice(ingredients).lower())
+        sentences.append(" ".join(words) + ".")
+    paragraphs = [" ".join(sentences[i:i + 4]) for i in range(0, len(sentences), 4)]
+    return "\r\n".join(paragraphs)
+
+
+def generate_meal(meal_id: int, seed: int = 0) -> Dict[str, Any]:
+    """One synthetic meal; the same (meal_id, seed) always yields the same payload."""
+    rnd = random.Random(seed * 1_000_003 + meal_id)
+    protein = rnd.choice(PROTEINS)
+    name = f"{rnd.choice(STYLES)} {protein} {rnd.choice(DISHES)}"
+    # Real meals use 3-20 ingredients, mostly 7-12
+    n_ingredients = max(3, min(20, int(rnd.gauss(9.5, 3.5))))
+    ingredients = [protein] + rnd.sample([i for i in INGREDIENTS if i != protein], n_ingredients - 1)
+    meal: Dict[str, Any] = {
+        "idMeal": str(meal_id),
+        "strMeal": name,
+        "strDrinkAlternate": None,
+        "strCategory": rnd.choice(CATEGORIES),
+        "strArea": rnd.choice(AREAS),
+        "strInstructions": _instructions(rnd, ingredients),
+        "strMealThumb": f"https://www.themealdb.com/images/media/meals/synthetic{meal_id}.jpg",
+        "strTags": ",".join(rnd.sample(TAGS, rnd.choice([0, 1, 1, 2, 2, 3]))) or None,
+        "strYoutube": f"https://www.youtube.com/watch?v=synth{meal_id}" if rnd.random() < 0.8 else "",
+    }
+    for i in range(1, 21):
+        if i <= n_ingredients:
+            meal[f"strIngredient{i}"] = ingredients[i - 1]
+            meal[f"strMeasure{i}"] = f"{rnd.choice([1, 2, 3, 4, 50, 100, 200, 250, 500])}{rnd.choice(UNITS)}"
+        else:
+            meal[f"strIngredient{i}"] = ""
+            meal[f"strMeasure{i}"] = " " if rnd.random() < 0.3 else ""
+    meal.update({
+        "strSource": f"https://example.com/recipes/{meal_id}" if rnd.random() < 0.6 else None,
+        "strImageSource": None,
+        "strCreativeCommonsConfirmed": None,
+        "dateModified": None,
+    })
+    return meal
+
+
+def generate_meals(n: int, seed: int = 0, start_id: int = 52000) -> Iterator[Dict[str, Any]]:
+    """Stream ``n`` synthetic meals with consecutive ids starting at ``start_id``."""
+    for meal_id in range(start_id, start_id + n):
+        yield generate_meal(meal_id, seed)
+
+
+def write_snapshot(path: Path, n: int, seed: int = 0) -> int:
+    """Write an NDJSON snapshot like `dump_full_dataset_json`, streaming records."""
+    return snapshot.write_snapshot(path, generate_meals(n, seed), count=n)
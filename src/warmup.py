@@ -0,0 +1,169 @@
+from __future__ import annotations
+import atexit
+import json
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import compression, db, paging, rerank
+from .config import settings
+from .logger import logger
+from .rag import retrieve
+
+STATE_VERSION = 1
+
+
+def hot_queries(n: int | None = None, log_path: Path | str | None = None) -> List[str]:
+    """The ``n`` most frequent queries, from a query log or the Django SearchQuery history.
+
+    A log has one query per line, either plain text or a JSON object with a ``query``
+    key (e.g. the slow-query log records).
+    """
+    n = settings.warm_queries if n is None else n
+    log_path = log_path or settings.warm_query_log
+    if log_path:
+        counts: Counter = Counter()
+        with compression.open_text(log_path) as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("{"):
+                    try:
+                        line = str(json.loads(line).get("query") or "").strip()
+                    except ValueError:
+                        pass
+                if line:
+                    counts[line] += 1
+        return [query for query, _ in counts.most_common(n)]
+    try:
+        return _search_history(n)
+    except Exception as e:
+        logger.warning(f"No query history to warm from: {e}")
+        return []
+
+
+def _search_history(n: int) -> List[str]:
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mealdb_admin.settings")
+        django.setup()
+    from django.db.models import Count
+    from meals.models import SearchQuery
+
+    rows = SearchQuery.objects.values("query").annotate(hits=Count("id")).order_by("-hits", "query")[:n]
+    return [row["query"] for row in rows]
+
+
+def warm(queries: Optional[List[str]] = None, budget_seconds: float | None = None,
+         preload: bool | None = None, k: int = 5) -> Dict[str, Any]:
+    """Prime the page cache and replay hot queries through ``retrieve`` until the budget runs out.
+
+    ``retrieve`` serves from the ranked-id cache (and the meal store's instructions
+    LRU), so the replay fills exactly the caches ``save_state`` persists.
+    """
+    budget = settings.warm_budget_seconds if budget_seconds is None else budget_seconds
+    preload = settings.warm_preload if preload is None else preload
+    deadline = time.monotonic() + budget
+    queries = hot_queries() if queries is None else queries
+    stats: Dict[str, Any] = {"queries": 0, "of": len(queries), "preloaded_bytes": 0}
+    started = time.monotonic()
+    if preload and db.DB_PATH.exists():
+        stats["preloaded_bytes"] = db.preload_db()
+    for query in queries:
+        if time.monotonic() >= deadline:
+            logger.info(f"Warm-up budget of {budget:.0f}s spent after {stats['queries']}/{len(queries)} queries")
+            break
+        try:
+            retrieve(query, k=k)
+        except Exception as e:
+            logger.debug("Warm-up query {!r} failed: {}", query, e)
+            continue
+        stats["queries"] += 1
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    logger.info(f"Warm-up: {stats}")
+    return stats
+
+
+def _index_version() -> int:
+    try:
+        return db.DB_PATH.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def save_state(path: Path | str | None = None) -> Optional[Path]:
+    """Persist this process's retrieval caches so a restart can ``load_state`` them."""
+    path = path or settings.warm_state_file
+    if not path:
+        return None
+    path = Path(path)
+    from . import store
+
+    with paging.ranked_cache._lock:
+        ranked = {query: entry[1] for (query, version), entry in paging.ranked_cache._entries.items()
+                  if version == _index_version()}
+    instructions: List[int] = []
+    if store._store is not None:
+        with store._store._lock:
+            instructions = list(store._store._instructions)
+    state = {
+        "version": STATE_VERSION,
+        "index": _index_version(),
+        "ranked": ranked,
+        "doc_freq": rerank._doc_freq if rerank._doc_freq_version == (_index_version(),) else {},
+        "instructions": instructions,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(compression.dumps(state))
+    os.replace(tmp, path)
+    logger.info(f"Saved warm state ({len(ranked)} rankings, {len(state['doc_freq'])} terms, "
+                f"{len(instructions)} instructions) to {path}")
+    return path
+
+
+def load_state(path: Path | str | None = None) -> bool:
+    """Restore caches saved by ``save_state``; skipped when the index was rebuilt since."""
+    path = path or settings.warm_state_file
+    if not path or not Path(path).exists():
+        return False
+    path = Path(path)
+    try:
+        state = compression.loads(path.read_bytes())
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable warm state {path}: {e}")
+        return False
+    version = _index_version()
+    if state.get("version") != STATE_VERSION or state.get("index") != version:
+        logger.info(f"Warm state {path} is for another index build; starting cold")
+        return False
+    for query, ranked in state["ranked"].items():
+        paging.ranked_cache.set((query, version), [tuple(pair) for pair in ranked])
+    with rerank._doc_freq_lock:
+        rerank._doc_freq, rerank._doc_freq_version = dict(state["doc_freq"]), (version,)
+    if state["instructions"] and settings.meal_store:
+        from .store import get_store
+        get_store().instructions(state["instructions"])
+    logger.info(f"Loaded warm state from {path}")
+    return True
+
+
+_persisting = False
+
+
+def persist_at_exit() -> None:
+    """Save the caches when this process exits (WARM_STATE_FILE must be set)."""
+    global _persisting
+    if settings.warm_state_file and not _persisting:
+        _persisting = True
+        atexit.register(_save_at_exit)
+
+
+def _save_at_exit() -> None:
+    try:
+        save_state()
+    except Exception as e:
+        logger.warning(f"Failed saving warm state: {e}")
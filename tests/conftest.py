@@ -0,0 +1,45 @@
+"""Shared pytest setup."""
+from __future__ import annotations
+import os
+import tempfile
+
+# src.logger adds its file sinks on import, so point them away from the tracked
+# ./logs before any test module imports src
+_LOG_DIR = tempfile.mkdtemp(prefix="mealdb-test-logs-")
+os.environ["LOG_FILE"] = os.path.join(_LOG_DIR, "mealdb-rag.log")
+os.environ["SLOW_QUERY_LOG"] = os.path.join(_LOG_DIR, "slow-queries.log")
+
+from typing import Any, Callable, Dict, Iterable, List  # noqa: E402
+
+import pytest  # noqa: E402
+
+from src import db  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+
+@pytest.fixture
+def make_index(tmp_path, monkeypatch):
+    """Factory for a throwaway index at ``tmp_path / name``, installed as ``db.DB_PATH``.
+
+    ``meals`` is a count of synthetic meals (``generate_meals(meals, seed=seed)``) or
+    the meal dicts themselves. Each callable in ``reset`` clears a module-level cache
+    before the index is filled and again at teardown. With ``init=False`` the file is
+    left for the test to create. Returns the path.
+    """
+    resets: List[Callable[[], None]] = []
+
+    def make(meals: int | Iterable[Dict[str, Any]] = 0, seed: int = 0,
+             reset: Iterable[Callable[[], None]] = (), name: str = "meals.db", init: bool = True):
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / name)
+        for fn in reset:
+            fn()
+            resets.append(fn)
+        if init:
+            db.init_db()
+            if meals:
+                db.upsert_meals(generate_meals(meals, seed=seed) if isinstance(meals, int) else meals)
+        return db.DB_PATH
+
+    yield make
+    for fn in resets:
+        fn()
@@ -0,0 +1,84 @@
+"""Tests for the buffered search analytics recorder."""
+from __future__ import annotations
+import threading
+import time
+
+from src import rag
+from src.analytics import AnalyticsRecorder, SearchEvent
+
+
+def event(query: str = "pasta") -> SearchEvent:
+    return SearchEvent(query=query, response_time=0.01, results=[(1, -2.5)])
+
+
+def test_flushes_in_background_when_batch_fills():
+    batches = []
+    recorder = AnalyticsRecorder(sink=batches.append, capacity=100, batch_size=3, flush_interval=60)
+    for i in range(3):
+        assert recorder.record(event(f"q{i}"))
+    deadline = time.monotonic() + 5
+    while not batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [e.query for e in batches[0]] == ["q0", "q1", "q2"]
+    recorder.close()
+
+
+def test_flushes_on_interval_and_close():
+    batches = []
+    recorder = AnalyticsRecorder(sink=batches.append, capacity=100, batch_size=50, flush_interval=0.05)
+    recorder.record(event())
+    deadline = time.monotonic() + 5
+    while not batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(batches) == 1
+    recorder.record(event())
+    recorder.close()
+    assert recorder.stats()["flushed"] == 2
+
+
+def test_drops_and_counts_under_backpressure():
+    release = threading.Event()
+
+    def slow_sink(batch):
+        release.wait(5)
+
+    recorder = AnalyticsRecorder(sink=slow_sink, capacity=2, batch_size=1, flush_interval=60)
+    accepted = [recorder.record(event()) for _ in range(10)]
+    assert accepted.count(False) == recorder.stats()["dropped"] > 0
+    release.set()
+    recorder.close()
+    stats = recorder.stats()
+    assert stats["flushed"] + stats["dropped"] == 10
+
+
+def test_full_buffer_evicts_the_oldest_events():
+    batches = []
+    recorder = AnalyticsRecorder(sink=batches.extend, capacity=3, batch_size=100, flush_interval=60)
+    for i in range(5):
+        recorder.record(SearchEvent(query=f"q{i}", response_time=0.01))
+    assert recorder.stats()["dropped"] == 2
+    recorder.flush()
+    assert [e.query for e in batches] == ["q2", "q3", "q4"]
+
+
+def test_sink_failures_are_counted():
+    def broken_sink(batch):
+        raise RuntimeError("db down")
+
+    recorder = AnalyticsRecorder(sink=broken_sink, capacity=10, batch_size=5, flush_interval=60)
+    recorder.record(event())
+    recorder.close()
+    assert recorder.stats()["failed"] == 1
+
+
+def test_answer_records_results(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(rag, "record_search", recorded.append)
+    monkeypatch.setattr(rag, "retrieve", lambda q, k=5: [{
+        "id": 7, "name": "Pasta", "category": "Pasta", "area": "Italian", "tags": "",
+        "instructions": "Boil.", "thumbnail": "", "score": -1.5,
+    }])
+    rag.answer("pasta")
+    assert recorded[0].query == "pasta"
+    assert recorded[0].results == [(7, -1.5)]
+    assert recorded[0].use_toolfront is False
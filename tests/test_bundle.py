@@ -0,0 +1,117 @@
+"""Tests for bundle export/import."""
+from __future__ import annotations
+import json
+import tarfile
+
+import pytest
+
+from src import bundle, compression, db, delta, snapshot
+from src.config import settings
+from src.synth import generate_meals
+
+
+@pytest.fixture
+def node(tmp_path, monkeypatch):
+    """A node with a built index, snapshot and file cache under tmp_path/<name>."""
+    def make(name):
+        root = tmp_path / name
+        (root / "cache").mkdir(parents=True)
+        monkeypatch.setattr(settings, "data_dir", root / "data")
+        monkeypatch.setattr(settings, "cache_dir", root / "cache")
+        monkeypatch.setattr(settings, "cache_backend", "file")
+        monkeypatch.setattr(db, "DB_PATH", root / "data" / "meals.db")
+        settings.data_dir.mkdir()
+        return root
+    return make
+
+
+def _build(root):
+    meals = list(generate_meals(50, seed=3))
+    db.init_db()
+    db.upsert_meals(meals)
+    delta.commit_generation(root / "deltas")
+    snapshot.write_snapshot(settings.data_dir / "meals.ndjson", meals, count=len(meals))
+    (settings.cache_dir / "abc.json").write_text(json.dumps({"meals": None}))
+
+
+def test_round_trip(node, tmp_path):
+    _build(node("source"))
+    archive = tmp_path / "mealdb.tar.gz"
+    manifest = bundle.export_bundle(archive, codec="gzip")
+    assert manifest["schema_version"] == db.SCHEMA_VERSION
+    assert manifest["counts"] == {"meals": 50, "snapshot_meals": 50, "cache_entries": 1}
+    with tarfile.open(archive) as tar:
+        names = tar.getnames()
+    assert names[0] == bundle.MANIFEST and names[-1] == bundle.CHECKSUMS
+
+    target = node("target")
+    assert bundle.import_bundle(archive)["index_generation"] == manifest["index_generation"] == 1
+    name = next(iter(generate_meals(50, seed=3)))["strMeal"]
+    assert db.search_meals(name)[0]["name"] == name
+    assert (target / "cache" / "abc.json").exists()
+    assert snapshot.read_header(settings.data_dir / "meals.ndjson")["count"] == 50
+    assert bundle.installed_manifest()["counts"]["meals"] == 50
+    assert not list(settings.data_dir.glob(".bundle-*"))
+
+
+def test_import_over_a_live_wal_database(node, tmp_path):
+    _build(node("source"))
+    archive = tmp_path / "mealdb.tar"
+    bundle.export_bundle(archive, codec="none")
+
+    node("target")
+    db.init_db()
+    live = db.connect()
+    live.execute("PRAGMA journal_mode=WAL")
+    live.execute("INSERT INTO meal_facts(id, name) VALUES (424242, 'Stale')")
+    live.commit()  # left in the -wal file while this connection stays open
+    try:
+        bundle.import_bundle(archive)
+        conn = db.connect()
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert conn.execute("SELECT count(*) FROM meal_facts").fetchone()[0] == 50
+        conn.close()
+    finally:
+        live.close()
+    conn = db.connect()
+    assert conn.execute("SELECT count(*) FROM meal_facts WHERE id = 424242").fetchone()[0] == 0
+    conn.close()
+
+
+def test_tampered_bundle_installs_nothing(node, tmp_path):
+    _build(node("source"))
+    archive = tmp_path / "mealdb.tar"
+    bundle.export_bundle(archive, codec="none")
+    raw = bytearray(archive.read_bytes())
+    at = raw.index(b"\"meals\": null")
+    raw[at:at + 6] = b"\"Meals"
+    archive.write_bytes(bytes(raw))
+
+    node("target")
+    with pytest.raises(bundle.BundleError, match="Checksum mismatch"):
+        bundle.import_bundle(archive)
+    assert not db.DB_PATH.exists() and not (settings.cache_dir / "abc.json").exists()
+
+
+def test_rejects_newer_schema_and_older_generation(node, tmp_path, monkeypatch):
+    _build(node("source"))
+    archive = tmp_path / "mealdb.tar.zst"
+    bundle.export_bundle(archive)
+    node("target")
+    current = db.SCHEMA_VERSION
+    monkeypatch.setattr(db, "SCHEMA_VERSION", current - 1)
+    with pytest.raises(bundle.BundleError, match="newer than this code"):
+        bundle.import_bundle(archive)
+    monkeypatch.setattr(db, "SCHEMA_VERSION", current)
+    (settings.data_dir / "bundle.json").write_text(json.dumps({"index_generation": 2}))
+    with pytest.raises(bundle.BundleError, match="older than the installed 2"):
+        bundle.import_bundle(archive)
+    assert bundle.import_bundle(archive, force=True)["counts"]["meals"] == 50
+
+    # Deltas applied since the import move the node ahead of its bundle.json
+    conn = db.connect()
+    conn.execute("INSERT OR REPLACE INTO index_meta(key, value) VALUES ('generation', 3)")
+    conn.commit()
+    conn.close()
+    with pytest.raises(bundle.BundleError, match="older than the installed 3"):
+        bundle.import_bundle(archive)
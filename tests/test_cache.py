@@ -0,0 +1,109 @@
+"""Tests for the pluggable API cache backends."""
+from __future__ import annotations
+import asyncio
+import shutil
+import socket
+import subprocess
+import time
+
+import pytest
+
+from src import cache as cache_module
+from src.cache import FileCache, RedisCache, SQLiteCache, make_cache
+
+
+class FakeRedis:
+    """In-process stand-in for the subset of the redis client RedisCache uses."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        value, expires = self.store.get(key, (None, None))
+        if expires is not None and time.time() > expires:
+            return None
+        return value
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value):
+        self.store[key] = (self._encode(value), None)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = (self._encode(value), time.time() + ttl)
+
+    @staticmethod
+    def _encode(value):
+        return value.encode() if isinstance(value, str) else value
+
+
+@pytest.fixture(params=["file", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "file":
+        return FileCache(ttl_hours=1, base_dir=tmp_path)
+    if request.param == "sqlite":
+        return SQLiteCache(ttl_hours=1, path=tmp_path / "cache.db")
+    return RedisCache(ttl_hours=1, client=FakeRedis())
+
+
+def test_backend_roundtrip_and_stats(backend):
+    assert backend.get("https://x/search.php?f=a") is None
+    backend.set("https://x/search.php?f=a", {"meals": [{"idMeal": "1"}]})
+    assert backend.get("https://x/search.php?f=a") == {"meals": [{"idMeal": "1"}]}
+    backend.set("https://x/search.php?f=a", {"meals": None})
+    assert backend.get("https://x/search.php?f=a") == {"meals": None}
+    stats = backend.stats()
+    assert (stats["hits"], stats["misses"], stats["sets"]) == (2, 1, 2)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_get_many_returns_only_cached_keys(backend):
+    backend.set("a", {"meals": [1]})
+    backend.set("b", {"meals": None})
+    assert backend.get_many(["a", "b", "c", "a"]) == {"a": {"meals": [1]}, "b": {"meals": None}}
+    assert asyncio.run(backend.aget_many(["c"])) == {}
+    stats = backend.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+
+
+def test_sqlite_backend_expires_entries(tmp_path, monkeypatch):
+    backend = SQLiteCache(ttl_hours=1, path=tmp_path / "cache.db")
+    backend.set("k", [1, 2])
+    later = time.time() + 2 * 3600
+    monkeypatch.setattr(cache_module.time, "time", lambda: later)
+    assert backend.get("k") is None
+
+
+def test_make_cache_selects_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module.settings, "cache_sqlite_path", tmp_path / "shared.db")
+    assert isinstance(make_cache("sqlite"), SQLiteCache)
+    with pytest.raises(ValueError):
+        make_cache("memcached")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.skipif(shutil.which("redis-server") is None, reason="redis-server not installed")
+def test_redis_backend_against_local_server():
+    port = _free_port()
+    proc = subprocess.Popen(["redis-server", "--port", str(port), "--save", "", "--appendonly", "no"],
+                            stdout=subprocess.DEVNULL)
+    try:
+        backend = RedisCache(ttl_hours=1, url=f"redis://127.0.0.1:{port}/0")
+        for _ in range(50):
+            try:
+                backend.client.ping()
+                break
+            except Exception:
+                time.sleep(0.1)
+        backend.set("k", {"meals": []})
+        assert RedisCache(ttl_hours=1, url=f"redis://127.0.0.1:{port}/0").get("k") == {"meals": []}
+        assert 0 < backend.client.ttl("mealdb:cache:k") <= 3600
+    finally:
+        proc.terminate()
+        proc.wait()
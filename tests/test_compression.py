@@ -0,0 +1,49 @@
+"""Tests for transparent compression of cache entries and snapshots."""
+from __future__ import annotations
+import hashlib
+import json
+
+import pytest
+
+from src import compression
+from src.cache import FileCache
+from src.config import settings
+
+CODECS = ["gzip", "none"] + (["zstd"] if compression._ZSTD_AVAILABLE else [])
+PAYLOAD = {"meals": [{"idMeal": str(i), "strMeal": "Soupe à l'oignon", "strIngredient20": ""} for i in range(50)]}
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_roundtrip_is_tagged_by_magic(codec):
+    raw = compression.dumps(PAYLOAD, codec)
+    magic = {"gzip": compression.GZIP_MAGIC, "zstd": compression.ZSTD_MAGIC, "none": b"{"}[codec]
+    assert raw.startswith(magic)
+    assert compression.loads(raw) == PAYLOAD
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_snapshot_streams_through_open_text(tmp_path, codec):
+    path = tmp_path / "meals.json"
+    with compression.open_text(path, "w", codec) as f:
+        json.dump(PAYLOAD, f, ensure_ascii=False)
+    with compression.open_text(path) as f:
+        assert json.load(f) == PAYLOAD
+    if codec != "none":
+        assert path.stat().st_size < len(json.dumps(PAYLOAD))
+
+
+def test_file_cache_reads_legacy_plain_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "compression", "gzip")
+    cache = FileCache(ttl_hours=1, base_dir=tmp_path)
+    key = "https://x/search.php?f=b"
+    legacy = tmp_path / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+    legacy.write_text(json.dumps({"_ts": 1e12, "data": PAYLOAD}))
+    assert cache.get(key) == PAYLOAD
+    cache.set(key, PAYLOAD)
+    assert legacy.read_bytes().startswith(compression.GZIP_MAGIC)
+    assert cache.get(key) == PAYLOAD
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        compression.resolve_codec("lz4")
@@ -0,0 +1,146 @@
+"""Tests for the MealDBClient crawl: off-loop cache reads, retries, checkpoints, negative caching."""
+from __future__ import annotations
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from src import mealdb_api
+from src.cache import FileCache
+from src.mealdb_api import SHARD_LETTERS, CrawlCheckpoint, IncompleteCrawlError, MealDBClient
+
+
+class SlowFileCache(FileCache):
+    """Every read blocks like a cold network volume would."""
+
+    def _get(self, key):
+        time.sleep(0.01)
+        return super()._get(key)
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self.data = data
+
+    async def __aenter__(self):
+        await asyncio.sleep(0.005)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientError(f"HTTP {self.status}")
+
+    async def json(self):
+        return self.data
+
+
+class FakeSession:
+    """Serves one meal per letter; ``failures[letter]`` requests fail first, ``empty`` letters return null."""
+
+    requested = []
+    failures = {}
+    empty = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url, timeout=None):
+        FakeSession.requested.append(url)
+        letter = url.rsplit("=", 1)[1]
+        if FakeSession.failures.get(letter, 0) > 0:
+            FakeSession.failures[letter] -= 1
+            return FakeResponse(503, None)
+        if letter in FakeSession.empty:
+            return FakeResponse(200, {"meals": None})
+        return FakeResponse(200, {"meals": [{"idMeal": letter}]})
+
+
+@pytest.fixture
+def crawl(tmp_path, monkeypatch):
+    backend = FileCache(ttl_hours=1, base_dir=tmp_path / "cache")
+    monkeypatch.setattr(mealdb_api, "cache", backend)
+    monkeypatch.setattr(mealdb_api.aiohttp, "ClientSession", FakeSession)
+    monkeypatch.setattr(mealdb_api.settings, "crawl_backoff_seconds", 0.001)
+    FakeSession.requested, FakeSession.failures, FakeSession.empty = [], {}, set()
+    return backend, CrawlCheckpoint(tmp_path / "crawl")
+
+
+async def crawl_with_heartbeat(client, checkpoint):
+    """Run a full crawl while measuring the longest gap between 1ms heartbeat ticks."""
+    lag = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - start - 0.001)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)  # start ticking before the crawl
+    meals = await client.fetch_all_meals(checkpoint)
+    done = True
+    await beat
+    return meals, lag
+
+
+def test_crawl_serves_hits_up_front_without_blocking_the_loop(crawl, tmp_path, monkeypatch):
+    _, checkpoint = crawl
+    slow = SlowFileCache(ttl_hours=1, base_dir=tmp_path / "slow")
+    client = MealDBClient(base_url="https://x")
+    for letter in SHARD_LETTERS[:20]:
+        slow.set(client._url("search.php", {"f": letter}), {"meals": [{"idMeal": letter}]})
+    monkeypatch.setattr(mealdb_api, "cache", slow)
+
+    meals, lag = asyncio.run(crawl_with_heartbeat(client, checkpoint))
+
+    assert len(meals) == len(SHARD_LETTERS)
+    assert len(FakeSession.requested) == len(SHARD_LETTERS) - 20
+    assert slow.hits == 20
+    # 36 reads block for 10ms each (~360ms on the loop if run inline), but only in a worker thread
+    assert lag < 0.05, f"event loop stalled for {lag * 1000:.1f}ms"
+
+
+def test_failed_shards_are_retried_then_resumed_from_checkpoint(crawl, monkeypatch):
+    _, checkpoint = crawl
+    client = MealDBClient(base_url="https://x")
+    monkeypatch.setattr(mealdb_api.settings, "crawl_retries", 2)
+    FakeSession.failures = {"b": 2, "c": 3}  # b recovers on its last retry, c fails all three attempts
+
+    with pytest.raises(IncompleteCrawlError) as excinfo:
+        asyncio.run(client.fetch_all_meals(checkpoint))
+    assert excinfo.value.letters == ["c"]
+    assert sum(url.endswith("f=b") for url in FakeSession.requested) == 3
+    assert set(checkpoint.load()) == set(SHARD_LETTERS) - {"c"}
+
+    FakeSession.requested = []
+    meals = asyncio.run(MealDBClient(base_url="https://x").fetch_all_meals(checkpoint))
+    assert FakeSession.requested == ["https://x/search.php?f=c"]
+    assert [m["idMeal"] for m in meals] == SHARD_LETTERS
+
+
+def test_empty_shards_are_negatively_cached_briefly(crawl, monkeypatch):
+    backend, _ = crawl
+    client = MealDBClient(base_url="https://x")
+    FakeSession.empty = {"x"}
+
+    async def fetch_x():
+        async with mealdb_api.aiohttp.ClientSession() as session:
+            return await client.search_by_first_letter(session, "x")
+
+    assert asyncio.run(fetch_x()) == []
+    assert asyncio.run(fetch_x()) == []
+    assert len(FakeSession.requested) == 1
+
+    monkeypatch.setattr(mealdb_api.time, "time", lambda: time.monotonic() + 10**10)
+    assert asyncio.run(fetch_x()) == []
+    assert len(FakeSession.requested) == 2
@@ -0,0 +1,136 @@
+"""Tests for generation change logs and applying them to replicas."""
+from __future__ import annotations
+import json
+import shutil
+
+import pytest
+
+from src import compression, db, delta, similar
+from src.config import settings
+from src.indexer import index_snapshot
+from src.snapshot import write_snapshot
+from src.synth import generate_meals
+
+
+@pytest.fixture
+def primary(make_index, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "delta_dir", tmp_path / "deltas")
+    make_index(name="primary.db")
+    return tmp_path
+
+
+def _reindex(tmp_path, meals):
+    path = tmp_path / "meals.ndjson"
+    write_snapshot(path, meals, codec="none")
+    return index_snapshot(path)
+
+
+def _dump(path):
+    conn = db.connect_readonly(path, immutable=False)
+    try:
+        return (
+            conn.execute("SELECT * FROM meals ORDER BY id").fetchall(),
+            sorted(map(tuple, conn.execute("SELECT * FROM meal_ingredients"))),
+            conn.execute("SELECT rowid, * FROM meals_fts ORDER BY rowid").fetchall(),
+        )
+    finally:
+        conn.close()
+
+
+def _dump_tuples(path):
+    meals, ingredients, fts = _dump(path)
+    return [tuple(r) for r in meals], ingredients, [tuple(r) for r in fts]
+
+
+def _neighbors(path):
+    conn = db.connect_readonly(path, immutable=False)
+    try:
+        return [tuple(r) for r in conn.execute(
+            "SELECT meal_id, rank, similar_id, round(score, 5) FROM meal_similar ORDER BY meal_id, rank")]
+    finally:
+        conn.close()
+
+
+@pytest.mark.skipif(not similar._SIMILAR_AVAILABLE, reason="numpy/scipy not installed")
+def test_replica_receives_changed_similar_meals(primary, monkeypatch):
+    def build(meals):
+        # As build_index does: neighbors first, so the commit ships their changes
+        path = primary / "meals.ndjson"
+        write_snapshot(path, meals, codec="none")
+        index_snapshot(path, commit=False)
+        similar.build_similar_index()
+        return delta.commit_generation()
+
+    meals = list(generate_meals(1000, seed=9))
+    build(meals)
+    shutil.copy(db.DB_PATH, primary / "replica.db")
+
+    meals[2] = dict(meals[2], strIngredient1="Saffron", strIngredient2="Saffron Rice")
+    meals.pop(4)
+    assert build(meals) == 2
+    with compression.open_text(delta.delta_path(1, 2)) as f:
+        records = [json.loads(line) for line in f][1:]
+    ops = {r["op"] for r in records}
+    assert ops == {"upsert", "delete", "similar"}
+    # Only meals whose neighbors moved are shipped, not the whole table
+    assert len(records) < len(meals) // 10
+
+    monkeypatch.setattr(db, "DB_PATH", primary / "replica.db")
+    stale = _neighbors(db.DB_PATH)
+
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError("replicas must not rebuild meal_similar")
+
+    monkeypatch.setattr(similar, "build_similar_index", no_rebuild)
+    delta.apply_deltas([settings.delta_dir])
+    assert _neighbors(db.DB_PATH) == _neighbors(primary / "primary.db") != stale
+
+
+def test_delta_brings_replica_to_primary(primary, monkeypatch):
+    meals = list(generate_meals(100, seed=7))
+    assert _reindex(primary, meals) == 1
+    assert not list(settings.delta_dir.glob("*"))  # replicas start from a full snapshot
+    shutil.copy(db.DB_PATH, primary / "replica.db")
+
+    assert _reindex(primary, meals) == 1  # nothing changed: no new generation
+    meals[3] = dict(meals[3], strMeal="Renamed Stew", strIngredient1="Saffron")
+    meals[5] = dict(meals[5], strInstructions="Just boil it.")
+    removed = meals.pop(10)
+    meals.append(dict(meals[0], idMeal="999999", strMeal="Brand New Pie"))
+    assert _reindex(primary, meals) == 2
+
+    [path] = settings.delta_dir.glob("delta-*.ndjson")
+    header = delta.read_header(path)
+    assert (header["from"], header["to"], header["count"]) == (1, 2, 4)
+
+    monkeypatch.setattr(db, "DB_PATH", primary / "replica.db")
+    assert delta.apply_deltas([settings.delta_dir]) == 4
+    assert delta.generation() == 2
+    assert _dump_tuples(primary / "replica.db") == _dump_tuples(primary / "primary.db")
+    assert db.search_meals("Brand New Pie")[0]["id"] == 999999
+    assert db.search_meals("saffron")
+    assert all(r["id"] != int(removed["idMeal"]) for r in db.search_meals(removed["strMeal"], limit=50))
+    assert delta.apply_deltas([path]) == 0  # already applied
+
+
+def test_generation_gap_and_truncation_leave_replica_untouched(primary, monkeypatch):
+    meals = list(generate_meals(30, seed=8))
+    _reindex(primary, meals)
+    shutil.copy(db.DB_PATH, primary / "replica.db")
+    for i in range(2):
+        meals[i] = dict(meals[i], strMeal=f"Changed {i}")
+        _reindex(primary, meals)
+    first, second = sorted(settings.delta_dir.glob("delta-*.ndjson"))
+
+    monkeypatch.setattr(db, "DB_PATH", primary / "replica.db")
+    before = _dump_tuples(db.DB_PATH)
+    with pytest.raises(delta.GenerationMismatch):
+        delta.apply_deltas([second])
+
+    with compression.open_text(first) as f:
+        header = f.readline()
+    with compression.open_text(first, "w") as f:
+        f.write(header)
+    with pytest.raises(delta.DeltaError, match="truncated"):
+        delta.apply_delta(first)
+    assert delta.generation() == 1 and _dump_tuples(db.DB_PATH) == before
@@ -0,0 +1,74 @@
+"""Tests for the dictionary-encoded dimension tables and compatibility views."""
+from __future__ import annotations
+import sqlite3
+
+import pytest
+
+from src import db
+
+MEALS = [
+    {"idMeal": "1", "strMeal": "Carbonara", "strCategory": "Pasta", "strArea": "Italian",
+     "strInstructions": "Toss.", "strIngredient1": "Spaghetti", "strMeasure1": "200g",
+     "strIngredient2": "Eggs", "strMeasure2": "2"},
+    {"idMeal": "2", "strMeal": "Omelette", "strCategory": "Breakfast", "strArea": "French",
+     "strInstructions": "Fold.", "strIngredient1": "Eggs", "strMeasure1": "3"},
+]
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index(init=False)
+
+
+def test_names_stored_once_and_views_keep_old_shape(index):
+    db.init_db()
+    db.upsert_dimensions(categories=[{"strCategory": "Pasta", "strCategoryDescription": "Noodles"}],
+                         areas=[{"strArea": "Italian"}], ingredients=[{"strIngredient": "Eggs"}])
+    db.upsert_meals(MEALS)
+    db.upsert_meals(MEALS[:1])
+    conn = db.connect()
+    assert conn.execute("SELECT COUNT(*) FROM ingredients WHERE name = 'Eggs'").fetchone()[0] == 1
+    assert conn.execute("SELECT description FROM categories WHERE name = 'Pasta'").fetchone()[0] == "Noodles"
+    row = conn.execute("SELECT * FROM meals WHERE id = 1").fetchone()
+    assert row.keys() == ["id", "name", "category", "area", "instructions", "thumbnail", "tags"]
+    assert (row["category"], row["area"]) == ("Pasta", "Italian")
+    assert sorted(map(tuple, conn.execute("SELECT meal_id, ingredient, measure FROM meal_ingredients"))) == [
+        (1, "Eggs", "2"), (1, "Spaghetti", "200g"), (2, "Eggs", "3")]
+    assert db.search_meals("carbonara")[0]["category"] == "Pasta"
+    conn.close()
+
+
+def test_ingredients_keep_recipe_order(index):
+    db.init_db()
+    db.upsert_meals([{"idMeal": "1", "strMeal": "Crumble", "strIngredient1": "Apple", "strIngredient2": "Milk"},
+                     {"idMeal": "2", "strMeal": "Loaf", "strIngredient1": "Zucchini", "strIngredient2": "Apple",
+                      "strIngredient3": "", "strIngredient4": "Milk", "strMeasure4": "1 cup"}])
+    conn = db.connect()
+    rows = conn.execute("SELECT ingredient, measure, position FROM meal_ingredients WHERE meal_id = 2").fetchall()
+    assert list(map(tuple, rows)) == [("Zucchini", "", 1), ("Apple", "", 2), ("Milk", "1 cup", 4)]
+    conn.close()
+
+
+def test_legacy_tables_are_migrated(index):
+    conn = sqlite3.connect(str(index))
+    conn.executescript(
+        """
+        CREATE TABLE meals (id INTEGER PRIMARY KEY, name TEXT, category TEXT, area TEXT,
+                            instructions TEXT, thumbnail TEXT, tags TEXT);
+        CREATE TABLE meal_ingredients (meal_id INTEGER, ingredient TEXT, measure TEXT,
+                                       PRIMARY KEY (meal_id, ingredient),
+                                       FOREIGN KEY (meal_id) REFERENCES meals(id) ON DELETE CASCADE);
+        INSERT INTO meals VALUES (7, 'Stew', 'Beef', '', 'Simmer.', NULL, 'stew');
+        INSERT INTO meal_ingredients VALUES (7, 'Beef', '1kg'), (7, 'Carrots', '2');
+        """
+    )
+    conn.close()
+    db.init_db()
+    conn = db.connect()
+    types = dict(conn.execute("SELECT name, type FROM sqlite_master WHERE name IN ('meals', 'meal_ingredients')"))
+    assert types == {"meals": "view", "meal_ingredients": "view"}
+    assert tuple(conn.execute("SELECT * FROM meals").fetchone()) == (7, "Stew", "Beef", None, "Simmer.", None, "stew")
+    assert list(map(tuple, conn.execute("SELECT ingredient, position FROM meal_ingredients WHERE meal_id = 7"))) == [
+        ("Beef", 1), ("Carrots", 2)]
+    conn.close()
+    db.init_db()  # idempotent once migrated
@@ -0,0 +1,59 @@
+"""Tests for typo-tolerant search."""
+from __future__ import annotations
+
+import pytest
+
+from src import db, fuzzy
+from src.config import settings
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index(200, seed=3, reset=(fuzzy.reset_vocabulary,))
+
+
+def test_edit_distance_counts_transpositions_and_bails_early():
+    assert fuzzy.edit_distance("chicken", "chicken", 2) == 0
+    assert fuzzy.edit_distance("chiken", "chicken", 2) == 1
+    assert fuzzy.edit_distance("chikcen", "chicken", 2) == 1
+    assert fuzzy.edit_distance("beef", "chicken", 2) == 3
+
+
+def test_correct_prefers_closest_then_most_frequent():
+    vocab = fuzzy.Vocabulary({"chicken": 50, "thicken": 2, "garlic": 10})
+    assert vocab.correct("Chiken") == "chicken"
+    assert vocab.correct("hicken") == "chicken"
+    assert vocab.correct("garlik") == "garlic"
+    assert vocab.correct("garlic") == "garlic"
+    assert vocab.correct("zzzzzzz") is None
+    assert vocab.correct("cat") is None  # too short to correct
+
+
+def test_misspelled_terms_are_corrected_and_known_queries_run_once(index, monkeypatch):
+    exact = db.search_meals("chicken", limit=5)
+    assert exact
+    assert db.search_meals("chikcen", limit=5) == []
+
+    monkeypatch.setattr(settings, "fuzzy_search", True)
+    assert db.search_meals("chikcen", limit=5) == exact
+
+    matched = []
+    match = db._match
+
+    def recording_match(sql, query, terms, limit):
+        matched.append(terms)
+        return match(sql, query, terms, limit)
+
+    monkeypatch.setattr(db, "_match", recording_match)
+    assert db.search_meals("Chicken", limit=5) == exact
+    assert matched == [["Chicken"]]
+
+
+def test_misspelled_term_is_corrected_next_to_a_known_one(index, monkeypatch):
+    expected = db.search_meals("chicken biryani", limit=10)
+    uncorrected = db.search_meals("chikcen biryani", limit=10)
+    assert uncorrected  # "biryani" alone hits, so a result count would not reveal the typo
+    assert uncorrected != expected
+
+    monkeypatch.setattr(settings, "fuzzy_search", True)
+    assert db.search_meals("chikcen biryani", limit=10) == expected
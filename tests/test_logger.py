@@ -0,0 +1,57 @@
+"""Tests for queued sinks, throttled logging and structured index-build records."""
+from __future__ import annotations
+
+import pytest
+
+from src import db, logger as logging_setup
+from src.logger import QueuedSink, RotatingFile, Throttle, logger
+
+
+@pytest.fixture
+def records():
+    captured = []
+    sink = logger.add(lambda message: captured.append(message.record), level="DEBUG")
+    yield captured
+    logger.remove(sink)
+
+
+def test_queued_sink_writes_in_order_off_the_caller(tmp_path):
+    target = RotatingFile(tmp_path / "app.log", max_bytes=40)
+    sink = QueuedSink(target.write, target.flush)
+    handler = logger.add(sink, format="{message}", serialize=False)
+    try:
+        for i in range(20):
+            logger.info("line {}", i)
+        sink.complete()
+    finally:
+        logger.remove(handler)
+    rotated = sorted(tmp_path.glob("app.*.log"))
+    assert rotated and all(p.stat().st_size <= 40 for p in rotated)
+    lines = [line for p in rotated + [tmp_path / "app.log"] for line in p.read_text().splitlines()]
+    assert lines == [f"line {i}" for i in range(20)]
+
+
+def test_throttle_allows_a_burst_then_counts(records):
+    throttle = Throttle(burst=3, window_seconds=3600)
+    assert [throttle.allow("k") for _ in range(5)] == [True, True, True, False, False]
+    assert throttle.allow("other")
+    throttle.flush("k")
+    assert [r["extra"]["suppressed"] for r in records] == [2]
+    assert throttle.allow("k")  # a new window after the flush
+
+
+def test_bulk_upsert_failures_are_rate_limited(tmp_path, monkeypatch, records):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "meals.db")
+    monkeypatch.setattr(logging_setup, "_throttle", Throttle(burst=5, window_seconds=3600))
+    db.init_db()
+    bad = [{"idMeal": f"x{i}", "strMeal": "Broken"} for i in range(200)]
+    good = [{"idMeal": "1", "strMeal": "Stew", "strInstructions": "Simmer."}]
+    assert db.upsert_meals(bad + good) == 1
+
+    failures = [r for r in records if r["message"].startswith("Failed upserting meal")]
+    assert len(failures) == 5
+    [summary] = [r for r in records if r["extra"].get("throttled") == "meal.upsert"]
+    assert summary["extra"]["suppressed"] == 195
+    [done] = [r for r in records if r["extra"].get("stage") == "index.write"]
+    assert done["extra"]["meals"] == 1 and done["extra"]["elapsed_ms"] >= 0
+
@@ -0,0 +1,60 @@
+"""Tests for per-stage latency metrics."""
+from __future__ import annotations
+
+import pytest
+
+from src import db, metrics, rag
+
+MEAL = {
+    "idMeal": "1",
+    "strMeal": "Test Pasta",
+    "strCategory": "Pasta",
+    "strArea": "Italian",
+    "strInstructions": "Cook pasta with tomatoes and garlic.",
+    "strIngredient1": "Pasta",
+    "strMeasure1": "200g",
+}
+
+
+@pytest.fixture
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(metrics, "registry", metrics.Registry())
+    monkeypatch.setattr(metrics, "_enabled", True)
+    return metrics.registry
+
+
+def test_span_is_noop_when_disabled(monkeypatch):
+    monkeypatch.setattr(metrics, "_enabled", False)
+    assert metrics.span("db.match") is metrics.span("db.fetch")
+
+
+def test_histogram_percentiles_and_prometheus(fresh_registry):
+    for ms in range(1, 101):
+        fresh_registry.observe("db.match", ms / 1000)
+    row = fresh_registry.summary()["db.match"]
+    assert row["count"] == 100
+    assert row["p50_ms"] == pytest.approx(51.0)
+    assert row["p99_ms"] == pytest.approx(100.0)
+    text = fresh_registry.render_prometheus()
+    assert 'mealdb_stage_seconds_bucket{stage="db.match",le="0.05"} 50' in text
+    assert 'mealdb_stage_seconds_count{stage="db.match"} 100' in text
+
+
+def test_snapshot_merges_across_saves(fresh_registry, tmp_path):
+    path = tmp_path / "metrics.json"
+    fresh_registry.observe("db.match", 0.002)
+    metrics.save_snapshot(path)
+    fresh_registry.observe("db.match", 0.004)
+    metrics.save_snapshot(path)
+    assert metrics.load_snapshot(path).summary()["db.match"]["count"] == 2
+
+
+def test_answer_debug_reports_stage_breakdown(fresh_registry, tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "meals.db")
+    db.init_db()
+    db.upsert_meals([MEAL])
+    response = rag.answer("pasta", debug=True)
+    assert "Timings: " in response
+    for stage in ("search.clean", "db.connect", "db.match", "db.fetch", "retrieve.build", "answer.context"):
+        assert f"{stage}=" in response
+        assert fresh_registry.summary()[stage]["count"] == 1
@@ -0,0 +1,57 @@
+"""Tests for cursor-paged search."""
+from __future__ import annotations
+
+import pytest
+
+from src import db, paging
+from src.config import settings
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index(300, seed=4, reset=(paging.ranked_cache.clear,))
+
+
+def test_pages_concatenate_to_the_full_ranking(index):
+    expected = [tuple(r) for r in db.search_meals("chicken garlic", limit=settings.search_max_results)]
+    assert len(expected) > 25
+    seen, cursor = [], None
+    rows, cursor = paging.search_page("chicken garlic", page_size=10)
+    while True:
+        seen += [tuple(r) for r in rows]
+        if cursor is None:
+            break
+        rows, cursor = paging.search_page(cursor=cursor, page_size=10)
+    assert seen == expected
+
+
+def test_follow_up_pages_reuse_the_cached_ranking(index, monkeypatch):
+    _, cursor = paging.search_page("beef", page_size=5)
+    calls = []
+    real = db.search_meal_ids
+    monkeypatch.setattr(db, "search_meal_ids", lambda *a, **kw: calls.append(a) or real(*a, **kw))
+    paging.search_page(cursor=cursor, page_size=5)
+    assert calls == []
+
+    paging.ranked_cache.clear()  # e.g. the cursor landed on another worker
+    rows, _ = paging.search_page(cursor=cursor, page_size=5)
+    assert len(calls) == 1 and rows
+
+
+def test_rejects_garbage_cursors():
+    with pytest.raises(ValueError):
+        paging.search_page(cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        paging.decode_cursor(paging.encode_cursor("beef", 0)[:-2] + "!!")
+    assert paging.decode_cursor(paging.encode_cursor("crème brûlée", 40)) == ("crème brûlée", 40)
+
+
+def test_ranked_cache_expires_and_evicts():
+    cache = paging.RankedCache(max_entries=2, ttl_seconds=60)
+    cache.set(("a", 0), [(1, -1.0)])
+    cache.set(("b", 0), [(2, -1.0)])
+    cache.get(("a", 0))
+    cache.set(("c", 0), [(3, -1.0)])
+    assert cache.get(("b", 0)) is None and cache.get(("a", 0)) == [(1, -1.0)]
+    cache.ttl_seconds = -1
+    assert cache.get(("a", 0)) is None
@@ -0,0 +1,49 @@
+"""Tests for profiling hooks and the slow-query log."""
+from __future__ import annotations
+import json
+import pstats
+import time
+
+from src import db
+from src.config import settings
+from src.logger import logger
+from src.profiling import profile
+from src.synth import generate_meals
+
+
+def busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profile_writes_pstats_and_collapsed_stacks(tmp_path):
+    path = tmp_path / "run.pstats"
+    with profile(path, sample_interval=0.0005):
+        busy(0.05)
+    stats = pstats.Stats(str(path))
+    assert any(func[2] == "busy" for func in stats.stats)
+    lines = path.with_suffix(".collapsed").read_text().splitlines()
+    assert lines and any("busy (test_profiling.py" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+
+def test_slow_search_logs_match_plan_and_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "meals.db")
+    db.init_db()
+    db.upsert_meals(generate_meals(50))
+    records = []
+    sink = logger.add(records.append, filter=lambda r: "slow_query" in r["extra"], format="{extra[slow_query]}")
+    try:
+        monkeypatch.setattr(settings, "slow_query_ms", 1e9)
+        db.search_meals("chicken curry")
+        assert records == []
+        monkeypatch.setattr(settings, "slow_query_ms", 1e-6)
+        db.search_meals("chicken curry!")
+    finally:
+        logger.remove(sink)
+    record = json.loads(records[0].record["extra"]["slow_query"])
+    assert record["match"] == "chicken OR curry"
+    assert record["rows"] == 5
+    assert any("meals_fts" in step for step in record["plan"])
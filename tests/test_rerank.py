@@ -0,0 +1,56 @@
+"""Tests for two-stage (candidates + feature rerank) search."""
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src import db, fuzzy, rerank  # noqa: E402
+from src.config import settings  # noqa: E402
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index(500, seed=2, reset=(fuzzy.reset_vocabulary,))
+
+
+def test_parse_weights_overrides_defaults():
+    weights = rerank.parse_weights("area=3, overlap=0")
+    assert weights["area"] == 3.0 and weights["overlap"] == 0.0
+    assert weights["name"] == rerank.DEFAULT_WEIGHTS["name"]
+    with pytest.raises(ValueError):
+        rerank.parse_weights("popularity=1")
+
+
+def test_bm25_saturates_and_normalizes_length():
+    tf = np.array([[1.0], [4.0], [1.0]])
+    scores = rerank.bm25(tf, np.array([10.0, 10.0, 40.0]), np.array([1.0]))
+    assert scores[1] > scores[0] > scores[2]
+    assert scores[1] < 4 * scores[0]
+
+
+def test_rerank_mode_serves_search_meals_and_rewards_area(index, monkeypatch):
+    monkeypatch.setattr(settings, "search_mode", "rerank")
+    rows = db.search_meals("indian lamb curry", limit=10)
+    assert rows and len(rows) <= 10
+    assert [r["score"] for r in rows] == sorted(r["score"] for r in rows)
+    assert [(r["id"], r["score"]) for r in rows] == db.search_meal_ids("indian lamb curry", limit=10)
+
+    only_area = rerank.rerank_ids("indian lamb curry", limit=10,
+                                  weights={f: 0.0 for f in rerank.FEATURES if f != "area"})
+    areas = {r["id"]: r["area"] for r in db.meals_by_ids(only_area)}
+    flags = [areas[meal_id] == "Indian" for meal_id, _ in only_area]
+    assert flags == sorted(flags, reverse=True) and flags[0]
+
+
+def test_rerank_scores_the_fuzzy_corrected_terms(index, monkeypatch):
+    monkeypatch.setattr(settings, "fuzzy_search", True)
+    expected = rerank.rerank_ids("prawn biryani", limit=10)
+    assert expected
+    assert rerank.rerank_ids("prawn biryanni", limit=10) == expected
+
+
+def test_unknown_search_mode_is_rejected(index, monkeypatch):
+    monkeypatch.setattr(settings, "search_mode", "vector")
+    with pytest.raises(ValueError):
+        db.search_meals("curry")
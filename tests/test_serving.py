@@ -0,0 +1,67 @@
+"""Tests for the read-only serving mode of the meals index."""
+from __future__ import annotations
+import multiprocessing as mp
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src import db
+from src.config import settings
+
+MEAL = {
+    "idMeal": "1",
+    "strMeal": "Test Pasta",
+    "strCategory": "Pasta",
+    "strArea": "Italian",
+    "strInstructions": "Cook pasta with tomatoes and garlic.",
+    "strTags": "pasta,italian",
+    "strIngredient1": "Pasta",
+    "strMeasure1": "200g",
+}
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index([MEAL], reset=(db.reset_serving_connections,))
+
+
+def test_connect_readonly_rejects_writes(index):
+    conn = db.connect_readonly(index)
+    mmap_size = conn.execute("PRAGMA mmap_size").fetchone()[0]
+    assert mmap_size == index.stat().st_size
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM meals")
+    conn.close()
+
+
+def test_search_uses_cached_serving_connection(index, monkeypatch):
+    monkeypatch.setattr(settings, "db_read_only", True)
+    assert db.search_meals("pasta")[0]["name"] == "Test Pasta"
+    first = db.serving_connection()
+    db.search_meals("garlic")
+    assert db.serving_connection() is first
+
+
+def _child_search(out):
+    out.put([r["name"] for r in db.search_meals("pasta")])
+
+
+def test_forked_worker_reopens_connection(index, monkeypatch):
+    monkeypatch.setattr(settings, "db_read_only", True)
+    monkeypatch.setattr(settings, "db_preload", True)
+    db.prepare_serving()
+    db.search_meals("pasta")
+    ctx = mp.get_context("fork")
+    out = ctx.Queue()
+    proc = ctx.Process(target=_child_search, args=(out,))
+    proc.start()
+    assert out.get(timeout=10) == ["Test Pasta"]
+    proc.join()
+    assert proc.exitcode == 0
+
+
+def test_prepare_serving_requires_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", Path(tmp_path) / "missing.db")
+    with pytest.raises(FileNotFoundError):
+        db.prepare_serving()
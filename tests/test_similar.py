@@ -0,0 +1,48 @@
+"""Tests for the precomputed similar-meals index."""
+from __future__ import annotations
+
+import pytest
+
+from src import db
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from src.similar import build_similar_index  # noqa: E402
+from src.synth import generate_meals  # noqa: E402
+
+
+def meal(meal_id, name, *ingredients):
+    m = {"idMeal": str(meal_id), "strMeal": name, "strInstructions": "Cook."}
+    for i, ingredient in enumerate(ingredients, start=1):
+        m[f"strIngredient{i}"] = ingredient
+        m[f"strMeasure{i}"] = "1"
+    return m
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index()
+
+
+def test_neighbors_ranked_by_shared_rare_ingredients(index):
+    db.upsert_meals([
+        meal(1, "Saffron Rice", "Saffron", "Rice", "Salt"),
+        meal(2, "Saffron Risotto", "Saffron", "Rice", "Butter", "Salt"),
+        meal(3, "Salted Water", "Salt", "Water"),
+        meal(4, "Toast", "Bread"),
+    ])
+    build_similar_index(top_n=3)
+    assert [r["id"] for r in db.similar_meals(1, 3)] == [2, 3]
+    assert db.similar_meals(4) == []
+    scores = [r["score"] for r in db.similar_meals(2, 3)]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_blockwise_build_matches_single_block(index):
+    db.upsert_meals(generate_meals(300, seed=5))
+    build_similar_index(top_n=5, memory_mb=1000)
+    single = {m: [(r["id"], round(r["score"], 5)) for r in db.similar_meals(m, 5)] for m in (52000, 52150, 52299)}
+    build_similar_index(top_n=5, memory_mb=0.01)  # 8 rows per block
+    blocked = {m: [(r["id"], round(r["score"], 5)) for r in db.similar_meals(m, 5)] for m in single}
+    assert blocked == single
@@ -0,0 +1,47 @@
+"""Tests for the NDJSON dataset snapshot format."""
+from __future__ import annotations
+import json
+
+import pytest
+
+from src.snapshot import iter_snapshot, read_header, write_snapshot
+from src.synth import generate_meals
+
+MEALS = list(generate_meals(20, seed=1))
+
+
+@pytest.mark.parametrize("codec", ["none", "gzip"])
+def test_roundtrip_with_header(tmp_path, codec):
+    path = tmp_path / "meals.ndjson"
+    assert write_snapshot(path, iter(MEALS), count=len(MEALS), codec=codec) == len(MEALS)
+    assert read_header(path)["count"] == len(MEALS)
+    assert list(iter_snapshot(path)) == MEALS
+
+
+def test_reader_is_incremental(tmp_path):
+    path = tmp_path / "meals.ndjson"
+    write_snapshot(path, MEALS, codec="none")
+    with path.open("a") as f:
+        f.write("not json\n")
+    meals = iter_snapshot(path)
+    assert next(meals) == MEALS[0]  # the broken tail has not been read yet
+    with pytest.raises(ValueError):
+        list(meals)
+
+
+@pytest.mark.parametrize("document", [
+    {"meals": MEALS},
+    MEALS,
+])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_legacy_documents_still_read(tmp_path, document, indent):
+    path = tmp_path / "meals.json"
+    path.write_text(json.dumps(document, indent=indent))
+    assert read_header(path) == {}
+    assert list(iter_snapshot(path)) == MEALS
+
+
+def test_headerless_ndjson(tmp_path):
+    path = tmp_path / "meals.ndjson"
+    path.write_text("".join(json.dumps(m) + "\n" for m in MEALS[:3]))
+    assert list(iter_snapshot(path)) == MEALS[:3]
@@ -0,0 +1,46 @@
+"""Tests for the in-memory MealStore serving path."""
+from __future__ import annotations
+
+import pytest
+
+from src import db, rag, store
+from src.config import settings
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index(200, seed=3, reset=(store.reset_store,))
+
+
+def test_store_retrieve_matches_row_path(index, monkeypatch):
+    expected = rag.retrieve("chicken garlic", k=5)
+    assert expected
+    monkeypatch.setattr(settings, "meal_store", True)
+    assert rag.retrieve("chicken garlic", k=5) == expected
+
+
+def test_store_interns_shared_strings(index):
+    meals = list(store.MealStore.load().meals.values())
+    categories = {}
+    for m in meals:
+        categories.setdefault(m.category, m.category)
+        assert m.category is categories[m.category]
+    assert len(categories) < len(meals)
+
+
+def test_instructions_lru_is_bounded(index):
+    s = store.MealStore.load(instructions_cache=3)
+    ids = list(s.meals)[:5]
+    texts = s.instructions(ids)
+    assert set(texts) == set(ids)
+    assert list(s._instructions) == ids[2:]
+    assert s.instructions(ids[4:])[ids[4]] == texts[ids[4]]
+
+
+def test_store_skips_meals_added_after_load(index, monkeypatch):
+    monkeypatch.setattr(settings, "meal_store", True)
+    store.get_store()
+    db.upsert_meals([{"idMeal": "1", "strMeal": "Zzyzx Stew", "strInstructions": "Simmer."}])
+    assert rag.retrieve("zzyzx") == []
+    store.reset_store()
+    assert [c["name"] for c in rag.retrieve("zzyzx")] == ["Zzyzx Stew"]
@@ -0,0 +1,40 @@
+"""Tests for prefix autocomplete."""
+from __future__ import annotations
+
+import pytest
+
+from src import db, suggest
+from src.synth import generate_meals
+
+
+def brute_force(s: suggest.Suggester, prefix: str, n: int) -> list:
+    matches = [i for i, text in enumerate(s.texts)
+               if any(text[start:].lower().startswith(prefix) for start in suggest._word_starts(text))]
+    return [s.texts[i] for i in matches[:n]]
+
+
+def test_ranks_by_popularity_and_matches_word_starts():
+    s = suggest.Suggester([("Chicken Curry", "meal", 1), ("Chicken", "ingredient", 40),
+                           ("Chickpeas", "ingredient", 12), ("Butter Chicken", "meal", 2)])
+    assert [r["text"] for r in s.suggest("chi", 10)] == ["Butter Chicken", "Chicken", "Chicken Curry", "Chickpeas"]
+    assert [r["text"] for r in s.suggest("Chicken  c", 10)] == ["Chicken Curry"]
+    assert s.suggest("chi", 1) == [{"text": "Butter Chicken", "kind": "meal", "popularity": 2}]
+
+
+def test_meals_are_not_buried_under_common_ingredients():
+    s = suggest.Suggester([("Garlic", "ingredient", 300), ("Ginger", "ingredient", 120), ("Gravy", "ingredient", 2),
+                           ("Goulash", "meal", 1), ("Gumbo", "meal", 1)])
+    assert [r["kind"] for r in s.suggest("g", 4)] == ["meal", "ingredient", "meal", "ingredient"]
+    assert s.suggest("", 5) == [] and s.suggest("zzz", 5) == []
+
+
+def test_precomputed_prefixes_match_a_scan(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "meals.db")
+    db.init_db()
+    db.upsert_meals(generate_meals(2000, seed=5))
+    s = suggest.Suggester.load()
+    assert s.top, "short prefixes of a 2000-meal index should be precomputed"
+    for prefix in list(s.top)[:20] + ["c", "ch", "gar", "salmon"]:
+        assert [r["text"] for r in s.suggest(prefix, 7)] == brute_force(s, prefix, 7)
+    kinds = {r["kind"] for r in s.suggest("c", suggest.MAX_SUGGESTIONS)}
+    assert kinds <= {"meal", "ingredient"}
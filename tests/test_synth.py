@@ -0,0 +1,29 @@
+"""Tests for the synthetic TheMealDB corpus generator."""
+from __future__ import annotations
+
+from src import db
+from src.snapshot import iter_snapshot
+from src.synth import generate_meals, write_snapshot
+
+
+def test_generator_is_deterministic_and_themealdb_shaped():
+    first = list(generate_meals(50, seed=3))
+    assert first == list(generate_meals(50, seed=3))
+    assert first != list(generate_meals(50, seed=4))
+    for meal in first:
+        assert all(f"strIngredient{i}" in meal and f"strMeasure{i}" in meal for i in range(1, 21))
+        used = [i for i in range(1, 21) if meal[f"strIngredient{i}"]]
+        assert used == list(range(1, len(used) + 1))
+        assert 3 <= len(used) <= 20
+        assert meal["strInstructions"]
+
+
+def test_snapshot_indexes_and_searches(tmp_path, monkeypatch):
+    path = tmp_path / "meals.ndjson"
+    write_snapshot(path, 200)
+    meals = list(iter_snapshot(path))
+    assert len(meals) == 200
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "meals.db")
+    db.init_db()
+    assert db.upsert_meals(meals) == 200
+    assert len(db.search_meals("chicken curry", limit=5)) == 5
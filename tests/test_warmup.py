@@ -0,0 +1,67 @@
+"""Tests for post-rebuild warm-up and persisted cache state."""
+from __future__ import annotations
+import json
+import os
+
+import pytest
+
+from src import db, paging, rag, rerank, warmup
+from src.config import settings
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index(200, seed=6, reset=(paging.ranked_cache.clear,))
+
+
+def test_hot_queries_ranks_a_query_log(tmp_path):
+    log = tmp_path / "queries.log"
+    log.write_text("beef stew\n" + json.dumps({"query": "chicken curry", "rows": 3}) + "\n"
+                   "chicken curry\n\nbeef stew\nchicken curry\nsoup\n")
+    assert warmup.hot_queries(2, log) == ["chicken curry", "beef stew"]
+
+
+def test_warm_fills_the_caches_save_state_persists(index, tmp_path):
+    stats = warmup.warm(["chicken", "beef stew", "chicken"], budget_seconds=60, preload=True)
+    assert stats["queries"] == 3
+    assert stats["preloaded_bytes"] == index.stat().st_size
+    path = warmup.save_state(tmp_path / "warm.state")
+
+    paging.ranked_cache.clear()
+    assert warmup.load_state(path)
+    version = index.stat().st_mtime_ns
+    assert paging.ranked_cache.get(("chicken", version)) == db.search_meal_ids("chicken", limit=settings.search_max_results)
+    assert paging.ranked_cache.get(("beef stew", version))
+
+
+def test_retrieve_serves_warmed_questions_from_the_cached_ranking(index, monkeypatch):
+    expected = [r["id"] for r in db.search_meals("chicken", limit=3)]
+    warmup.warm(["chicken"], budget_seconds=60, preload=False)
+
+    def no_search(*args, **kwargs):
+        raise AssertionError("ranked again")
+
+    monkeypatch.setattr(db, "search_meal_ids", no_search)
+    assert [r["id"] for r in rag.retrieve("chicken", k=3)] == expected
+
+
+def test_warm_stops_when_the_budget_is_spent(index):
+    assert warmup.warm(["chicken", "beef"], budget_seconds=0, preload=False)["queries"] == 0
+    assert not paging.ranked_cache._entries
+
+
+@pytest.mark.skipif(not rerank._RERANK_AVAILABLE, reason="numpy not installed")
+def test_state_roundtrip_restores_caches_for_the_same_index(index, tmp_path):
+    paging.search_page("chicken garlic", page_size=5)
+    rerank.idf(["chicken", "garlic"])
+    path = warmup.save_state(tmp_path / "warm.state")
+
+    paging.ranked_cache.clear()
+    rerank._doc_freq, rerank._doc_freq_version = {}, ()
+    assert warmup.load_state(path)
+    version = index.stat().st_mtime_ns
+    assert paging.ranked_cache.get(("chicken garlic", version))
+    assert rerank._doc_freq["chicken"] > 0
+
+    os.utime(index, ns=(version + 10**9, version + 10**9))  # the index was rebuilt
+    assert not warmup.load_state(path)